@@ -0,0 +1,1478 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import queue
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import inter_ass
+from inter_ass import (AudioAssistant, GroqClient, LatencyTracer, NULL_TRACE, ProctoringEngine, RateLimitScheduler,
+                       RequestHedger, ResponseCache, ResultsStore, SessionRegistry, SharedResources, TokenBucket,
+                       TTS_BACKENDS, TtsCache, TtsRouter, VoiceActivityDetector, WorkHandle)
+
+DEFAULT_QUESTIONS = [
+    "What is a REST API",
+    "How does garbage collection work in Python",
+    "What is the difference between a process and a thread",
+    "Why would you use a message queue",
+    "How do database indexes speed up queries",
+    "What is a race condition",
+    "Can you explain eventual consistency",
+    "What does a load balancer do"
+]
+
+FOLLOW_UPS = [
+    "And how does that compare to the alternatives",
+    "Why does that matter in production",
+    "What are the common mistakes with it",
+    "Can you give an example of that"
+]
+
+DEFAULT_ANSWER = (
+    "An API defines how two programs talk to each other. It exposes operations and data formats, "
+    "so a client can use a service without knowing its internals. Good APIs are consistent, versioned and documented."
+)
+
+
+def read_wav(path):
+    # Mono PCM in the same layout sr.AudioFile hands to the recognizer (signed, 8/16/32-bit)
+    with wave.open(path, 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128
+    elif width == 3:
+        padded = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        samples = (padded[:, 0].astype(np.int32) << 8 | padded[:, 1].astype(np.int32) << 16
+                   | padded[:, 2].astype(np.int8).astype(np.int32) << 24)
+        width = 4
+    else:
+        samples = np.frombuffer(raw, dtype='<i2' if width == 2 else '<i4')
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    dtype = {1: np.int8, 2: '<i2', 4: '<i4'}[width]
+    return samples.astype(dtype).tobytes(), rate, width
+
+
+def bench_vad(paths, chunk_frames=1024):
+    results = []
+    for path in paths:
+        pcm, rate, width = read_wav(path)
+        chunk_bytes = chunk_frames * width
+
+        # Streaming path, chunked exactly like the live microphone capture
+        vad = VoiceActivityDetector(sample_rate=rate, sample_width=width)
+        started = time.perf_counter()
+        phrases = []
+        for offset in range(0, len(pcm), chunk_bytes):
+            phrases.extend(vad.feed(pcm[offset: offset + chunk_bytes]))
+        phrases.extend(vad.flush())
+        stream_seconds = time.perf_counter() - started
+        stream_stats = vad.snapshot()
+
+        # Whole-buffer path (vectorized split)
+        offline = VoiceActivityDetector(sample_rate=rate, sample_width=width)
+        started = time.perf_counter()
+        offline_phrases = offline.split_phrases(pcm)
+        offline_seconds = time.perf_counter() - started
+
+        duration = len(pcm) / float(rate * width)
+        results.append({
+            "file": path,
+            "duration_s": round(duration, 3),
+            "bytes_untrimmed": len(pcm),
+            "stream": {
+                "phrases": len(phrases),
+                "phrase_durations_s": [round(len(p) / float(rate * width), 3) for p in phrases],
+                "bytes_uploaded": stream_stats["bytes_out"],
+                "bytes_saved": stream_stats["bytes_saved"],
+                "saved_ratio": stream_stats["saved_ratio"],
+                "forced_splits": stream_stats["forced_splits"],
+                "process_s": round(stream_seconds, 4),
+                "realtime_factor": round(stream_seconds / duration, 5) if duration else None
+            },
+            "offline": {
+                "phrases": len(offline_phrases),
+                "bytes_uploaded": offline.snapshot()["bytes_out"],
+                "saved_ratio": offline.snapshot()["saved_ratio"],
+                "process_s": round(offline_seconds, 4)
+            }
+        })
+    return {"benchmark": "vad", "results": results}
+
+
+def summarize(values):
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+        "p50_ms": round(LatencyTracer.percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(LatencyTracer.percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(LatencyTracer.percentile(ordered, 99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1)
+    }
+
+
+class StubGroqServer:
+    # Local stand-in for /openai/v1/chat/completions: fixed latency plus jitter, optional 429/5xx
+    # injection, and SSE streaming in chunked transfer encoding like the real API.
+    # With rpm/tpm set it enforces a quota that replenishes continuously over limit_window and sends
+    # Groq's x-ratelimit-* headers. prefill_ms adds time to first token per 1k prompt tokens, and a
+    # slow_rate share of requests stall for slow_ms before their first byte (an upstream tail).
+    def __init__(self, latency_ms=300, jitter_ms=50, token_ms=8, error_429=0.0, error_5xx=0.0, seed=0,
+                 rpm=0, tpm=0, limit_window=60.0, prefill_ms=50, slow_rate=0.0, slow_ms=3000):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.token_ms = token_ms
+        self.prefill_ms = prefill_ms
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.rpm = rpm
+        self.tpm = tpm
+        self.limit_window = limit_window
+        self.budget = {"requests": float(rpm), "tokens": float(tpm)}
+        self.budget_updated = time.monotonic()
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "injected_429": 0, "injected_5xx": 0, "connections": 0,
+                      "rate_limited": 0, "max_prompt_tokens": 0, "aborted": 0, "slowed": 0}
+        self.models = {}  # Requests per model
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse in GroqClient is exercised
+
+            def setup(self):
+                BaseHTTPRequestHandler.setup(self)
+                with stub.lock:
+                    stub.stats["connections"] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                stub.handle(self, json.loads(body or b"{}"))
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        # Clients drop streamed connections after [DONE]; that's expected, not worth a traceback
+        self.server.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.server.server_port}/openai/v1/chat/completions"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="stub-groq", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reply_for(self, messages):
+        system = messages[0].get("content", "") if messages else ""
+        user = messages[-1].get("content", "") if messages else ""
+        if "single-word tech topics" in system:
+            return json.dumps(["API", "Docker", "Cache", "Thread", "Index", "Queue", "Kubernetes", "HTTP"])
+        if "JSON array of objects" in system:
+            count = user.count("Question:")
+            return json.dumps([{"index": i, "feedback": "Covers the basics; add an example.", "score": 4}
+                               for i in range(1, count + 1)])
+        if "Feedback: <text>" in system:
+            return ("Feedback: Correct on the core idea and clearly explained. Mention one trade-off next time. "
+                    "| Score: 4/5 | Proctoring: None")
+        if "running summary" in system:
+            # Topics only, newest last, capped like a model asked for a short summary would be
+            current = re.search(r"Current summary: (.*?)\n", user)
+            topics = [] if not current or current.group(1) == "(empty)" else [current.group(1).replace("Discussed: ", "")]
+            topics += re.findall(r"^Q: (.*)$", user, re.MULTILINE)
+            return "Discussed: " + " ".join("; ".join(topics).split()[-120:])
+        return DEFAULT_ANSWER
+
+    def admit(self, cost):
+        # Quota check; returns (allowed, x-ratelimit-* headers). Caller holds the lock.
+        now = time.monotonic()
+        limits = {"requests": self.rpm, "tokens": self.tpm}
+        for name, limit in limits.items():
+            self.budget[name] = min(limit, self.budget[name] + (now - self.budget_updated) * limit / self.limit_window)
+        self.budget_updated = now
+        needed = {"requests": 1, "tokens": cost}
+        short = {name: needed[name] - self.budget[name] for name, limit in limits.items()
+                 if limit and self.budget[name] < needed[name]}
+        if not short:
+            for name in limits:
+                self.budget[name] -= needed[name]
+        headers = []
+        for name, limit in limits.items():
+            if limit:
+                # Reset is the time until the quota is whole again
+                reset = (limit - self.budget[name]) * self.limit_window / limit
+                headers += [(f"x-ratelimit-limit-{name}", str(limit)),
+                            (f"x-ratelimit-remaining-{name}", str(int(self.budget[name]))),
+                            (f"x-ratelimit-reset-{name}", f"{reset:.2f}s")]
+        if short:
+            wait = max(amount * self.limit_window / limits[name] for name, amount in short.items())
+            headers.append(("retry-after", f"{max(0.01, wait):.2f}"))
+        return not short, headers
+
+    def handle(self, request, payload):
+        messages = payload.get("messages") or []
+        text = self.reply_for(messages)
+        # Prompt (~4 chars per token) plus completion, counted up front like Groq's token quota
+        prompt_tokens = sum(len(message.get("content") or "") for message in messages) // 4
+        cost = prompt_tokens + len(text.split())
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["max_prompt_tokens"] = max(self.stats["max_prompt_tokens"], prompt_tokens)
+            model = payload.get("model") or ""
+            self.models[model] = self.models.get(model, 0) + 1
+            roll = self.rng.random()
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+            delay += prompt_tokens / 1000.0 * self.prefill_ms / 1000.0
+            if self.slow_rate and self.rng.random() < self.slow_rate:
+                delay += self.slow_ms / 1000.0
+                self.stats["slowed"] += 1
+            allowed, headers = self.admit(cost) if (self.rpm or self.tpm) else (True, [])
+            if not allowed:
+                self.stats["rate_limited"] += 1
+        if not allowed:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}})
+            self.send(request, 429, "application/json", body.encode('utf-8'), headers)
+            return
+        if roll < self.error_429 + self.error_5xx:
+            status = 429 if roll < self.error_429 else 503
+            with self.lock:
+                self.stats["injected_429" if status == 429 else "injected_5xx"] += 1
+            body = json.dumps({"error": {"message": "injected", "type": "rate_limit" if status == 429 else "server"}})
+            self.send(request, status, "application/json", body.encode('utf-8'), headers)
+            return
+        tokens = [token + " " for token in text.split(" ")]
+        time.sleep(delay)
+        if not payload.get("stream"):
+            time.sleep(len(tokens) * self.token_ms / 1000.0)
+            body = json.dumps({"choices": [{"message": {"role": "assistant", "content": text}}]})
+            self.send(request, 200, "application/json", body.encode('utf-8'), headers)
+            return
+        with self.lock:
+            self.stats["streamed"] += 1
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream")
+        request.send_header("Transfer-Encoding", "chunked")
+        for name, value in headers:
+            request.send_header(name, value)
+        request.end_headers()
+        events = [json.dumps({"choices": [{"delta": {"content": token}}]}) for token in tokens] + ["[DONE]"]
+        try:
+            for i, event in enumerate(events):
+                if i:
+                    time.sleep(self.token_ms / 1000.0)
+                data = f"data: {event}\n\n".encode('utf-8')
+                request.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                request.wfile.flush()
+            request.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            # The client hung up mid-answer (cancelled)
+            with self.lock:
+                self.stats["aborted"] += 1
+
+    @staticmethod
+    def send(request, status, content_type, body, headers=()):
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+
+class FakeTts:
+    # Stands in for the TTS backends: fixed request latency plus per-character cost; returns MP3-sized bytes
+    name = "fake"
+
+    def __init__(self, latency_ms=150, ms_per_char=0.5, chars_per_second=15, bytes_per_second=4000):
+        self.latency_ms = latency_ms
+        self.ms_per_char = ms_per_char
+        self.chars_per_second = chars_per_second
+        self.bytes_per_second = bytes_per_second
+        self.calls = 0
+
+    def available(self):
+        return True
+
+    def synthesize(self, text, lang=None, timeout=None):
+        self.calls += 1
+        time.sleep((self.latency_ms + self.ms_per_char * len(text)) / 1000.0)
+        size = max(64, int(len(text) / self.chars_per_second * self.bytes_per_second))
+        seed = hashlib.sha256(text.encode('utf-8')).digest()
+        return b"ID3" + (seed * (size // len(seed) + 1))[:size]
+
+    def duration(self, audio):
+        return len(audio) / float(self.bytes_per_second)
+
+
+class WavMicrophone:
+    # Stands in for sr.Microphone: the same context manager / stream.read(CHUNK) surface, paced like a
+    # live device. After the recording ends it keeps returning silence, as an idle room would.
+    CHUNK = 1024
+
+    def __init__(self, pcm, sample_rate, sample_width, speed=1.0):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = sample_width
+        self.pcm = pcm
+        self.speed = speed
+        self.offset = 0
+        self.stream = self
+        self.exhausted = threading.Event()
+        if not pcm:
+            self.exhausted.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read(self, frames):
+        size = frames * self.SAMPLE_WIDTH
+        chunk = self.pcm[self.offset: self.offset + size]
+        self.offset += len(chunk)
+        if len(chunk) < size:
+            self.exhausted.set()
+            chunk += b"\0" * (size - len(chunk))
+        seconds = frames / float(self.SAMPLE_RATE)
+        if self.exhausted.is_set():
+            time.sleep(seconds)  # Don't spin once only silence is left
+        elif self.speed > 0:
+            time.sleep(seconds / self.speed)
+        return chunk
+
+
+class StubRecognizer:
+    # Replaces recognize_google: phrase N gets transcript line N, after a latency that grows with audio length.
+    # Interim audio (the phrase so far) matches the final line with probability interim_match, else it is
+    # a truncated prefix, as when the speaker carries on after a short pause.
+    def __init__(self, transcripts, latency_ms=250, realtime_factor=0.1, interim_match=1.0, seed=0):
+        self.transcripts = list(transcripts)
+        self.latency_ms = latency_ms
+        self.realtime_factor = realtime_factor
+        self.interim_match = interim_match
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.next_index = 0
+
+    def tag(self, audio):
+        with self.lock:
+            audio.bench_index = self.next_index
+            self.next_index += 1
+
+    def tag_interim(self, audio):
+        # The phrase still forming becomes the next final one
+        with self.lock:
+            audio.bench_index = self.next_index
+            audio.bench_interim = self.rng.random() >= self.interim_match
+
+    def recognize(self, audio):
+        seconds = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+        time.sleep(self.latency_ms / 1000.0 + seconds * self.realtime_factor)
+        text = self.transcripts[getattr(audio, 'bench_index', 0) % len(self.transcripts)]
+        if getattr(audio, 'bench_interim', False):
+            words = text.split()
+            return " ".join(words[:max(1, len(words) * 3 // 5)])
+        return text
+
+
+class SimulatedBrowser:
+    # Takes the place of the page as a session's UI; plays audio in order on one thread like the
+    # page's event loop and reports playback start/end back to the backend exposes
+    def __init__(self, store, tts, playback_scale=0.0, session_id=None):
+        self.store = store
+        self.tts = tts
+        self.playback_scale = playback_scale
+        self.session_id = session_id
+        self.events = queue.Queue()
+        self.cond = threading.Condition()
+        self.log = []  # (monotonic time, kind, text)
+        self.stream_deltas = 0
+        self.generation = 0  # Bumped by stop_audio; older queued audio is dropped
+        self.connected = True  # Counts as an open push socket, so the reaper leaves the session alone
+        threading.Thread(target=self._run, name="browser", daemon=True).start()
+
+    def record(self, kind, text):
+        with self.cond:
+            self.log.append((time.monotonic(), kind, text))
+            self.cond.notify_all()
+
+    def wait_for_text(self, fragment, since, timeout):
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: any(t >= since and fragment in text for t, _, text in self.log), timeout)
+
+    def first(self, kind, text, since=0.0):
+        with self.cond:
+            return next((t for t, k, logged in self.log if k == kind and logged == text and t >= since), None)
+
+    def stop_audio(self):
+        # As the page's stopTtsQueue: drop queued and playing audio without reporting playback end
+        with self.cond:
+            self.generation += 1
+            self.cond.notify_all()
+        self.record("stopped", "")
+
+    def _enqueue(self, kind, url, is_last, clip):
+        with self.cond:
+            self.events.put((kind, url, is_last, clip, self.generation))
+
+    def update_ui(self, question, payload):
+        if question:
+            self.record("question", question)
+        if payload:
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                data = {"text": str(payload), "audio": None}
+            self.record("answer", data.get("text") or "")
+            if data.get("audio"):
+                self._enqueue("clip", data["audio"], True, data["audio"])
+
+    def update_ui_stream(self, stream_id, delta):
+        self.stream_deltas += 1
+
+    def queue_tts_audio(self, clip_id, seq, audio_url, is_last):
+        self._enqueue("segment" if seq else "clip", audio_url, is_last, clip_id)
+
+    def _run(self):
+        playing = False
+        while True:
+            kind, url, is_last, clip, generation = self.events.get()
+            if generation != self.generation:
+                playing = False
+                continue
+            if kind == "clip" or not playing:
+                self.record("playback", clip)
+                inter_ass.audio_playback_started(self.session_id)
+                playing = True
+            audio = self.store.get(url.rsplit('/', 1)[-1][:-4]) if url else None
+            if audio and self.playback_scale > 0:
+                with self.cond:
+                    stopped = self.cond.wait_for(lambda: self.generation != generation,
+                                                 self.tts.duration(audio) * self.playback_scale)
+                if stopped:
+                    playing = False
+                    continue
+            if is_last:
+                playing = False
+                inter_ass.audio_playback_ended(self.session_id)
+
+
+def synth_utterances(count, sample_rate=16000, seed=0, gap_s=2.5):
+    # Voiced-speech-like bursts (harmonics with syllable-rate envelope) over a low noise floor
+    rng = np.random.default_rng(seed)
+    parts = [rng.normal(0, 30, int(sample_rate * 1.0))]
+    for _ in range(count):
+        seconds = rng.uniform(1.2, 2.4)
+        t = np.arange(int(sample_rate * seconds)) / float(sample_rate)
+        f0 = rng.uniform(110, 190)
+        voice = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 5))
+        envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4.0 * t) ** 2
+        parts.append(voice * envelope * 3000 + rng.normal(0, 30, len(t)))
+        parts.append(rng.normal(0, 30, int(sample_rate * gap_s)))
+    return np.clip(np.concatenate(parts), -32768, 32767).astype('<i2').tobytes(), sample_rate, 2
+
+
+def read_transcripts(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def make_scheduler(stub, pacing=True):
+    # Budgets seeded with the stub's quota, as GROQ_RPM/GROQ_TPM would be for a real account tier
+    scheduler = RateLimitScheduler(enabled=pacing)
+    scheduler.rpm = TokenBucket(stub.rpm or 10 ** 6, stub.limit_window)
+    scheduler.tokens = TokenBucket(stub.tpm or 10 ** 9, stub.limit_window)
+    return scheduler
+
+
+def build_shared(stub, cache_dir, workers=None, pacing=True):
+    # Process-wide resources pointed at the stand-ins; caches and interview results live in cache_dir
+    components = {"tts_cache": TtsCache(cache_dir=cache_dir), "response_cache": ResponseCache(),
+                  "results": ResultsStore(os.path.join(cache_dir, "results.db"))}
+    if workers:
+        shared = SharedResources(tts_workers=workers, prefetch_workers=max(2, workers // 2),
+                                 evaluation_workers=max(2, workers // 2), http_pool=workers * 2, **components)
+    else:
+        shared = SharedResources(**components)
+    shared.scheduler = make_scheduler(stub, pacing)
+    shared.groq = GroqClient(url=stub.url, pool_size=shared.groq.pool_size, scheduler=shared.scheduler)
+    shared.tracer = LatencyTracer()
+    return shared
+
+
+def prepare_session(assistant, tts):
+    assistant.api_key = "gsk_benchmark"
+    assistant.tts_router = TtsRouter([tts])
+
+
+def build_assistant(stub, tts, browser_scale, cache_dir, pacing=True, workers=None):
+    # A real desktop-mode AudioAssistant wired to the stand-ins; eel.start is never called
+    shared = build_shared(stub, cache_dir, workers=workers, pacing=pacing)
+    browser = SimulatedBrowser(shared.audio_store, tts, browser_scale)
+    assistant = AudioAssistant(shared, ui=browser)
+    inter_ass.assistant = assistant
+    prepare_session(assistant, tts)
+    return assistant, browser
+
+
+def attach_microphone(assistant, mic, recognizer):
+    assistant.mic = mic
+    assistant.recognize_audio = recognizer.recognize
+    enqueue = assistant.enqueue_audio
+
+    def enqueue_tagged(audio, trace=NULL_TRACE):
+        recognizer.tag(audio)
+        enqueue(audio, trace)
+    assistant.enqueue_audio = enqueue_tagged
+    speculate = assistant.start_speculation
+
+    def speculate_tagged(audio, epoch):
+        recognizer.tag_interim(audio)
+        speculate(audio, epoch)
+    assistant.start_speculation = speculate_tagged
+
+
+def wait_until(predicate, timeout, settle=0.0, poll=0.05):
+    # True once predicate has held continuously for `settle` seconds
+    deadline = time.monotonic() + timeout
+    held_since = None
+    while time.monotonic() < deadline:
+        if predicate():
+            held_since = held_since or time.monotonic()
+            if time.monotonic() - held_since >= settle:
+                return True
+        else:
+            held_since = None
+        time.sleep(poll)
+    return False
+
+
+def collect_report(name, config, assistant, stub, tts, started, extra):
+    report = {
+        "benchmark": name,
+        "config": config,
+        "wall_s": round(time.monotonic() - started, 3)
+    }
+    report.update(extra)
+    report["latency"] = assistant.tracer.summary(recent=0)["stages"]
+    report["groq_stub"] = dict(stub.stats)
+    report["rate_limit"] = assistant.groq.scheduler.snapshot()
+    report["tts"] = {"synth_calls": tts.calls, "cache": assistant.tts_cache.snapshot()}
+    report["response_cache"] = assistant.response_cache.snapshot()
+    report["audio_store"] = assistant.audio_store.snapshot()
+    report["capture"] = assistant.capture_snapshot()
+    report["cancellation"] = assistant.cancellation_snapshot()
+    assistant.results.flush()
+    report["results_store"] = assistant.results.snapshot()
+    return report
+
+
+def bench_qa(args):
+    # Full spoken Q&A: WAV "microphone" -> VAD -> stub STT -> stub Groq (streamed) -> fake TTS -> browser
+    transcripts = read_transcripts(args.transcripts) if args.transcripts else DEFAULT_QUESTIONS
+    if args.wav:
+        pcm, rate, width = read_wav(args.wav)
+    else:
+        pcm, rate, width = synth_utterances(args.utterances, seed=args.seed)
+    stub = make_stub(args).start()
+    tts = FakeTts(args.tts_ms)
+    cache_dir = tempfile.mkdtemp(prefix="bench-tts-")
+    try:
+        assistant, browser = build_assistant(stub, tts, args.playback_scale, cache_dir, not args.no_pacing)
+        assistant.speculation_enabled = not args.no_speculation
+        recognizer = StubRecognizer(transcripts, args.stt_ms, interim_match=args.interim_match, seed=args.seed)
+        mic = WavMicrophone(pcm, rate, width, speed=args.mic_speed)
+        attach_microphone(assistant, mic, recognizer)
+        started = time.monotonic()
+        assistant.start_listening()
+
+        def drained():
+            counts = assistant.tracer.counts
+            return (mic.exhausted.is_set() and assistant.capture_queue.qsize() == 0
+                    and assistant.capture_seq == assistant.next_delivery_seq
+                    and assistant.state.audio == "idle" and assistant.playback_trace is None
+                    and counts["started"] == counts["finished"])
+        # Settle past the VAD pause so a trailing phrase is still emitted
+        completed = wait_until(drained, args.timeout, settle=assistant.vad.pause_ms / 1000.0 + 0.5)
+        assistant.state.transition("benchmark finished", listening=False)
+        wall = time.monotonic() - started
+        answered = sum(1 for _, kind, _ in browser.log if kind == "answer")
+        audio_seconds = len(pcm) / float(rate * width)
+        extra = {
+            "completed": completed,
+            "audio_s": round(audio_seconds, 3),
+            "phrases": assistant.capture_seq,
+            "answers": answered,
+            "throughput_answers_per_min": round(answered / wall * 60, 2) if wall else None,
+            "stream_deltas": browser.stream_deltas,
+            "speculation": assistant.speculation_snapshot()
+        }
+        return collect_report("qa", vars_for_report(args), assistant, stub, tts, started, extra)
+    finally:
+        stub.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_interview(args):
+    # Full interviews: start_interview -> (answer transcript, complete_answer) x N -> score summary
+    stub = make_stub(args).start()
+    tts = FakeTts(args.tts_ms)
+    cache_dir = tempfile.mkdtemp(prefix="bench-tts-")
+    try:
+        assistant, browser = build_assistant(stub, tts, args.playback_scale, cache_dir, not args.no_pacing)
+        # Mic stays open on silence; answers are injected as recognized transcripts
+        attach_microphone(assistant, WavMicrophone(b"", 16000, 2), StubRecognizer([""]))
+        started = time.monotonic()
+        results = run_interviews(assistant, browser, args)
+        assistant.state.transition("benchmark finished", listening=False)
+        wall = time.monotonic() - started
+        extra = {
+            "interviews_completed": results["completed"],
+            "first_question": summarize(results["first_question"]),
+            "answer_to_next_question": summarize(results["answer_to_next_question"]),
+            "interview_duration": summarize(results["interview_duration"]),
+            "throughput_answers_per_min": round(len(results["answer_to_next_question"]) / wall * 60, 2) if wall else None
+        }
+        return collect_report("interview", vars_for_report(args), assistant, stub, tts, started, extra)
+    finally:
+        stub.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def run_interviews(assistant, browser, args):
+    # Drives the same exposes the page calls, for this assistant's session
+    session_id = assistant.session_id
+    assistant.interview_countdown = 0
+    assistant.questions_limit = args.questions
+    assistant.evaluation_mode = args.mode
+    state = assistant.state
+    results = {"completed": 0, "first_question": [], "answer_to_next_question": [], "interview_duration": []}
+    for _ in range(args.interviews):
+        run_started = time.monotonic()
+        inter_ass.start_interview(session_id)
+        results["first_question"].append(time.monotonic() - run_started)
+        finished = False
+        for index in range(assistant.questions_limit):
+            with state.cond:
+                if not state.cond.wait_for(lambda: state.interview == "question"
+                                           and assistant.current_question_index == index, args.timeout):
+                    break
+            assistant.handle_transcript(DEFAULT_ANSWER)
+            answered = time.monotonic()
+            inter_ass.complete_answer(session_id)
+            with state.cond:
+                # Next question shown (or the interview wrapped up)
+                if not state.cond.wait_for(lambda: state.interview == "inactive"
+                                           or assistant.current_question_index > index, args.timeout):
+                    break
+            results["answer_to_next_question"].append(time.monotonic() - answered)
+        else:
+            finished = browser.wait_for_text("Interview completed", run_started, args.timeout)
+        if finished:
+            results["completed"] += 1
+            results["interview_duration"].append(time.monotonic() - run_started)
+        inter_ass.stop_interview(session_id)
+    return results
+
+
+def measure_session_memory(shared, count=100):
+    # Python heap retained per idle session (state machine, VAD, buffers, push channel)
+    registry = SessionRegistry(shared, max_sessions=count)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = [registry.open() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    for session in sessions:
+        registry.close(session.session_id)
+    return int(grown / count)
+
+
+def bench_sessions(args):
+    # Load test: N concurrent candidates, each with its own session, over one set of shared resources
+    stub = make_stub(args).start()
+    tts = FakeTts(args.tts_ms)
+    cache_dir = tempfile.mkdtemp(prefix="bench-tts-")
+    runs = []
+    try:
+        for count in args.sessions:
+            shared = build_shared(stub, cache_dir, workers=args.workers, pacing=not args.no_pacing)
+            registry = SessionRegistry(shared, max_sessions=count)
+            inter_ass.registry = registry
+            requests_before = stub.stats["requests"]
+            clients = []
+            for _ in range(count):
+                session = registry.open()
+                prepare_session(session, tts)
+                # The simulated page replaces the push socket for this session
+                session.ui = SimulatedBrowser(shared.audio_store, tts, args.playback_scale, session.session_id)
+                clients.append(session)
+            outcomes = [None] * count
+
+            def client(i):
+                outcomes[i] = run_interviews(clients[i], clients[i].ui, args)
+            started = time.monotonic()
+            threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(args.timeout * (args.questions + 2))
+            wall = time.monotonic() - started
+            merged = {"completed": 0, "first_question": [], "answer_to_next_question": [], "interview_duration": []}
+            for outcome in outcomes:
+                if outcome is None:
+                    continue
+                merged["completed"] += outcome["completed"]
+                for key in ("first_question", "answer_to_next_question", "interview_duration"):
+                    merged[key].extend(outcome[key])
+            answers = len(merged["answer_to_next_question"])
+            runs.append({
+                "sessions": count,
+                "wall_s": round(wall, 3),
+                "interviews_completed": merged["completed"],
+                "interviews_expected": count * args.interviews,
+                "answers": answers,
+                "throughput_answers_per_min": round(answers / wall * 60, 2) if wall else None,
+                "first_question": summarize(merged["first_question"]),
+                "answer_to_next_question": summarize(merged["answer_to_next_question"]),
+                "interview_duration": summarize(merged["interview_duration"]),
+                "llm_requests": stub.stats["requests"] - requests_before,
+                "rate_limit": shared.scheduler.snapshot(),
+                "latency": shared.tracer.summary(recent=0)["stages"],
+                "registry": registry.snapshot(),
+                "threads": threading.active_count()
+            })
+            for session in clients:
+                registry.close(session.session_id)
+            inter_ass.registry = None
+        return {
+            "benchmark": "sessions",
+            "config": vars_for_report(args),
+            "runs": runs,
+            "session_memory_bytes": measure_session_memory(build_shared(stub, cache_dir)),
+            "groq_stub": dict(stub.stats)
+        }
+    finally:
+        stub.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_ratelimit(args):
+    # Quota-bound burst: background topic generation queued at once, live questions arriving steadily,
+    # all against a stub that enforces --rpm/--tpm. Compare with --no-pacing (react to 429s only).
+    stub = make_stub(args).start()
+    groq = GroqClient(url=stub.url, pool_size=args.concurrency, scheduler=make_scheduler(stub, not args.no_pacing))
+    results = {"live": [], "background": []}
+    failures = {"live": 0, "background": 0}
+    lock = threading.Lock()
+    live_messages = [{"role": "system", "content": "You are a helpful assistant."},
+                     {"role": "user", "content": DEFAULT_QUESTIONS[0]}]
+    background_messages = [
+        {"role": "system", "content": "You generate beginner-friendly single-word tech topics (e.g., 'API', 'Docker', "
+                                      "'HTML'). Return ONLY a JSON array of single-word strings."},
+        {"role": "user", "content": "Generate 5 distinct one-word tech terms."}
+    ]
+
+    def call(kind, messages, priority):
+        submitted = time.monotonic()
+        try:
+            groq.chat("gsk_benchmark", messages, timeout=args.timeout, priority=priority)
+        except Exception:
+            with lock:
+                failures[kind] += 1
+            return
+        with lock:
+            results[kind].append(time.monotonic() - submitted)
+
+    try:
+        started = time.monotonic()
+        threads = [threading.Thread(target=call, args=("background", background_messages, RateLimitScheduler.BACKGROUND),
+                                    daemon=True) for _ in range(args.background)]
+        for thread in threads:
+            thread.start()
+        for _ in range(args.live):
+            thread = threading.Thread(target=call, args=("live", live_messages, RateLimitScheduler.LIVE), daemon=True)
+            thread.start()
+            threads.append(thread)
+            time.sleep(args.live_interval_ms / 1000.0)
+        for thread in threads:
+            thread.join(args.timeout)
+        wall = time.monotonic() - started
+        return {
+            "benchmark": "ratelimit",
+            "config": vars_for_report(args),
+            "wall_s": round(wall, 3),
+            "live": dict(summarize(results["live"]), failed=failures["live"]),
+            "background": dict(summarize(results["background"]), failed=failures["background"]),
+            "scheduler": groq.scheduler.snapshot(),
+            "groq_stub": dict(stub.stats)
+        }
+    finally:
+        stub.stop()
+
+
+def bench_hedge(args):
+    # Live streamed answers against a stub with a slow tail (--slow-rate/--slow-ms): time to first token
+    # and to the whole answer, hedges fired and won, and the requests they cost. Compare with --no-hedge.
+    stub = make_stub(args).start()
+    hedger = RequestHedger(enabled=not args.no_hedge, max_ratio=args.hedge_ratio)
+    groq = GroqClient(url=stub.url, pool_size=args.concurrency * 2, scheduler=make_scheduler(stub, not args.no_pacing),
+                      hedger=hedger)
+    first_token, answered = [], []
+    failures = [0]
+    lock = threading.Lock()
+
+    def call(i):
+        messages = [{"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": DEFAULT_QUESTIONS[i % len(DEFAULT_QUESTIONS)]}]
+        submitted = time.monotonic()
+        first = []
+
+        def on_delta(delta):
+            if not first:
+                first.append(time.monotonic() - submitted)
+        try:
+            groq.chat("gsk_benchmark", messages, timeout=args.timeout, on_delta=on_delta)
+        except Exception:
+            with lock:
+                failures[0] += 1
+            return
+        with lock:
+            answered.append(time.monotonic() - submitted)
+            first_token.extend(first)
+
+    try:
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(call, range(args.calls)))
+        wall = time.monotonic() - started
+        stub_stats = dict(stub.stats)
+        return {
+            "benchmark": "hedge",
+            "config": vars_for_report(args),
+            "wall_s": round(wall, 3),
+            "first_token": summarize(first_token),
+            "answer": dict(summarize(answered), failed=failures[0]),
+            "requests_per_call": round(stub_stats["requests"] / float(args.calls), 3) if args.calls else 0.0,
+            "hedging": hedger.snapshot(),
+            "groq_stub": dict(stub_stats, models=dict(stub.models)),
+            "scheduler": groq.scheduler.snapshot()
+        }
+    finally:
+        stub.stop()
+
+
+def bench_conversation(args):
+    # Long typed Q&A session alternating new questions and follow-ups: prompt size and LLM latency over
+    # time with the memory budget, or with every turn kept (--unbounded)
+    stub = make_stub(args).start()
+    tts = FakeTts(args.tts_ms)
+    cache_dir = tempfile.mkdtemp(prefix="bench-tts-")
+    try:
+        assistant, browser = build_assistant(stub, tts, args.playback_scale, cache_dir, not args.no_pacing)
+        assistant.tts_enabled = False
+        # Every turn reaches the model, so repeats of a question don't hide the prompt cost
+        assistant.response_cache = ResponseCache(max_items=0)
+        assistant.memory.budget_tokens = 10 ** 9 if args.unbounded else args.budget
+        turns = []
+        for i in range(args.turns):
+            if i % 2:
+                turns.append(FOLLOW_UPS[(i // 2) % len(FOLLOW_UPS)])
+            else:
+                turns.append(DEFAULT_QUESTIONS[(i // 2) % len(DEFAULT_QUESTIONS)])
+        per_turn = []
+        started = time.monotonic()
+        for question in turns:
+            asked = time.monotonic()
+            inter_ass.ask_question(question)
+            per_turn.append(time.monotonic() - asked)
+        wait_until(lambda: not assistant.memory.folding and not assistant.memory.pending, args.timeout)
+        prompts = list(assistant.memory.prompt_tokens)
+        window = max(1, min(args.window, len(per_turn) // 2))
+        extra = {
+            "turns": len(turns),
+            "first_turns": dict(summarize(per_turn[:window]), prompt_tokens=prompts[:window]),
+            "last_turns": dict(summarize(per_turn[-window:]), prompt_tokens=prompts[-window:]),
+            "memory": assistant.memory.snapshot(),
+            "summary": assistant.memory.summary
+        }
+        return collect_report("conversation", vars_for_report(args), assistant, stub, tts, started, extra)
+    finally:
+        stub.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_cancel(args):
+    # Each round asks a question, then supersedes it mid-answer with the next one (as a barge-in or a typed
+    # follow-up does): how soon the new answer plays, and what the abandoned one still costs.
+    # --no-cancel lets superseded work run to the end, as when stopping only flipped flags.
+    stub = make_stub(args).start()
+    tts = FakeTts(args.tts_ms)
+    cache_dir = tempfile.mkdtemp(prefix="bench-tts-")
+    try:
+        assistant, browser = build_assistant(stub, tts, args.playback_scale, cache_dir, not args.no_pacing,
+                                             workers=args.tts_workers)
+        # Every question reaches the model and the synthesizer (the stub's answers are all alike)
+        assistant.response_cache = ResponseCache(max_items=0)
+        assistant.tts_cache = TtsCache(cache_dir=cache_dir, max_memory_items=0, max_disk_bytes=0)
+        if args.no_cancel:
+            assistant.begin_work = lambda: WorkHandle()
+            assistant.is_stale = lambda handle: False
+        next_audio, late_pushes, late_audio = [], 0, 0
+        started = time.monotonic()
+        for i in range(args.rounds):
+            first = {}
+
+            def ask_first():
+                first["response"] = json.loads(inter_ass.ask_question(DEFAULT_QUESTIONS[2 * i % len(DEFAULT_QUESTIONS)]))
+                first["done"] = time.monotonic()
+            thread = threading.Thread(target=ask_first, daemon=True)
+            thread.start()
+            time.sleep(args.supersede_after_ms / 1000.0)
+            asked = time.monotonic()
+            response = json.loads(inter_ass.ask_question(DEFAULT_QUESTIONS[(2 * i + 1) % len(DEFAULT_QUESTIONS)]))
+            clip = response.get("clip") or response.get("audio")
+            with browser.cond:
+                browser.cond.wait_for(lambda: browser.first("playback", clip, asked) is not None, args.timeout)
+            played = browser.first("playback", clip, asked)
+            if played is not None:
+                next_audio.append(played - asked)
+            thread.join(args.timeout)
+            if first.get("done", 0) > asked and first["response"].get("text") != "Cancelled.":
+                late_pushes += 1
+            first_clip = first.get("response", {}).get("clip") or first.get("response", {}).get("audio")
+            if first_clip and browser.first("playback", first_clip, asked) is not None:
+                late_audio += 1
+            # Let leftover work finish before the next round
+            wait_until(lambda: assistant.tts_executor._work_queue.qsize() == 0, args.timeout, settle=0.3)
+        extra = {
+            "rounds": args.rounds,
+            "next_answer_audio": summarize(next_audio),
+            "superseded_pushed_late": late_pushes,
+            "superseded_audio_played": late_audio
+        }
+        return collect_report("cancel", vars_for_report(args), assistant, stub, tts, started, extra)
+    finally:
+        stub.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+# Scripted camera timeline: (kind, start_s, end_s); "present" spans are the candidate sitting still
+CAMERA_SCRIPT = [("present", 0, 15), ("absent", 15, 25), ("present", 25, 35), ("frozen", 35, 45),
+                 ("dark", 45, 52), ("present", 52, 58), ("movement", 58, 70)]
+
+
+def synth_frames(fps=2.0, width=80, height=60, seed=0, script=CAMERA_SCRIPT):
+    # Textured background plus an oval "face" with darker eye/mouth bands; sensor noise on every frame
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    background = 90 + 40 * xs / width + rng.normal(0, 6, (height, width)).astype(np.float32)
+    background[:, ::9] += 25  # Shelving / door-frame edges
+
+    def face_at(dx, dy):
+        cx, cy = width / 2 + dx, height / 2 + dy
+        frame = background.copy()
+        inside = ((xs - cx) / (width * 0.16)) ** 2 + ((ys - cy) / (height * 0.3)) ** 2 <= 1
+        frame[inside] = 185
+        for band_y, half in ((cy - height * 0.08, 2), (cy + height * 0.12, 1.5)):
+            frame[inside & (np.abs(ys - band_y) <= half)] = 70
+        frame[inside & (np.abs(xs - cx) <= 1) & (np.abs(ys - cy) <= 4)] = 130  # Nose ridge
+        return frame
+
+    frames = []
+    frozen = None
+    total = script[-1][2]
+    for i in range(int(total * fps)):
+        t = i / fps
+        kind = next(kind for kind, start, end in script if start <= t < end)
+        if kind == "frozen":
+            frozen = frozen if frozen is not None else frames[-1]
+            frames.append(frozen)
+            continue
+        frozen = None
+        if kind == "present":
+            frame = face_at(rng.normal(0, 0.8), rng.normal(0, 0.5))
+        elif kind == "absent":
+            frame = background.copy()
+        elif kind == "dark":
+            frame = np.full((height, width), 6.0, dtype=np.float32)
+        else:
+            frame = face_at(rng.uniform(-width * 0.3, width * 0.3), rng.uniform(-height * 0.15, height * 0.15))
+        frame = frame + rng.normal(0, 2.0, frame.shape)
+        frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return np.stack(frames)
+
+
+def encode_frame(frame):
+    # The page's wire format: uint16 width, uint16 height (little-endian), then grayscale bytes
+    height, width = frame.shape
+    return np.array([width, height], dtype='<u2').tobytes() + np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+
+
+def bench_proctor(args):
+    # Replays a frame sequence through one engine per simulated session at the page's frame rate
+    if args.frames:
+        frames = np.load(args.frames)
+        script = None
+    else:
+        frames = synth_frames(args.fps, seed=args.seed)
+        script = CAMERA_SCRIPT
+    payloads = [encode_frame(frame) for frame in frames]
+    emitted = []
+    engines = []
+    for i in range(args.sessions):
+        engine = ProctoringEngine(cpu_budget=args.cpu_budget)
+        if i == 0:
+            engine.on_note = lambda note: emitted.append((round(clock[0], 2), note))
+        engines.append(engine)
+    clock = [0.0]
+    per_frame = []
+    started = time.perf_counter()
+    for index, payload in enumerate(payloads):
+        clock[0] = index / args.fps
+        for engine in engines:
+            began = time.perf_counter()
+            if engine.submit(payload, now=clock[0]):
+                per_frame.append(time.perf_counter() - began)
+    wall = time.perf_counter() - started
+    stats = engines[0].snapshot()
+    report = {
+        "benchmark": "proctor",
+        "config": vars_for_report(args),
+        "frames": len(payloads),
+        "frame_shape": list(frames.shape[1:]),
+        "analysis": summarize(per_frame),
+        "wall_s": round(wall, 3),
+        "video_s": round(len(payloads) / args.fps, 1),
+        # Sessions one core could keep up with at this frame rate
+        "sessions_per_core": round(1.0 / (args.fps * sum(per_frame) / len(per_frame)), 1) if per_frame else None,
+        "engine": {key: stats[key] for key in ("frames_in", "analyzed", "skipped_rate", "skipped_budget",
+                                               "rejected", "notes", "cpu_ms", "ms_per_frame")},
+        "notes": emitted
+    }
+    if script:
+        detections = {}
+        for kind, start, end in script:
+            if kind == "present":
+                continue
+            label = ProctoringEngine.LABELS[kind]
+            hits = [t for t, note in emitted if note.startswith(label) and start <= t <= end]
+            detections[f"{kind}@{start}s"] = {"detected": bool(hits),
+                                              "latency_s": round(hits[0] - start, 2) if hits else None}
+        spans = [(ProctoringEngine.LABELS[kind], start, end) for kind, start, end in script if kind != "present"]
+        report["detections"] = detections
+        report["false_notes"] = [note for t, note in emitted
+                                 if not any(note.startswith(label) and start <= t <= end for label, start, end in spans)]
+    return report
+
+
+# An answer as split_tts_chunks delivers it: a short first chunk, then packed sentences
+TTS_SAMPLE_ANSWER = [
+    "A message queue decouples the service that produces work from the one that does it.",
+    "The producer returns as soon as the message is stored, so bursts are absorbed instead of overloading "
+    "the consumer, and a consumer that crashes picks the message up again after a restart.",
+    "The cost is another moving part to run, and eventual rather than immediate processing."
+]
+
+MPEG_BITRATES = {1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+                 2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]}
+MPEG_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def audio_seconds(audio):
+    # Playback length of a WAV (header) or MP3 (Layer III frame walk) clip; None if neither parses
+    if audio[:4] == b"RIFF":
+        try:
+            with wave.open(io.BytesIO(audio), "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except (wave.Error, EOFError):
+            return None
+    offset = 0
+    if audio[:3] == b"ID3":
+        offset = 10 + ((audio[6] & 0x7f) << 21 | (audio[7] & 0x7f) << 14 | (audio[8] & 0x7f) << 7 | audio[9] & 0x7f)
+    seconds = 0.0
+    frames = 0
+    while offset + 4 <= len(audio):
+        b1, b2 = audio[offset + 1], audio[offset + 2]
+        version = (b1 >> 3) & 3
+        if audio[offset] != 0xff or (b1 & 0xe0) != 0xe0 or version == 1 or (b1 >> 1) & 3 != 1:
+            offset += 1
+            continue
+        bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 3
+        if bitrate_index in (0, 15) or rate_index == 3:
+            offset += 1
+            continue
+        mpeg1 = version == 3
+        bitrate = MPEG_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+        rate = MPEG_SAMPLE_RATES[version][rate_index]
+        samples = 1152 if mpeg1 else 576
+        seconds += samples / float(rate)
+        frames += 1
+        offset += samples // 8 * bitrate // rate + ((b2 >> 1) & 1)
+    return seconds if frames else None
+
+
+def bench_tts(args):
+    # Every clip of a sample session through each backend on its own, then through the router
+    texts = [f"{question}?" for question in DEFAULT_QUESTIONS] + TTS_SAMPLE_ANSWER
+    backends = [TTS_BACKENDS[name]() for name in args.backends]
+    if args.fake:
+        # Last-resort stand-in so the fallback path can be exercised without any engine installed
+        backends.append(FakeTts(args.tts_ms))
+    report = {"benchmark": "tts", "config": {"backends": [backend.name for backend in backends], "clips": len(texts),
+                                             "repeat": args.repeat, "lang": args.lang, "timeout": args.timeout}}
+    results = {}
+    for backend in backends:
+        result = {"available": bool(backend.available())}
+        results[backend.name] = result
+        if not result["available"]:
+            continue
+        times, errors = [], []
+        audio_s = 0.0
+        audio_bytes = 0
+        formats = set()
+        for _ in range(args.repeat):
+            for text in texts:
+                started = time.perf_counter()
+                try:
+                    audio = backend.synthesize(text, args.lang, timeout=args.timeout)
+                except Exception as e:
+                    errors.append(str(e)[:200])
+                    continue
+                times.append(time.perf_counter() - started)
+                seconds = audio_seconds(audio)
+                if isinstance(backend, FakeTts):
+                    seconds = backend.duration(audio)
+                formats.add(inter_ass.audio_format(audio)[0])
+                audio_bytes += len(audio)
+                audio_s += seconds or 0.0
+        result.update({"clips": len(times), "errors": len(errors), "error_samples": sorted(set(errors))[:3],
+                       "synth": summarize(times), "formats": sorted(formats), "audio_s": round(audio_s, 2),
+                       "bytes": audio_bytes})
+        if times:
+            result["first_clip_ms"] = round(times[0] * 1000, 1)
+        if audio_s:
+            result["bytes_per_audio_s"] = round(audio_bytes / audio_s)
+            # Seconds of synthesis per second of speech; below 1 means faster than real time
+            result["realtime_factor"] = round(sum(times) / audio_s, 3)
+    report["backends"] = results
+
+    router = TtsRouter(backends, latency_budget_ms=args.latency_budget_ms, timeout=args.timeout)
+    served, times, failed = {}, [], 0
+    for text in texts:
+        started = time.perf_counter()
+        try:
+            _, name = router.synthesize(text, args.lang)
+        except Exception:
+            failed += 1
+            continue
+        times.append(time.perf_counter() - started)
+        served[name] = served.get(name, 0) + 1
+    report["router"] = {"served_by": served, "failed": failed, "synth": summarize(times),
+                        "state": router.snapshot()}
+    return report
+
+
+RESULTS_TOPICS = ["REST APIs", "Python garbage collection", "Processes and threads", "Message queues",
+                  "Database indexes", "Race conditions", "Eventual consistency", "Load balancers"]
+
+
+def fill_results(store, rows, candidates, questions=5, seed=0):
+    # Interviews as a long-running server accumulates them: many candidates, every topic
+    rng = random.Random(seed)
+    now = time.time()
+    interview_id = None
+    for i in range(rows):
+        index = i % questions
+        if index == 0:
+            interview_id = f"bench-{i // questions}"
+            store.start_interview(interview_id, f"candidate-{rng.randrange(candidates)}", None, "async",
+                                  rng.sample(RESULTS_TOPICS, questions))
+        store.record_answer(interview_id, index, f"candidate-{rng.randrange(candidates)}", rng.choice(RESULTS_TOPICS),
+                            DEFAULT_ANSWER, [])
+        store.record_feedback(interview_id, index, "Score: 4/5. Clear and accurate.", 4.0)
+        if index == questions - 1:
+            store.finish_interview(interview_id, "completed", 20.0, questions * 5.0, "Interview completed.")
+    return now
+
+
+def bench_results(args):
+    # Answer-path cost of persisting a result (queued vs committed inline), writer throughput, indexed
+    # queries by candidate/topic/date, and export memory (keyset pages vs one fetchall)
+    work_dir = tempfile.mkdtemp(prefix="bench-results-")
+    try:
+        store = ResultsStore(os.path.join(work_dir, "results.db"), batch_size=args.batch_size,
+                             max_queue=args.rows * 4 + 16)
+        enqueue_times = []
+        for i in range(args.latency_samples):
+            t0 = time.perf_counter()
+            store.record_answer("latency", i, "candidate-0", RESULTS_TOPICS[0], DEFAULT_ANSWER, [])
+            enqueue_times.append(time.perf_counter() - t0)
+        store.flush(timeout=args.timeout)
+
+        # What complete_answer would pay writing inline: one INSERT and a commit per answer
+        inline = sqlite3.connect(os.path.join(work_dir, "inline.db"))
+        inline.execute("PRAGMA journal_mode=WAL")
+        inline.execute("PRAGMA synchronous=" + ("FULL" if args.full_sync else "NORMAL"))
+        for statement in ResultsStore.SCHEMA:
+            inline.execute(statement)
+        inline_times = []
+        for i in range(args.latency_samples):
+            t0 = time.perf_counter()
+            with inline:
+                inline.execute("INSERT INTO answers (interview_id, question_index, candidate, topic, answer, "
+                               "proctoring, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               ("latency", i, "candidate-0", RESULTS_TOPICS[0], DEFAULT_ANSWER, "[]", time.time()))
+            inline_times.append(time.perf_counter() - t0)
+        inline.close()
+
+        fill_started = time.perf_counter()
+        now = fill_results(store, args.rows, args.candidates, seed=args.seed)
+        fill_enqueue_s = time.perf_counter() - fill_started
+        store.flush(timeout=args.timeout)
+        fill_s = time.perf_counter() - fill_started
+        written = store.snapshot()
+        # Rows are stamped with the time they were written; spread them back over the last 90 days
+        with sqlite3.connect(store.path) as db:
+            db.execute("UPDATE answers SET created = ? - (id * 7919 % 90) * 86400 - id % 86400", (now,))
+
+        reader = store.connect()
+        day = 86400
+        queries = {
+            "candidate": ("candidate-7", None, None, None),
+            "topic": (None, "database indexes", None, None),
+            "last_7_days": (None, None, now - 7 * day, None),
+            "candidate_and_topic": ("candidate-7", "race conditions", None, None)
+        }
+        query_report = {}
+        for name, (candidate, topic, since, until) in queries.items():
+            clauses, params = store.query(candidate, topic, since, until)
+            sql = "SELECT count(*) FROM answers a WHERE " + " AND ".join(clauses)
+            times = []
+            for _ in range(args.query_repeat):
+                t0 = time.perf_counter()
+                count = reader.execute(sql, params).fetchone()[0]
+                times.append(time.perf_counter() - t0)
+            plan = [row[-1] for row in reader.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            query_report[name] = {"rows": count, "query": summarize(times), "plan": plan}
+        reader.close()
+
+        def export_peak(paged):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            count = 0
+            if paged:
+                for row in store.iter_answers(page_size=args.page_size):
+                    json.dumps(row)
+                    count += 1
+            else:
+                db = store.connect()
+                rows = db.execute("SELECT a.*, i.status, i.mode, i.score, i.possible FROM answers a "
+                                  "JOIN interviews i ON i.id = a.interview_id ORDER BY a.id").fetchall()
+                for row in rows:
+                    json.dumps(row)
+                    count += 1
+                db.close()
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return {"rows": count, "wall_s": round(elapsed, 3), "peak_bytes": peak}
+        export = {"paged": export_peak(True), "fetchall": export_peak(False)}
+        return {
+            "benchmark": "results",
+            "config": vars_for_report(args),
+            "answer_path": {"queued": summarize(enqueue_times), "inline_commit": summarize(inline_times)},
+            "fill": {"rows": args.rows, "enqueue_s": round(fill_enqueue_s, 3), "committed_s": round(fill_s, 3),
+                     "writes_per_s": round(args.rows * 3 / fill_s) if fill_s else None},
+            "writer": written,
+            "queries": query_report,
+            "export": export,
+            "db_bytes": sum(os.path.getsize(os.path.join(work_dir, name)) for name in os.listdir(work_dir)
+                            if name.startswith("results.db"))
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def make_stub(args):
+    return StubGroqServer(latency_ms=args.llm_ms, jitter_ms=args.llm_jitter_ms, token_ms=args.token_ms,
+                          error_429=args.error_429, error_5xx=args.error_5xx, seed=args.seed,
+                          rpm=args.rpm, tpm=args.tpm, limit_window=args.limit_window, prefill_ms=args.prefill_ms,
+                          slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+
+
+def vars_for_report(args):
+    return {key: value for key, value in vars(args).items() if key != "command"}
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--llm-ms", type=float, default=300, help="Stub Groq time to first token")
+    parser.add_argument("--llm-jitter-ms", type=float, default=50)
+    parser.add_argument("--token-ms", type=float, default=8, help="Stub Groq delay per streamed token")
+    parser.add_argument("--prefill-ms", type=float, default=50, help="Stub Groq time to first token per 1k prompt tokens")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests stalled before the first byte")
+    parser.add_argument("--slow-ms", type=float, default=3000, help="Extra delay for a stalled request")
+    parser.add_argument("--rpm", type=int, default=0, help="Stub request quota per --limit-window (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Stub token quota per --limit-window (0 = unlimited)")
+    parser.add_argument("--limit-window", type=float, default=60, help="Stub quota window in seconds")
+    parser.add_argument("--no-pacing", action="store_true", help="Disable the client-side rate-limit scheduler")
+    parser.add_argument("--tts-ms", type=float, default=150, help="Fake TTS latency per request")
+    parser.add_argument("--playback-scale", type=float, default=0.0,
+                        help="Simulated browser playback time as a fraction of clip duration")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks for the interview assistant")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    vad_parser = sub.add_parser("vad", help="Voice activity detection / silence trimming on recorded WAV files")
+    vad_parser.add_argument("wav", nargs="+")
+    vad_parser.add_argument("--chunk", type=int, default=1024, help="Frames per read, as from the microphone")
+
+    qa_parser = sub.add_parser("qa", help="Headless spoken Q&A session against local stand-ins")
+    qa_parser.add_argument("--wav", help="Recording to use as the microphone (default: synthetic utterances)")
+    qa_parser.add_argument("--transcripts", help="One line per phrase, returned by the stub recognizer in order")
+    qa_parser.add_argument("--utterances", type=int, default=6, help="Synthetic utterances when no --wav is given")
+    qa_parser.add_argument("--mic-speed", type=float, default=1.0,
+                           help="Microphone pacing (1 = real time); faster pacing can cut into the next utterance")
+    qa_parser.add_argument("--stt-ms", type=float, default=250, help="Stub recognizer latency per phrase")
+    qa_parser.add_argument("--interim-match", type=float, default=0.8,
+                           help="Share of interim transcripts that match the final phrase")
+    qa_parser.add_argument("--no-speculation", action="store_true", help="Only call the LLM on final transcripts")
+    add_stub_arguments(qa_parser)
+
+    interview_parser = sub.add_parser("interview", help="Headless interviews against local stand-ins")
+    interview_parser.add_argument("--interviews", type=int, default=3)
+    interview_parser.add_argument("--questions", type=int, default=5)
+    interview_parser.add_argument("--mode", choices=("sync", "async", "batch"), default="async")
+    add_stub_arguments(interview_parser)
+
+    sessions_parser = sub.add_parser("sessions", help="Server-mode load test: concurrent candidate sessions")
+    sessions_parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16],
+                                 help="Concurrent session counts to run, one after another")
+    sessions_parser.add_argument("--interviews", type=int, default=1, help="Interviews per session")
+    sessions_parser.add_argument("--questions", type=int, default=3)
+    sessions_parser.add_argument("--mode", choices=("sync", "async", "batch"), default="async")
+    sessions_parser.add_argument("--workers", type=int, default=16, help="Shared TTS/evaluation pool size")
+    add_stub_arguments(sessions_parser)
+
+    ratelimit_parser = sub.add_parser("ratelimit", help="Priority pacing against a stub that enforces quotas")
+    ratelimit_parser.add_argument("--live", type=int, default=10, help="Live Q&A calls, arriving one per interval")
+    ratelimit_parser.add_argument("--live-interval-ms", type=float, default=500)
+    ratelimit_parser.add_argument("--background", type=int, default=20, help="Topic-generation calls queued at start")
+    ratelimit_parser.add_argument("--concurrency", type=int, default=16, help="HTTP connection pool size")
+    add_stub_arguments(ratelimit_parser)
+
+    hedge_parser = sub.add_parser("hedge", help="Hedged live calls against a stub with a slow tail")
+    hedge_parser.add_argument("--calls", type=int, default=200)
+    hedge_parser.add_argument("--concurrency", type=int, default=4, help="Calls in flight at once")
+    hedge_parser.add_argument("--hedge-ratio", type=float, default=0.1, help="Cap on hedges as a share of calls")
+    hedge_parser.add_argument("--no-hedge", action="store_true", help="Send each call once, with fallback only on errors")
+    add_stub_arguments(hedge_parser)
+    hedge_parser.set_defaults(slow_rate=0.05)
+
+    conversation_parser = sub.add_parser("conversation", help="Long typed Q&A session with follow-up questions")
+    conversation_parser.add_argument("--turns", type=int, default=40)
+    conversation_parser.add_argument("--budget", type=int, default=400, help="Verbatim turn budget in tokens")
+    conversation_parser.add_argument("--unbounded", action="store_true", help="Keep every turn verbatim")
+    conversation_parser.add_argument("--window", type=int, default=5, help="Turns compared at the start and end")
+    add_stub_arguments(conversation_parser)
+
+    cancel_parser = sub.add_parser("cancel", help="Answers superseded mid-flight by the next question")
+    cancel_parser.add_argument("--rounds", type=int, default=8)
+    cancel_parser.add_argument("--supersede-after-ms", type=float, default=450,
+                               help="Delay between a question and the one that supersedes it")
+    cancel_parser.add_argument("--tts-workers", type=int, default=2, help="Shared TTS pool size")
+    cancel_parser.add_argument("--no-cancel", action="store_true", help="Let superseded work run to completion")
+    add_stub_arguments(cancel_parser)
+
+    proctor_parser = sub.add_parser("proctor", help="Camera proctoring analysis on a recorded or scripted frame sequence")
+    proctor_parser.add_argument("--frames", help="uint8 grayscale frames saved with numpy.save, shape (n, height, width)"
+                                                 " (default: scripted synthetic camera)")
+    proctor_parser.add_argument("--fps", type=float, default=2.0, help="Frame rate the sequence was captured at")
+    proctor_parser.add_argument("--sessions", type=int, default=1, help="Engines fed the same frames, as concurrent candidates")
+    proctor_parser.add_argument("--cpu-budget", type=float, default=0.02, help="Per-session CPU budget, fraction of a core")
+    proctor_parser.add_argument("--seed", type=int, default=0)
+
+    tts_parser = sub.add_parser("tts", help="Synthesis time and audio bytes per second across TTS backends")
+    tts_parser.add_argument("--backends", nargs="+", choices=sorted(TTS_BACKENDS), default=["gtts", "espeak", "pyttsx3"],
+                            help="Backends in router preference order")
+    tts_parser.add_argument("--fake", action="store_true", help="Append the fake engine as a last-resort backend")
+    tts_parser.add_argument("--tts-ms", type=float, default=150, help="Fake engine latency per request")
+    tts_parser.add_argument("--repeat", type=int, default=1, help="Passes over the sample clips per backend")
+    tts_parser.add_argument("--lang", default="en")
+    tts_parser.add_argument("--timeout", type=float, default=10, help="Per-clip timeout in seconds")
+    tts_parser.add_argument("--latency-budget-ms", type=float, default=1500, help="Router latency budget per clip")
+
+    results_parser = sub.add_parser("results", help="Interview results store: answer-path cost, queries, paged export")
+    results_parser.add_argument("--rows", type=int, default=50000, help="Answers written before querying")
+    results_parser.add_argument("--candidates", type=int, default=500)
+    results_parser.add_argument("--batch-size", type=int, default=200, help="Writes committed per transaction")
+    results_parser.add_argument("--latency-samples", type=int, default=500)
+    results_parser.add_argument("--full-sync", action="store_true", help="Inline baseline with synchronous=FULL")
+    results_parser.add_argument("--query-repeat", type=int, default=20)
+    results_parser.add_argument("--page-size", type=int, default=500, help="Export rows per page")
+    results_parser.add_argument("--timeout", type=float, default=120)
+    results_parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "vad":
+        report = bench_vad(args.wav, args.chunk)
+    elif args.command == "qa":
+        report = bench_qa(args)
+    elif args.command == "interview":
+        report = bench_interview(args)
+    elif args.command == "sessions":
+        report = bench_sessions(args)
+    elif args.command == "ratelimit":
+        report = bench_ratelimit(args)
+    elif args.command == "hedge":
+        report = bench_hedge(args)
+    elif args.command == "conversation":
+        report = bench_conversation(args)
+    elif args.command == "cancel":
+        report = bench_cancel(args)
+    elif args.command == "tts":
+        report = bench_tts(args)
+    elif args.command == "results":
+        report = bench_results(args)
+    else:
+        report = bench_proctor(args)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
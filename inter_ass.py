@@ -1,38 +1,2527 @@
-import eel
-import speech_recognition as sr
+import time
+_PROCESS_START = time.perf_counter()
 import threading
 import json
 import os
 import base64
-import time
 import re
-import requests
 import random
-from dotenv import load_dotenv
-from gtts import gTTS
+import queue
+import uuid
+import hashlib
+import math
+import importlib.util
+import functools
+import heapq
+import itertools
+import sqlite3
+import socket
+import shutil
+import subprocess
+import tempfile
+import atexit
+import hmac
+from datetime import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future
 from io import BytesIO
 
-eel.init('web')
+# Startup timing report: per-module import cost plus milestones, in seconds since process start
+STARTUP_TIMINGS = {"imports": {}, "milestones": {}}
+
+def mark_startup(milestone):
+    STARTUP_TIMINGS["milestones"].setdefault(milestone, round(time.perf_counter() - _PROCESS_START, 4))
+
+def _timed_import(name):
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    STARTUP_TIMINGS["imports"][name] = round(time.perf_counter() - started, 4)
+    return module
+
+class LazyModule:
+    # Defers a heavy import until first attribute access (or the background warm-up)
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = _timed_import(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+eel = _timed_import('eel')
+sr = LazyModule('speech_recognition')
+requests = LazyModule('requests')
+np = LazyModule('numpy')
+gtts = LazyModule('gtts')
+dotenv = LazyModule('dotenv')
+bottle = LazyModule('bottle')  # Eel's HTTP server; already loaded by eel
+bottle_websocket = LazyModule('bottle_websocket')
+gevent = LazyModule('gevent')
+
+def audio_format(audio):
+    # (extension, MIME type) sniffed from the bytes; backends return MP3 (gTTS) or WAV (local engines)
+    if audio[:4] == b"RIFF" and audio[8:12] == b"WAVE":
+        return "wav", "audio/wav"
+    return "mp3", "audio/mpeg"
+
+def _payload_has_audio(payload):
+    try:
+        data = json.loads(payload)
+        return bool(data.get("audio") or data.get("clip"))
+    except Exception:
+        return False
+
+class SessionStateMachine:
+    # Explicit session state behind one Condition. Every transition wakes waiters and is
+    # recorded with a timestamp, so the capture loop blocks instead of polling flags.
+    # thinking: answer being generated; pending: answer audio sent, page hasn't started it; speaking: TTS playing
+    AUDIO_STATES = ("idle", "thinking", "pending", "speaking")
+    INTERVIEW_STATES = ("inactive", "asking", "question", "evaluating", "feedback")
+
+    def __init__(self, echo_tail_seconds=0.3, max_speaking_seconds=120, max_pending_seconds=5, history=500):
+        self.cond = threading.Condition()
+        self.listening = False
+        self.audio = "idle"
+        self.interview = "inactive"
+        self.stop_requested = False
+        self.echo_tail_seconds = echo_tail_seconds
+        self.max_speaking_seconds = max_speaking_seconds
+        self.max_pending_seconds = max_pending_seconds
+        self.capture_after = 0.0
+        self.speaking_since = 0.0
+        self.pending_since = 0.0
+        self.created = time.monotonic()
+        self.history = deque(maxlen=history)
+
+    def transition(self, reason, expect=None, **changes):
+        # Compare-and-set: with expect, nothing changes unless every expected field matches
+        with self.cond:
+            if expect and any(getattr(self, field) != value for field, value in expect.items()):
+                return False
+            now = time.monotonic()
+            for field, value in changes.items():
+                if field == "audio" and value not in self.AUDIO_STATES:
+                    raise ValueError(f"Unknown audio state: {value}")
+                if field == "interview" and value not in self.INTERVIEW_STATES:
+                    raise ValueError(f"Unknown interview state: {value}")
+                old = getattr(self, field)
+                if old == value:
+                    continue
+                setattr(self, field, value)
+                if field == "audio" and value == "speaking":
+                    self.speaking_since = now
+                if field == "audio" and value == "pending":
+                    self.pending_since = now
+                if field == "audio" and old == "speaking":
+                    # Short tail so the end of our own playback isn't captured as speech
+                    self.capture_after = now + self.echo_tail_seconds
+                self.history.append({
+                    "t": round(now - self.created, 4),
+                    "wall": round(time.time(), 4),
+                    "field": field,
+                    "from": old,
+                    "to": value,
+                    "reason": reason
+                })
+            self.cond.notify_all()
+            return True
+
+    def _can_capture(self, now):
+        # Caller holds the lock
+        if self.audio == "speaking" and now - self.speaking_since > self.max_speaking_seconds:
+            # The frontend never reported the end of playback; don't stay deaf forever
+            self.transition("speaking timeout", audio="idle")
+        if self.audio == "pending" and now - self.pending_since > self.max_pending_seconds:
+            # The page never started the audio (declined, blocked or gone); reopen the mic soon
+            self.transition("playback start timeout", audio="idle")
+        return self.listening and self.audio == "idle" and now >= self.capture_after
+
+    def can_capture(self):
+        with self.cond:
+            return self._can_capture(time.monotonic())
+
+    def _can_barge_in(self):
+        # Caller holds the lock. Interviews advance on playback end, so only Q&A answers can be talked over
+        return self.listening and self.audio == "speaking" and self.interview == "inactive"
+
+    def can_barge_in(self):
+        with self.cond:
+            return self._can_barge_in()
+
+    def wait_until_can_capture(self, barge_in=False):
+        # Blocks until capture is allowed (or, with barge_in, an answer is playing); returns False once
+        # listening is switched off
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                if not self.listening:
+                    return False
+                if self._can_capture(now) or (barge_in and self._can_barge_in()):
+                    return True
+                timeout = None
+                if self.audio == "idle":
+                    timeout = self.capture_after - now
+                elif self.audio == "speaking":
+                    timeout = self.speaking_since + self.max_speaking_seconds - now
+                elif self.audio == "pending":
+                    timeout = self.pending_since + self.max_pending_seconds - now
+                self.cond.wait(timeout)
+
+    def snapshot(self, limit=100):
+        with self.cond:
+            return {
+                "listening": self.listening,
+                "audio": self.audio,
+                "interview": self.interview,
+                "stop_requested": self.stop_requested,
+                "transitions": list(self.history)[-limit:]
+            }
+
+class Trace:
+    # One utterance/question through capture -> STT -> LLM -> TTS -> UI; stages are
+    # (start offset, duration) in seconds relative to the trace start
+    def __init__(self, tracer, kind):
+        self.tracer = tracer
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.t0 = time.monotonic()
+        self.wall = time.time()
+        self.stages = {}
+        self.ends = {}
+        self.tags = {}
+        self.finished = False
+
+    def record(self, stage, started, ended=None):
+        ended = time.monotonic() if ended is None else ended
+        self.stages[stage] = (round(started - self.t0, 4), round(ended - started, 4))
+        self.ends[stage] = ended
+
+    def stage(self, name):
+        return _TraceStage(self, name)
+
+    def end_of(self, stage):
+        return self.ends.get(stage)
+
+    def tag(self, **tags):
+        self.tags.update(tags)
+
+    def finish(self, **tags):
+        self.tags.update(tags)
+        self.tracer._finish(self)
+
+class _TraceStage:
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.record(self.name, self.started)
+        return False
+
+class _NullTrace:
+    # Handed out when tracing is disabled: every call is a no-op
+    id = None
+    t0 = 0.0
+    finished = True
+
+    def record(self, stage, started, ended=None):
+        pass
+
+    def stage(self, name):
+        return self
+
+    def end_of(self, stage):
+        return None
+
+    def tag(self, **tags):
+        pass
+
+    def finish(self, **tags):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TRACE = _NullTrace()
+
+class LatencyTracer:
+    # Rolling per-stage latency windows (p50/p95/p99) with optional JSONL span log
+    def __init__(self, enabled=True, jsonl_path=None, window=512, recent=50):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}  # "kind.stage" -> deque of durations in seconds
+        self.recent = deque(maxlen=recent)
+        self.counts = {"started": 0, "finished": 0, "jsonl_errors": 0}
+        self.jsonl_file = None
+
+    def start(self, kind, started=None):
+        # started: monotonic time the work really began (e.g. start of the captured phrase)
+        if not self.enabled:
+            return NULL_TRACE
+        with self.lock:
+            self.counts["started"] += 1
+        trace = Trace(self, kind)
+        if started is not None:
+            trace.t0 = started
+        return trace
+
+    def _finish(self, trace):
+        with self.lock:
+            if trace.finished:
+                return
+            trace.finished = True
+            trace.record("total", trace.t0)
+            self.counts["finished"] += 1
+            for stage, (_, duration) in trace.stages.items():
+                key = f"{trace.kind}.{stage}"
+                window = self.samples.get(key)
+                if window is None:
+                    window = self.samples[key] = deque(maxlen=self.window)
+                window.append(duration)
+            span = {
+                "id": trace.id,
+                "kind": trace.kind,
+                "wall": round(trace.wall, 4),
+                "stages": {stage: {"start": start, "duration": duration}
+                           for stage, (start, duration) in trace.stages.items()},
+                "tags": trace.tags
+            }
+            self.recent.append(span)
+            if self.jsonl_path:
+                try:
+                    if self.jsonl_file is None:
+                        self.jsonl_file = open(self.jsonl_path, 'a', encoding='utf-8')
+                    self.jsonl_file.write(json.dumps(span) + "\n")
+                    self.jsonl_file.flush()
+                except (OSError, TypeError, ValueError):
+                    self.counts["jsonl_errors"] += 1
+
+    @staticmethod
+    def percentile(ordered, q):
+        # Nearest-rank on an already sorted list
+        rank = math.ceil(q / 100.0 * len(ordered))
+        return ordered[max(0, min(len(ordered), rank) - 1)]
+
+    def summary(self, recent=20):
+        with self.lock:
+            windows = {key: sorted(values) for key, values in self.samples.items()}
+            spans = list(self.recent)[-recent:] if recent else []
+            counts = dict(self.counts)
+        stages = {}
+        for key, ordered in sorted(windows.items()):
+            if not ordered:
+                continue
+            stages[key] = {
+                "count": len(ordered),
+                "p50_ms": round(self.percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(self.percentile(ordered, 95) * 1000, 1),
+                "p99_ms": round(self.percentile(ordered, 99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1)
+            }
+        return {"enabled": self.enabled, "counts": counts, "stages": stages, "recent": spans}
+
+class TtsCache:
+    # Content-addressed audio cache: bounded in-memory LRU in front of a size-capped disk directory
+    def __init__(self, cache_dir='tts_cache', max_memory_items=200, max_memory_bytes=16 * 1024 * 1024,
+                 max_disk_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_index = OrderedDict()  # key -> (size, extension), least recently used first
+        self.disk_bytes = 0
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "disk_errors": 0
+        }
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(text, lang, engine):
+        return hashlib.sha256(f"{engine}\0{lang}\0{text}".encode('utf-8')).hexdigest()
+
+    def _path(self, key, extension):
+        # Named for the format the backend produced (gTTS MP3, local engines WAV)
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+    def _load_disk_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                key, _, extension = name.rpartition('.')
+                if extension not in ('mp3', 'wav'):
+                    continue
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, key, st.st_size, extension))
+            # Oldest access first so eviction order survives restarts
+            for _, key, size, extension in sorted(entries):
+                self.disk_index[key] = (size, extension)
+                self.disk_bytes += size
+        except OSError:
+            self.stats["disk_errors"] += 1
+
+    def get(self, key):
+        with self.lock:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return audio
+            on_disk = self.disk_index.get(key)
+        if on_disk is not None:
+            try:
+                path = self._path(key, on_disk[1])
+                with open(path, 'rb') as f:
+                    audio = f.read()
+                os.utime(path, None)
+                with self.lock:
+                    if key in self.disk_index:
+                        self.disk_index.move_to_end(key)
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, audio)
+                return audio
+            except OSError:
+                with self.lock:
+                    self._forget_disk(key)
+                    self.stats["disk_errors"] += 1
+        with self.lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, audio):
+        if not audio:
+            return
+        with self.lock:
+            self._remember(key, audio)
+            if key in self.disk_index:
+                return
+        extension = audio_format(audio)[0]
+        try:
+            tmp_path = self._path(key, extension) + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, self._path(key, extension))
+        except OSError:
+            with self.lock:
+                self.stats["disk_errors"] += 1
+            return
+        with self.lock:
+            self.disk_index[key] = (len(audio), extension)
+            self.disk_bytes += len(audio)
+            while self.disk_bytes > self.max_disk_bytes and len(self.disk_index) > 1:
+                old_key, (_, old_extension) = next(iter(self.disk_index.items()))
+                self._forget_disk(old_key)
+                try:
+                    os.remove(self._path(old_key, old_extension))
+                except OSError:
+                    pass
+                self.stats["disk_evictions"] += 1
+
+    def get_or_create(self, text, lang, engine, synthesize):
+        key = self.make_key(text, lang, engine)
+        audio = self.get(key)
+        if audio is None:
+            audio = synthesize()
+            self.put(key, audio)
+        return audio
+
+    def _remember(self, key, audio):
+        # Caller holds the lock
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return
+        self.memory[key] = audio
+        self.memory_bytes += len(audio)
+        while len(self.memory) > self.max_memory_items or self.memory_bytes > self.max_memory_bytes:
+            _, old_audio = self.memory.popitem(last=False)
+            self.memory_bytes -= len(old_audio)
+            self.stats["memory_evictions"] += 1
+
+    def _forget_disk(self, key):
+        # Caller holds the lock
+        entry = self.disk_index.pop(key, None)
+        if entry is not None:
+            self.disk_bytes -= entry[0]
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+            stats["memory_items"] = len(self.memory)
+            stats["memory_bytes"] = self.memory_bytes
+            stats["disk_items"] = len(self.disk_index)
+            stats["disk_bytes"] = self.disk_bytes
+            stats["max_disk_bytes"] = self.max_disk_bytes
+            return stats
+
+class GttsBackend:
+    # Google Translate's speech endpoint: natural voice, MP3, one network round trip per clip
+    name = "gtts"
+
+    def available(self):
+        return importlib.util.find_spec("gtts") is not None
+
+    def synthesize(self, text, lang, timeout=None):
+        tts = gtts.gTTS(text=text, lang=lang, timeout=timeout)
+        buf = BytesIO()
+        tts.write_to_fp(buf)
+        return buf.getvalue()
+
+class EspeakBackend:
+    # eSpeak NG command line: offline, robotic voice, WAV written to stdout in tens of milliseconds
+    name = "espeak"
+
+    def __init__(self, binary=None, words_per_minute=170):
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        self.words_per_minute = words_per_minute
+
+    def available(self):
+        return self.binary is not None
+
+    def synthesize(self, text, lang, timeout=None):
+        # Text goes in on stdin so a leading "-" is never read as an option
+        result = subprocess.run([self.binary, "--stdout", "-v", lang, "-s", str(self.words_per_minute)],
+                                input=text.encode("utf-8"), capture_output=True, timeout=timeout)
+        if result.returncode != 0 or not result.stdout:
+            raise Exception(f"espeak failed: {result.stderr.decode('utf-8', 'replace').strip()[:200]}")
+        return self.fix_wav_sizes(result.stdout)
+
+    @staticmethod
+    def fix_wav_sizes(audio):
+        # espeak can't seek back on a pipe, so the RIFF and data sizes in its header are placeholders
+        data = audio.find(b"data", 12)
+        if audio[:4] != b"RIFF" or data < 0:
+            return audio
+        audio = bytearray(audio)
+        audio[4:8] = (len(audio) - 8).to_bytes(4, "little")
+        audio[data + 4:data + 8] = (len(audio) - data - 8).to_bytes(4, "little")
+        return bytes(audio)
+
+class Pyttsx3Backend:
+    # The platform's own speech engine through pyttsx3 (SAPI5, NSSpeechSynthesizer or eSpeak): offline,
+    # WAV. The engine isn't thread-safe, so clips are rendered one at a time. Uses the default voice
+    # whatever the language.
+    name = "pyttsx3"
 
-class AudioAssistant:
     def __init__(self):
-        load_dotenv()
-        self.setup_audio()
-        self.is_listening = False
+        self.lock = threading.Lock()
+        self.engine = None
+
+    def available(self):
+        return importlib.util.find_spec("pyttsx3") is not None
+
+    def synthesize(self, text, lang, timeout=None):
+        with self.lock:
+            if self.engine is None:
+                self.engine = _timed_import("pyttsx3").init()
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                self.engine.save_to_file(text, path)
+                self.engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+TTS_BACKENDS = {"gtts": GttsBackend, "espeak": EspeakBackend, "pyttsx3": Pyttsx3Backend}
+
+class TtsRouter:
+    # Picks the TTS backend per clip: the first in preference order whose measured latency is within
+    # budget, else the fastest. A backend that errors or times out is skipped for a cooldown and the
+    # clip goes to the next one.
+    def __init__(self, backends, latency_budget_ms=1500, timeout=10, cooldown_seconds=60,
+                 remeasure_seconds=300, alpha=0.2):
+        self.backends = list(backends)  # Preference order
+        self.latency_budget_ms = latency_budget_ms
+        self.timeout = timeout
+        self.cooldown_seconds = cooldown_seconds
+        # A backend passed over as slow gets a fresh chance once its measurement is this old
+        self.remeasure_seconds = remeasure_seconds
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.state = {backend.name: {"available": None, "checked": None, "ewma_ms": None, "measured": None,
+                                     "down_until": 0.0, "clips": 0, "errors": 0, "timeouts": 0, "fallbacks": 0,
+                                     "chars": 0, "bytes": 0, "last_error": None}
+                      for backend in self.backends}
+
+    @classmethod
+    def from_env(cls):
+        # TTS_BACKENDS: comma-separated preference order; unknown names are ignored
+        names = [name.strip() for name in os.getenv('TTS_BACKENDS', 'gtts,espeak,pyttsx3').split(',')]
+        return cls([TTS_BACKENDS[name]() for name in names if name in TTS_BACKENDS],
+                   latency_budget_ms=float(os.getenv('TTS_LATENCY_BUDGET_MS', '1500')),
+                   timeout=float(os.getenv('TTS_TIMEOUT', '10')))
+
+    def _is_available(self, backend, now):
+        # Caller holds the lock; rechecked now and then so a newly installed engine is picked up
+        state = self.state[backend.name]
+        if state["checked"] is None or now - state["checked"] > self.remeasure_seconds:
+            try:
+                state["available"] = bool(backend.available())
+            except Exception:
+                state["available"] = False
+            state["checked"] = now
+        return state["available"]
+
+    def order(self):
+        now = time.monotonic()
+        with self.lock:
+            available = [backend for backend in self.backends if self._is_available(backend, now)]
+            usable = [backend for backend in available if self.state[backend.name]["down_until"] <= now]
+            # Everything cooling down: still try them rather than fail outright
+            usable = usable or available
+            if not usable:
+                return []
+
+            def latency(backend):
+                state = self.state[backend.name]
+                if state["ewma_ms"] is None or now - state["measured"] > self.remeasure_seconds:
+                    return None
+                return state["ewma_ms"]
+            within = [backend for backend in usable
+                      if latency(backend) is None or latency(backend) <= self.latency_budget_ms]
+            first = within[0] if within else min(usable, key=latency)
+        return [first] + [backend for backend in usable if backend is not first]
+
+    def preferred(self):
+        backends = self.order()
+        return backends[0].name if backends else None
+
+    def synthesize(self, text, lang):
+        # Returns (audio, backend name)
+        errors = []
+        for backend in self.order():
+            started = time.monotonic()
+            try:
+                audio = backend.synthesize(text, lang, timeout=self.timeout)
+                if not audio:
+                    raise Exception("no audio returned")
+            except Exception as e:
+                elapsed = time.monotonic() - started
+                timed_out = isinstance(e, subprocess.TimeoutExpired) or elapsed >= self.timeout \
+                    or "timed out" in str(e).lower() or "timeout" in str(e).lower()
+                with self.lock:
+                    state = self.state[backend.name]
+                    state["errors"] += 1
+                    state["timeouts"] += int(timed_out)
+                    state["last_error"] = str(e)[:200]
+                    state["down_until"] = time.monotonic() + self.cooldown_seconds
+                errors.append(f"{backend.name}: {str(e)}")
+                continue
+            elapsed_ms = (time.monotonic() - started) * 1000
+            with self.lock:
+                state = self.state[backend.name]
+                state["ewma_ms"] = elapsed_ms if state["ewma_ms"] is None \
+                    else state["ewma_ms"] + self.alpha * (elapsed_ms - state["ewma_ms"])
+                state["measured"] = time.monotonic()
+                state["down_until"] = 0.0
+                state["clips"] += 1
+                state["fallbacks"] += int(bool(errors))
+                state["chars"] += len(text)
+                state["bytes"] += len(audio)
+            return audio, backend.name
+        raise Exception("No TTS backend succeeded" + (": " + "; ".join(errors) if errors else " (none available)"))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            backends = {}
+            for name, state in self.state.items():
+                stats = {key: value for key, value in state.items() if key not in ("checked", "measured", "down_until")}
+                stats["ewma_ms"] = round(state["ewma_ms"], 1) if state["ewma_ms"] is not None else None
+                stats["cooling_down"] = state["down_until"] > now
+                backends[name] = stats
+        return {"order": [backend.name for backend in self.backends], "preferred": self.preferred(),
+                "latency_budget_ms": self.latency_budget_ms, "timeout": self.timeout, "backends": backends}
+
+class AudioStore:
+    # Clip bytes served over Eel's HTTP server by ID, so UI payloads carry a short URL instead of
+    # base64. IDs are content hashes: the same audio always gets the same URL (browser-cacheable).
+    def __init__(self, route_prefix='/audio/', max_bytes=32 * 1024 * 1024, max_age_seconds=1800,
+                 served_ttl_seconds=600, chunk_size=64 * 1024):
+        self.route_prefix = route_prefix
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds  # Never fetched (e.g. the page was closed)
+        self.served_ttl_seconds = served_ttl_seconds  # Fully served; kept a while for replay
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.clips = OrderedDict()  # clip_id -> {"audio", "created", "served"}, least recently used first
+        self.total_bytes = 0
+        self.stats = {
+            "registered": 0,
+            "deduplicated": 0,
+            "requests": 0,
+            "range_requests": 0,
+            "not_found": 0,
+            "bytes_registered": 0,
+            "bytes_served": 0,
+            "evictions": 0,
+            "expired": 0
+        }
+
+    @staticmethod
+    def make_id(audio):
+        return hashlib.sha256(audio).hexdigest()[:32]
+
+    def url(self, clip_id, extension="mp3"):
+        return f"{self.route_prefix}{clip_id}.{extension}"
+
+    def register(self, audio):
+        # Returns the URL the frontend should play, or None for empty audio
+        if not audio:
+            return None
+        clip_id = self.make_id(audio)
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            entry = self.clips.get(clip_id)
+            if entry is not None:
+                entry["created"] = now
+                entry["served"] = None
+                self.clips.move_to_end(clip_id)
+                self.stats["deduplicated"] += 1
+            else:
+                self.clips[clip_id] = {"audio": audio, "created": now, "served": None}
+                self.total_bytes += len(audio)
+                self.stats["registered"] += 1
+                self.stats["bytes_registered"] += len(audio)
+                while self.total_bytes > self.max_bytes and len(self.clips) > 1:
+                    self._drop(next(iter(self.clips)))
+                    self.stats["evictions"] += 1
+        return self.url(clip_id, audio_format(audio)[0])
+
+    def get(self, clip_id):
+        with self.lock:
+            self._expire(time.monotonic())
+            entry = self.clips.get(clip_id)
+            if entry is None:
+                self.stats["not_found"] += 1
+                return None
+            self.clips.move_to_end(clip_id)
+            return entry["audio"]
+
+    def record_served(self, clip_id, nbytes, partial, complete):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_served"] += nbytes
+            if partial:
+                self.stats["range_requests"] += 1
+            entry = self.clips.get(clip_id)
+            if entry is not None and complete and entry["served"] is None:
+                entry["served"] = time.monotonic()
+
+    def _expire(self, now):
+        # Caller holds the lock
+        for clip_id in list(self.clips):
+            entry = self.clips[clip_id]
+            if entry["served"] is not None:
+                stale = now - entry["served"] > self.served_ttl_seconds
+            else:
+                stale = now - entry["created"] > self.max_age_seconds
+            if stale:
+                self._drop(clip_id)
+                self.stats["expired"] += 1
+
+    def _drop(self, clip_id):
+        # Caller holds the lock
+        entry = self.clips.pop(clip_id, None)
+        if entry is not None:
+            self.total_bytes -= len(entry["audio"])
+
+    def iter_bytes(self, audio, start, end):
+        # memoryview slices avoid copying the clip for every chunk
+        view = memoryview(audio)
+        for offset in range(start, end, self.chunk_size):
+            yield bytes(view[offset: min(offset + self.chunk_size, end)])
+
+    def snapshot(self):
+        with self.lock:
+            self._expire(time.monotonic())
+            stats = dict(self.stats)
+            stats["clips"] = len(self.clips)
+            stats["bytes"] = self.total_bytes
+            stats["max_bytes"] = self.max_bytes
+            return stats
+
+class ResponseCache:
+    # Q&A answers keyed by normalized question: TTL + LRU in memory, optional SQLite persistence,
+    # and single-flight so identical concurrent questions share one Groq call
+    def __init__(self, max_items=128, ttl_seconds=6 * 3600, persist_path=None):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> {"text", "audio", "created"}
+        self.in_flight = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "expired": 0, "evictions": 0, "persisted_hits": 0}
+        self.db = None
+        if persist_path:
+            self.db = sqlite3.connect(persist_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                "audio TEXT, created REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    def _fresh(self, entry):
+        return (time.time() - entry["created"]) < self.ttl_seconds
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self.entries.get(key)
+        if entry is not None:
+            if self._fresh(entry):
+                self.entries.move_to_end(key)
+                return entry
+            del self.entries[key]
+            self.stats["expired"] += 1
+        if self.db is None:
+            return None
+        row = self.db.execute("SELECT text, audio, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        audio = [base64.b64decode(a) for a in json.loads(row[1])] if row[1] else None
+        entry = {"text": row[0], "audio": audio, "created": row[2]}
+        if not self._fresh(entry):
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.db.commit()
+            self.stats["expired"] += 1
+            return None
+        self.stats["persisted_hits"] += 1
+        self._store(key, entry, persist=False)
+        return entry
+
+    def _store(self, key, entry, persist=True):
+        # Caller holds the lock
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_items:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        if persist and self.db is not None:
+            audio = json.dumps([base64.b64encode(a).decode('utf-8') for a in entry["audio"]]) if entry["audio"] else None
+            self.db.execute("INSERT OR REPLACE INTO responses (key, text, audio, created) VALUES (?, ?, ?, ?)",
+                            (key, entry["text"], audio, entry["created"]))
+            self.db.commit()
+
+    def get_or_compute(self, key, compute):
+        # Returns (entry, hit); compute() must return the answer text and may raise
+        with self.lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry, True
+            waiter = self.in_flight.get(key)
+            if waiter is None:
+                waiter = Future()
+                self.in_flight[key] = waiter
+                leader = True
+                self.stats["misses"] += 1
+            else:
+                leader = False
+                self.stats["coalesced"] += 1
+        if not leader:
+            return waiter.result(), True
+        try:
+            text = compute()
+            entry = {"text": text, "audio": None, "created": time.time()}
+            if text:
+                with self.lock:
+                    self._store(key, entry)
+            waiter.set_result(entry)
+            return entry, False
+        except Exception as e:
+            waiter.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def attach_audio(self, key, segments):
+        # Audio finishes after the text went out; fill it in so later hits replay without synthesis
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and segments:
+                entry["audio"] = list(segments)
+                self._store(key, entry)
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            # Coalesced requests also avoided a Groq call
+            lookups = stats["hits"] + stats["coalesced"] + stats["misses"]
+            stats["hit_rate"] = round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else 0.0
+            stats["items"] = len(self.entries)
+            stats["in_flight"] = len(self.in_flight)
+            stats["persistent"] = self.db is not None
+            return stats
+
+class ResultsStore:
+    # Interview outcomes in SQLite (WAL): one row per interview, one per answer. Callers only enqueue;
+    # a writer thread commits in batches, so persistence never sits on the answer path. Reads and
+    # exports use their own connections and page through results by id.
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS interviews (id TEXT PRIMARY KEY, candidate TEXT NOT NULL, session_id TEXT, "
+        "mode TEXT, questions TEXT, started REAL NOT NULL, finished REAL, status TEXT NOT NULL, score REAL, "
+        "possible REAL, summary TEXT)",
+        "CREATE TABLE IF NOT EXISTS answers (id INTEGER PRIMARY KEY AUTOINCREMENT, interview_id TEXT NOT NULL, "
+        "question_index INTEGER NOT NULL, candidate TEXT NOT NULL, topic TEXT, answer TEXT, proctoring TEXT, "
+        "feedback TEXT, score REAL, created REAL NOT NULL, evaluated REAL, UNIQUE (interview_id, question_index))",
+        "CREATE INDEX IF NOT EXISTS interviews_candidate_started ON interviews (candidate, started)",
+        "CREATE INDEX IF NOT EXISTS interviews_started ON interviews (started)",
+        "CREATE INDEX IF NOT EXISTS answers_candidate_created ON answers (candidate, created)",
+        "CREATE INDEX IF NOT EXISTS answers_topic_created ON answers (topic COLLATE NOCASE, created)",
+        "CREATE INDEX IF NOT EXISTS answers_created ON answers (created)"
+    ]
+
+    def __init__(self, path=None, batch_size=200, flush_interval=0.5, max_queue=10000):
+        self.path = path  # None: results aren't kept
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ops = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "max_batch": 0, "dropped": 0, "errors": 0,
+                      "exported_rows": 0}
+        self.writer = None
+        if path:
+            db = self.connect()
+            for statement in self.SCHEMA:
+                db.execute(statement)
+            db.commit()
+            self.writer = threading.Thread(target=self._write_loop, args=(db,), name="results-writer", daemon=True)
+            self.writer.start()
+            atexit.register(self.flush)
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # WAL: exports read while the writer commits; NORMAL sync is durable across app crashes
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _enqueue(self, sql, params):
+        if self.writer is None:
+            return
+        try:
+            self.ops.put_nowait((sql, params))
+        except queue.Full:
+            # Disk stalled for a long time: lose a row rather than block an answer
+            with self.lock:
+                self.stats["dropped"] += 1
+            return
+        with self.lock:
+            self.stats["queued"] += 1
+
+    def _write_loop(self, db):
+        while True:
+            batch = [self.ops.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # A burst is committed together; a lone write waits at most flush_interval for company
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.ops.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            written = 0
+            try:
+                with db:
+                    for op in batch:
+                        if isinstance(op, threading.Event):
+                            continue
+                        db.execute(*op)
+                        written += 1
+            except sqlite3.Error as e:
+                print(f"Error writing interview results: {str(e)}")
+                with self.lock:
+                    self.stats["errors"] += 1
+            with self.lock:
+                self.stats["written"] += written
+                self.stats["batches"] += 1
+                self.stats["max_batch"] = max(self.stats["max_batch"], written)
+            for op in batch:
+                if isinstance(op, threading.Event):
+                    op.set()
+
+    def flush(self, timeout=10):
+        # Waits until everything queued so far is committed
+        if self.writer is None:
+            return True
+        done = threading.Event()
+        try:
+            self.ops.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def start_interview(self, interview_id, candidate, session_id, mode, questions):
+        self._enqueue("INSERT INTO interviews (id, candidate, session_id, mode, questions, started, status) "
+                      "VALUES (?, ?, ?, ?, ?, ?, 'active')",
+                      (interview_id, candidate, session_id, mode, json.dumps(questions), time.time()))
+
+    def record_answer(self, interview_id, question_index, candidate, topic, answer, notes):
+        self._enqueue("INSERT OR REPLACE INTO answers (interview_id, question_index, candidate, topic, answer, "
+                      "proctoring, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      (interview_id, question_index, candidate, topic, answer, json.dumps(notes or []), time.time()))
+
+    def record_feedback(self, interview_id, question_index, feedback, score):
+        # Same writer thread as record_answer, so the row already exists
+        self._enqueue("UPDATE answers SET feedback = ?, score = ?, evaluated = ? WHERE interview_id = ? AND question_index = ?",
+                      (feedback, score, time.time(), interview_id, question_index))
+
+    def finish_interview(self, interview_id, status, score, possible, summary):
+        self._enqueue("UPDATE interviews SET finished = ?, status = ?, score = ?, possible = ?, summary = ? WHERE id = ?",
+                      (time.time(), status, score, possible, summary, interview_id))
+
+    @staticmethod
+    def parse_time(value):
+        # Epoch seconds or an ISO date/datetime ("2026-10-18", "2026-10-18T09:30")
+        if value in (None, ""):
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return datetime.fromisoformat(str(value)).timestamp()
+
+    def query(self, candidate=None, topic=None, since=None, until=None):
+        # WHERE clause and parameters for answer rows; each filter is served by one of the indexes
+        clauses, params = [], []
+        if candidate:
+            clauses.append("a.candidate = ?")
+            params.append(candidate)
+        if topic:
+            clauses.append("a.topic = ? COLLATE NOCASE")
+            params.append(topic)
+        if since is not None:
+            clauses.append("a.created >= ?")
+            params.append(self.parse_time(since))
+        if until is not None:
+            clauses.append("a.created < ?")
+            params.append(self.parse_time(until))
+        return clauses, params
+
+    def iter_answers(self, candidate=None, topic=None, since=None, until=None, page_size=500):
+        # Keyset pages (id > last seen) on a dedicated read connection; memory stays at one page
+        if not self.path:
+            return
+        clauses, params = self.query(candidate, topic, since, until)
+        db = self.connect()
+        try:
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    "SELECT a.id, a.interview_id, a.candidate, a.question_index, a.topic, a.answer, a.proctoring, "
+                    "a.feedback, a.score, a.created, a.evaluated, i.status, i.mode, i.score, i.possible "
+                    "FROM answers a JOIN interviews i ON i.id = a.interview_id WHERE "
+                    + " AND ".join(clauses + ["a.id > ?"]) + " ORDER BY a.id LIMIT ?",
+                    params + [last_id, page_size]).fetchall()
+                if not rows:
+                    return
+                for row in rows:
+                    yield {"id": row[0], "interview_id": row[1], "candidate": row[2], "question_index": row[3],
+                           "topic": row[4], "answer": row[5], "proctoring": json.loads(row[6] or "[]"),
+                           "feedback": row[7], "score": row[8], "created": row[9], "evaluated": row[10],
+                           "interview_status": row[11], "mode": row[12], "interview_score": row[13],
+                           "interview_possible": row[14]}
+                with self.lock:
+                    self.stats["exported_rows"] += len(rows)
+                last_id = rows[-1][0]
+                if len(rows) < page_size:
+                    return
+        finally:
+            db.close()
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats["enabled"] = self.writer is not None
+        stats["path"] = self.path
+        stats["pending"] = self.ops.qsize()
+        return stats
+
+class ConversationMemory:
+    # Recent Q&A turns verbatim within a token budget; older turns fold into a running summary in the
+    # background, so prompt size (and latency) stays flat however long the session runs
+    FOLLOW_UP = re.compile(
+        r"^(?:and|but|so|also|what about|how about|why not)\b"
+        r"|\b(?:it|its|that|this|those|these|they|them|their|one|ones|above|previous|earlier|same|instead|"
+        r"compare|compared|comparison|versus|vs|difference)\b"
+    )
+
+    def __init__(self, budget_tokens=1500, summary_tokens=200, summarize=None, submit=None, history=256):
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.summarize = summarize  # (summary, [(question, answer)]) -> updated summary; may raise
+        self.submit = submit  # Runs folds off the request path, e.g. an executor's submit
+        self.lock = threading.Lock()
+        self.turns = deque()  # (question, answer, tokens), oldest first
+        self.turn_tokens = 0
+        self.pending = []  # Evicted turns not yet in the summary
+        self.summary = ""
+        self.folding = False
+        self.prompt_tokens = deque(maxlen=history)
+        self.stats = {"turns": 0, "evicted": 0, "folds": 0, "folded_turns": 0, "fold_errors": 0, "fold_ms": 0.0}
+
+    @staticmethod
+    def estimate_tokens(text):
+        # Same rough 4 chars/token as GroqClient.estimate_tokens
+        return len(text or "") // 4 + 1
+
+    def messages(self, system_prompt, question):
+        with self.lock:
+            summary = self.summary
+            turns = [(q, a) for q, a, _ in self.turns]
+        messages = [{"role": "system", "content": system_prompt}]
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the conversation so far: {summary}"})
+        for asked, answered in turns:
+            messages.append({"role": "user", "content": asked})
+            messages.append({"role": "assistant", "content": answered})
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def is_follow_up(self, question):
+        # Only refers back if there is something to refer to
+        with self.lock:
+            has_context = bool(self.turns or self.summary)
+        return has_context and self.FOLLOW_UP.search((question or "").lower()) is not None
+
+    def fingerprint(self):
+        # Identifies the context an answer was given in; part of the cache key for follow-ups
+        digest = hashlib.sha1()
+        with self.lock:
+            digest.update(self.summary.encode('utf-8'))
+            for asked, answered, _ in self.turns:
+                digest.update(b"\0" + asked.encode('utf-8') + b"\0" + answered.encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def record_prompt(self, tokens):
+        with self.lock:
+            self.prompt_tokens.append(tokens)
+
+    def add_turn(self, question, answer):
+        tokens = self.estimate_tokens(question) + self.estimate_tokens(answer)
+        with self.lock:
+            self.turns.append((question, answer, tokens))
+            self.turn_tokens += tokens
+            self.stats["turns"] += 1
+            # The newest turn always stays, even if it alone is over budget
+            while len(self.turns) > 1 and self.turn_tokens > self.budget_tokens:
+                asked, answered, old_tokens = self.turns.popleft()
+                self.turn_tokens -= old_tokens
+                self.pending.append((asked, answered))
+                self.stats["evicted"] += 1
+        self._schedule_fold()
+
+    def _schedule_fold(self):
+        # One fold at a time; turns evicted meanwhile go into the next one
+        with self.lock:
+            if self.folding or not self.pending:
+                return
+            self.folding = True
+            batch, self.pending = self.pending, []
+            summary = self.summary
+        try:
+            if self.submit is None:
+                self._fold(summary, batch)
+            else:
+                self.submit(self._fold, summary, batch)
+        except Exception:
+            # Executor shut down: keep the turns for the next attempt
+            with self.lock:
+                self.folding = False
+                self.pending = batch + self.pending
+
+    def _fold(self, summary, batch):
+        started = time.monotonic()
+        updated = None
+        if self.summarize is not None:
+            try:
+                updated = (self.summarize(summary, batch) or "").strip()
+            except Exception as e:
+                print(f"Error in conversation summary: {str(e)}")
+        with self.lock:
+            if updated:
+                self.stats["folds"] += 1
+                self.stats["folded_turns"] += len(batch)
+                self.stats["fold_ms"] += (time.monotonic() - started) * 1000
+            else:
+                # No model summary: keep the topics at least, so memory stays bounded either way
+                self.stats["fold_errors"] += 1
+                asked = "; ".join(q for q, _ in batch)
+                updated = f"{summary} Earlier questions: {asked}".strip()
+            self.summary = updated[:self.summary_tokens * 4]
+            self.folding = False
+        self._schedule_fold()
+
+    def clear(self):
+        with self.lock:
+            self.turns.clear()
+            self.turn_tokens = 0
+            self.pending = []
+            self.summary = ""
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["fold_ms"] = round(stats["fold_ms"], 1)
+            stats["budget_tokens"] = self.budget_tokens
+            stats["verbatim_turns"] = len(self.turns)
+            stats["verbatim_tokens"] = self.turn_tokens
+            stats["summary_tokens"] = self.estimate_tokens(self.summary) if self.summary else 0
+            stats["pending_turns"] = len(self.pending)
+            stats["folding"] = self.folding
+            prompts = list(self.prompt_tokens)
+        if prompts:
+            ordered = sorted(prompts)
+            stats["prompt_tokens"] = {
+                "requests": len(prompts),
+                "last": prompts[-1],
+                "p50": LatencyTracer.percentile(ordered, 50),
+                "p95": LatencyTracer.percentile(ordered, 95),
+                "max": ordered[-1]
+            }
+        return stats
+
+class WorkHandle:
+    # One answer's cancellable LLM/TTS work. cancel() shuts its open Groq stream, takes it out of the
+    # rate-limit queue and cancels its queued synthesis; generation tells a stale result from the current one
+    def __init__(self, generation=0):
+        self.generation = generation
+        self.cancelled = threading.Event()
+        self.reason = None
+        self.lock = threading.Lock()
+        self.callbacks = []
+
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+
+    def on_cancel(self, callback):
+        # Runs callback on cancel(), or right away if already cancelled; returns a function that unregisters it
+        with self.lock:
+            if not self.cancelled.is_set():
+                self.callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback):
+        with self.lock:
+            try:
+                self.callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def add_future(self, future):
+        # Queued work is dropped on cancel; finished work unregisters itself
+        remove = self.on_cancel(future.cancel)
+        future.add_done_callback(lambda _: remove())
+        return future
+
+    def cancel(self, reason="cancelled"):
+        # Returns how many in-flight items were actually stopped
+        with self.lock:
+            if self.cancelled.is_set():
+                return 0
+            self.reason = reason
+            self.cancelled.set()
+            callbacks, self.callbacks = self.callbacks, []
+        stopped = 0
+        for callback in callbacks:
+            try:
+                if callback():
+                    stopped += 1
+            except Exception:
+                pass
+        return stopped
+
+class TokenBucket:
+    # Continuously refilling budget; sync() re-bases it on what the server says is left
+    def __init__(self, capacity, per_seconds):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / float(per_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.full_at = 0.0  # When the last synced response said the budget would be whole again
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost, now):
+        self.refill(now)
+        cost = min(cost, self.capacity)  # An oversized call waits for a full bucket, not forever
+        if self.level >= cost:
+            return 0.0
+        return (cost - self.level) / self.rate if self.rate > 0 else 1.0
+
+    def take(self, cost, now):
+        self.refill(now)
+        self.level -= min(cost, self.capacity)
+
+    def sync(self, limit, remaining, reset_seconds, now, owed=0.0):
+        # Responses can be handled out of order. Each call admitted pushes the server's "whole again" time
+        # back, so one that reports an earlier time than already synced predates budget spent since
+        if reset_seconds is not None:
+            if now + reset_seconds < self.full_at:
+                return False
+            self.full_at = now + reset_seconds
+        if limit:
+            self.capacity = float(limit)
+        # Groq's reset is the time until the budget is whole again, whatever the window length
+        if reset_seconds and remaining < self.capacity:
+            self.rate = (self.capacity - remaining) / reset_seconds
+        self.level = min(self.capacity, float(remaining)) - owed
+        self.updated = now
+        return True
+
+class RateLimitScheduler:
+    # Paces Groq calls against the account's request/token budgets, re-synced from x-ratelimit-* headers,
+    # and grants slots in priority order: live Q&A and feedback ahead of background question generation.
+    # Background calls waiting longer than promote_after are promoted so they can't starve.
+    LIVE = 0
+    BACKGROUND = 1
+
+    def __init__(self, enabled=True, requests_per_minute=30, tokens_per_minute=6000, promote_after=30.0,
+                 default_pause=2.0, history=512):
+        self.enabled = enabled
+        self.promote_after = promote_after
+        self.default_pause = default_pause
+        self.cond = threading.Condition()
+        self.rpm = TokenBucket(requests_per_minute, 60)  # Groq's headers only carry the daily request limit
+        self.requests = None  # Created from the first response's headers
+        self.tokens = TokenBucket(tokens_per_minute, 60)
+        self.paused_until = 0.0
+        self.waiting = []  # Heap of [priority, ticket, enqueued]
+        self.inflight = {}  # ticket -> estimated tokens, until its response headers arrive
+        self.tickets = itertools.count(1)
+        self.waits = {self.LIVE: deque(maxlen=history), self.BACKGROUND: deque(maxlen=history)}
+        self.stats = {"granted": 0, "paced": 0, "throttled_429": 0, "header_syncs": 0, "stale_headers": 0,
+                      "promoted": 0, "max_queue_depth": 0, "cancelled": 0}
+
+    @staticmethod
+    def parse_duration(value):
+        # "2m59.56s", "7.66s", "450ms", or plain seconds (Retry-After)
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        total = 0.0
+        for amount, unit in re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value):
+            total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+        return total
+
+    def _buckets(self):
+        return [bucket for bucket in (self.rpm, self.requests) if bucket is not None]
+
+    def _promote(self, now):
+        changed = False
+        for entry in self.waiting:
+            if entry[0] > self.LIVE and now - entry[2] >= self.promote_after:
+                entry[0] = self.LIVE
+                self.stats["promoted"] += 1
+                changed = True
+        if changed:
+            heapq.heapify(self.waiting)
+
+    def acquire(self, priority, tokens, handle=None):
+        # Blocks until this call is first in line and the budgets cover it; returns a ticket for observe().
+        # Cancelling the handle takes the call out of the queue.
+        if not self.enabled:
+            return None
+        remove_wake = handle.on_cancel(self.wake) if handle is not None else None
+        try:
+            with self.cond:
+                enqueued = time.monotonic()
+                entry = [priority, next(self.tickets), enqueued]
+                heapq.heappush(self.waiting, entry)
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self.waiting))
+                paced = False
+                while True:
+                    if handle is not None and handle.is_cancelled():
+                        self.waiting.remove(entry)
+                        heapq.heapify(self.waiting)
+                        self.stats["cancelled"] += 1
+                        self.cond.notify_all()
+                        raise Exception("Request cancelled")
+                    now = time.monotonic()
+                    self._promote(now)
+                    delay = None
+                    if self.waiting[0] is entry:
+                        delay = max([self.paused_until - now, self.tokens.wait_time(tokens, now)]
+                                    + [bucket.wait_time(1, now) for bucket in self._buckets()])
+                        if delay <= 0:
+                            break
+                        paced = True
+                    elif self.promote_after and priority > self.LIVE:
+                        delay = max(0.01, enqueued + self.promote_after - now)
+                    self.cond.wait(delay)
+                heapq.heappop(self.waiting)
+                for bucket in self._buckets():
+                    bucket.take(1, now)
+                self.tokens.take(tokens, now)
+                self.inflight[entry[1]] = tokens
+                self.stats["granted"] += 1
+                if paced:
+                    self.stats["paced"] += 1
+                self.waits[priority].append(now - enqueued)
+                self.cond.notify_all()
+                return entry[1]
+        finally:
+            if remove_wake is not None:
+                remove_wake()
+
+    def wake(self):
+        with self.cond:
+            self.cond.notify_all()
+
+    def has_headroom(self, tokens):
+        # True if a call could go out now without queueing behind or taking budget from anyone
+        if not self.enabled:
+            return True
+        with self.cond:
+            now = time.monotonic()
+            if self.waiting or self.paused_until > now:
+                return False
+            return self.tokens.wait_time(tokens, now) <= 0 and all(bucket.wait_time(1, now) <= 0
+                                                                   for bucket in self._buckets())
+
+    def observe(self, ticket, status_code, headers):
+        # Response headers are the source of truth (unless overtaken by a later call's); budget still owed
+        # to other in-flight calls is kept out
+        if ticket is None:
+            return
+        with self.cond:
+            self.inflight.pop(ticket, None)
+            now = time.monotonic()
+            remaining_tokens = headers.get('x-ratelimit-remaining-tokens')
+            remaining_requests = headers.get('x-ratelimit-remaining-requests')
+            synced = []
+            try:
+                if remaining_tokens is not None:
+                    synced.append(self.tokens.sync(float(headers.get('x-ratelimit-limit-tokens') or 0),
+                                                   float(remaining_tokens),
+                                                   self.parse_duration(headers.get('x-ratelimit-reset-tokens')), now,
+                                                   owed=sum(self.inflight.values())))
+                if remaining_requests is not None:
+                    limit = float(headers.get('x-ratelimit-limit-requests') or 0)
+                    reset = self.parse_duration(headers.get('x-ratelimit-reset-requests'))
+                    if self.requests is None:
+                        self.requests = TokenBucket(limit or float(remaining_requests) or 1, reset or 60)
+                    synced.append(self.requests.sync(limit, float(remaining_requests), reset, now,
+                                                     owed=len(self.inflight)))
+                if any(synced):
+                    self.stats["header_syncs"] += 1
+                if not all(synced):
+                    self.stats["stale_headers"] += 1
+            except ValueError:
+                pass
+            if status_code == 429:
+                self.stats["throttled_429"] += 1
+                pause = (self.parse_duration(headers.get('retry-after'))
+                         or self.parse_duration(headers.get('x-ratelimit-reset-tokens'))
+                         or self.default_pause)
+                self.paused_until = max(self.paused_until, now + pause)
+            self.cond.notify_all()
+
+    def release(self, ticket):
+        # The call never reached Groq (connection error): nothing to sync
+        if ticket is None:
+            return
+        with self.cond:
+            self.inflight.pop(ticket, None)
+            self.cond.notify_all()
+
+    def snapshot(self):
+        with self.cond:
+            now = time.monotonic()
+            buckets = {}
+            for name, bucket in (("requests_per_minute", self.rpm), ("requests", self.requests),
+                                 ("tokens", self.tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    buckets[name] = {"level": round(bucket.level, 1), "capacity": bucket.capacity,
+                                     "refill_per_minute": round(bucket.rate * 60, 2)}
+            waits = {}
+            for priority, name in ((self.LIVE, "live"), (self.BACKGROUND, "background")):
+                ordered = sorted(self.waits[priority])
+                if ordered:
+                    waits[name] = {"count": len(ordered),
+                                   "p50_ms": round(LatencyTracer.percentile(ordered, 50) * 1000, 1),
+                                   "p95_ms": round(LatencyTracer.percentile(ordered, 95) * 1000, 1),
+                                   "max_ms": round(ordered[-1] * 1000, 1)}
+            stats = dict(self.stats)
+            stats.update({
+                "enabled": self.enabled,
+                "queue_depth": len(self.waiting),
+                "queued_live": sum(1 for entry in self.waiting if entry[0] == self.LIVE),
+                "inflight": len(self.inflight),
+                "paused_for_s": round(max(0.0, self.paused_until - now), 2),
+                "buckets": buckets,
+                "wait": waits
+            })
+        return stats
+
+class RequestHedger:
+    # Tail-latency hedging for live Groq calls: if the first byte hasn't arrived after a delay taken from
+    # recent first-byte percentiles, a second request goes out and the first to answer wins. Hedges are
+    # capped at max_ratio of calls (with a small burst) so quota use stays close to one call per answer.
+    def __init__(self, enabled=False, max_ratio=0.1, burst=2.0, percentile=95, min_delay=0.25, max_delay=5.0,
+                 default_delay=1.5, min_samples=20, history=200):
+        self.enabled = enabled
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay  # Until min_samples first-byte times are known
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.budget = burst
+        self.first_byte = {"stream": deque(maxlen=history), "complete": deque(maxlen=history)}
+        self.stats = {"calls": 0, "hedged": 0, "hedge_won": 0, "primary_won": 0, "losers_cancelled": 0,
+                      "skipped_ratio": 0, "skipped_quota": 0}
+
+    def delay(self, kind):
+        # Streamed calls wait for the first token, others for the whole completion: tracked apart
+        with self.lock:
+            ordered = sorted(self.first_byte[kind])
+        if len(ordered) < self.min_samples:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, LatencyTracer.percentile(ordered, self.percentile)))
+
+    def observe(self, kind, seconds):
+        with self.lock:
+            self.first_byte[kind].append(seconds)
+
+    def start_call(self):
+        with self.lock:
+            self.stats["calls"] += 1
+            self.budget = min(self.burst, self.budget + self.max_ratio)
+
+    def allow(self):
+        with self.lock:
+            if self.budget < 1:
+                self.stats["skipped_ratio"] += 1
+                return False
+            self.budget -= 1
+            self.stats["hedged"] += 1
+            return True
+
+    def record(self, stat, count=1):
+        with self.lock:
+            self.stats[stat] += count
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["enabled"] = self.enabled
+            stats["max_ratio"] = self.max_ratio
+            stats["hedge_rate"] = round(stats["hedged"] / stats["calls"], 3) if stats["calls"] else 0.0
+            stats["hedge_win_rate"] = round(stats["hedge_won"] / stats["hedged"], 3) if stats["hedged"] else None
+            samples = {kind: list(values) for kind, values in self.first_byte.items()}
+        stats["first_byte"] = {}
+        for kind, values in samples.items():
+            if values:
+                ordered = sorted(values)
+                stats["first_byte"][kind] = {"count": len(ordered),
+                                             "p50_ms": round(LatencyTracer.percentile(ordered, 50) * 1000, 1),
+                                             "p95_ms": round(LatencyTracer.percentile(ordered, 95) * 1000, 1),
+                                             "hedge_after_ms": round(self.delay(kind) * 1000, 1)}
+        return stats
+
+class GroqClient:
+    # One keep-alive session for every chat completion: shared retry/backoff, model fallback and parsing
+    API_URL = "https://api.groq.com/openai/v1/chat/completions"
+    MODELS = ["llama-3.1-8b-instant", "llama3-8b-8192"]
+
+    def __init__(self, url=None, models=None, pool_size=8, max_attempts=3, connect_timeout=5, scheduler=None,
+                 completion_tokens=256, hedger=None):
+        self.url = url or os.getenv('GROQ_API_URL') or self.API_URL
+        self.models = list(models or self.MODELS)
+        self.max_attempts = max_attempts
+        self.connect_timeout = connect_timeout
+        self.pool_size = pool_size
+        self.scheduler = scheduler or RateLimitScheduler(enabled=False)
+        self.completion_tokens = completion_tokens
+        self.hedger = hedger or RequestHedger(enabled=False)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Built on first use so importing requests stays off the startup path
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    @staticmethod
+    def backoff_seconds(attempt):
+        return min(8, (2 ** attempt)) + random.uniform(0, 0.25)
+
+    @staticmethod
+    def pause(seconds, handle=None):
+        # Retry backoff; cancelling the handle ends it early
+        if handle is None:
+            time.sleep(seconds)
+        else:
+            handle.cancelled.wait(seconds)
+
+    @staticmethod
+    def abort(resp):
+        # resp.close() doesn't wake a read blocked in another thread; shutting the socket down does
+        try:
+            resp.raw._connection.sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+        return True
+
+    @staticmethod
+    def extract_text(data):
+        choices = data.get("choices", []) or []
+        first_choice = (choices[0] if len(choices) > 0 else {}) or {}
+        message_obj = first_choice.get("message", {}) or {}
+        return (message_obj.get("content") or first_choice.get("text") or "").strip()
+
+    def estimate_tokens(self, messages):
+        # Rough prompt size (~4 chars per token) plus an allowance for the completion
+        chars = sum(len(message.get("content") or "") for message in messages)
+        return chars // 4 + self.completion_tokens
+
+    def chat(self, api_key, messages, models=None, timeout=60, on_delta=None, should_stop=None,
+             priority=RateLimitScheduler.LIVE, handle=None):
+        if self.hedger.enabled and priority == RateLimitScheduler.LIVE:
+            return self._hedged_chat(api_key, messages, list(models or self.models), timeout, on_delta, should_stop,
+                                     handle)
+        return self._chat(api_key, messages, models, timeout, on_delta, should_stop, priority, handle)
+
+    def _hedged_chat(self, api_key, messages, models, timeout, on_delta, should_stop, handle):
+        # Primary on the first model; if it's slow to its first byte, a hedge on the fallback model (or the
+        # same one) races it. The first to produce output wins and the other is cancelled.
+        hedger = self.hedger
+        hedger.start_call()
+        kind = "complete" if on_delta is None else "stream"
+        lock = threading.Lock()
+        racers = []  # [child handle, started]
+        race = {"winner": None}
+        settled = threading.Event()
+        results = queue.Queue()
+
+        def claim(index):
+            with lock:
+                if race["winner"] is None:
+                    race["winner"] = index
+                    now = time.monotonic()
+                    hedger.observe(kind, now - racers[index][1])
+                    if index != 0:
+                        # The primary hasn't answered yet: its first byte is at least this late
+                        hedger.observe(kind, now - racers[0][1])
+                    losers = [child for i, (child, _) in enumerate(racers) if i != index]
+                else:
+                    losers = None
+                won = race["winner"] == index
+            if losers is not None:
+                settled.set()
+                if losers:
+                    hedger.record("primary_won" if index == 0 else "hedge_won")
+                for child in losers:
+                    if not child.is_cancelled():
+                        child.cancel("hedge lost")
+                        hedger.record("losers_cancelled")
+            return won
+
+        def run(index, racer_models):
+            child = racers[index][0]
+            remove = handle.on_cancel(lambda: child.cancel(handle.reason)) if handle is not None else None
+
+            def racer_delta(delta):
+                if claim(index):
+                    on_delta(delta)
+            try:
+                text = self._chat(api_key, messages, racer_models, timeout, racer_delta if on_delta else None,
+                                  should_stop, RateLimitScheduler.LIVE, child)
+                # An empty stream (or a non-streamed call) claims at completion
+                results.put((index, text, None) if claim(index) else (index, None, None))
+            except Exception as e:
+                results.put((index, None, e))
+            finally:
+                if remove is not None:
+                    remove()
+                settled.set()
+
+        def start(racer_models):
+            with lock:
+                racers.append([WorkHandle(), time.monotonic()])
+                index = len(racers) - 1
+            threading.Thread(target=run, args=(index, racer_models), name="groq-hedge", daemon=True).start()
+
+        start(models)
+        pending = 1
+        if not settled.wait(hedger.delay(kind)) and (handle is None or not handle.is_cancelled()):
+            if not self.scheduler.has_headroom(self.estimate_tokens(messages)):
+                hedger.record("skipped_quota")
+            elif hedger.allow():
+                start(models[1:] + models[:1] if len(models) > 1 else models)
+                pending += 1
+        error = None
+        while pending:
+            index, text, err = results.get()
+            pending -= 1
+            if err is None and text is not None:
+                return text
+            if err is not None and race["winner"] in (None, index):
+                error = err
+            # The winner failed mid-stream: a cancelled loser can't take over, so stop here
+            if err is not None and race["winner"] == index:
+                break
+        raise error or Exception("No successful response from Groq")
+
+    def _chat(self, api_key, messages, models=None, timeout=60, on_delta=None, should_stop=None,
+              priority=RateLimitScheduler.LIVE, handle=None):
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        stream = on_delta is not None
+        last_error = None
+        cost = self.estimate_tokens(messages)
+        for model_id in (models or self.models):
+            payload = {"model": model_id, "messages": messages}
+            if stream:
+                payload["stream"] = True
+            for attempt in range(self.max_attempts):
+                if handle is not None and handle.is_cancelled():
+                    raise Exception("Request cancelled")
+                ticket = self.scheduler.acquire(priority, cost, handle)
+                try:
+                    resp = self.session.post(self.url, headers=headers, json=payload,
+                                             timeout=(self.connect_timeout, timeout), stream=stream)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as conn_err:
+                    self.scheduler.release(ticket)
+                    last_error = f"Connection error talking to Groq for {model_id}: {conn_err}"
+                    self.pause(self.backoff_seconds(attempt), handle)
+                    continue
+                status_code = resp.status_code
+                self.scheduler.observe(ticket, status_code, resp.headers)
+                if handle is not None and handle.is_cancelled():
+                    # Cancelled while waiting for the response: drop it unread
+                    resp.close()
+                    raise Exception("Request cancelled")
+                # Retry on 429 or 5xx (only before any token has been consumed)
+                if status_code == 429 or (500 <= status_code < 600):
+                    resp.close()
+                    last_error = f"HTTP {status_code} from Groq for {model_id}"
+                    # With pacing on, a 429 pauses the scheduler for Retry-After instead
+                    if ticket is None or status_code != 429:
+                        self.pause(self.backoff_seconds(attempt), handle)
+                    continue
+                try:
+                    resp.raise_for_status()
+                except requests.exceptions.HTTPError as http_err:
+                    try:
+                        error_json = resp.json()
+                    except Exception:
+                        error_json = {"message": resp.text}
+                    message_text = str(error_json)
+                    last_error = f"HTTP {status_code} from Groq for {model_id}: {message_text}"
+                    if "invalid_model" in message_text.lower():
+                        # Try next model
+                        break
+                    # Non-retryable error
+                    raise Exception(last_error) from http_err
+                if stream:
+                    return self._read_sse_stream(resp, on_delta, should_stop, handle)
+                return self.extract_text(resp.json())
+        raise Exception(last_error or "No successful response from Groq")
+
+    def _read_sse_stream(self, resp, on_delta, should_stop=None, handle=None):
+        # Parse OpenAI-style server-sent events: "data: {...}" lines, terminated by "data: [DONE]"
+        parts = []
+        stopped = False
+        remove_abort = handle.on_cancel(lambda: self.abort(resp)) if handle is not None else None
+        try:
+            for raw_line in resp.iter_lines(decode_unicode=True):
+                if should_stop is not None and should_stop():
+                    stopped = True
+                    break
+                if handle is not None and handle.is_cancelled():
+                    break
+                if not raw_line or raw_line.startswith(':'):
+                    continue
+                if not raw_line.startswith('data:'):
+                    continue
+                data_str = raw_line[5:].strip()
+                if data_str == '[DONE]':
+                    break
+                try:
+                    chunk = json.loads(data_str)
+                except ValueError:
+                    continue
+                choices = chunk.get("choices", []) or []
+                first_choice = (choices[0] if len(choices) > 0 else {}) or {}
+                delta_obj = first_choice.get("delta", {}) or {}
+                delta = delta_obj.get("content") or first_choice.get("text") or ""
+                if delta:
+                    parts.append(delta)
+                    try:
+                        on_delta(delta)
+                    except Exception:
+                        pass
+        except Exception:
+            # An aborted connection surfaces as a read error
+            if handle is None or not handle.is_cancelled():
+                raise
+        finally:
+            if remove_abort is not None:
+                remove_abort()
+            resp.close()
+        if stopped or (handle is not None and handle.is_cancelled()):
+            # Partial text must not pass for an answer (or land in the response cache)
+            raise Exception("Request cancelled")
+        return "".join(parts).strip()
+
+class VoiceActivityDetector:
+    # Frame energy / zero-crossing VAD over raw PCM with a continuously adapting noise floor.
+    # feed() segments a live stream into phrases at natural pauses; trim()/split_phrases() work on whole buffers.
+    def __init__(self, sample_rate=16000, sample_width=2, frame_ms=30, energy_ratio=2.5, min_rms=60.0,
+                 max_zcr=0.35, hangover_ms=240, pad_ms=150, pause_ms=800, min_speech_ms=120,
+                 max_phrase_s=30, noise_alpha=0.05, interim_ms=300):
+        self.frame_ms = frame_ms
+        self.energy_ratio = energy_ratio
+        self.min_rms = min_rms
+        self.max_zcr = max_zcr
+        self.hangover_ms = hangover_ms
+        self.pad_ms = pad_ms
+        self.pause_ms = pause_ms
+        self.interim_ms = interim_ms
+        self.on_interim = None  # Called with the phrase so far at a short pause, before it is final
+        self.min_speech_ms = min_speech_ms
+        self.max_phrase_s = max_phrase_s
+        self.noise_alpha = noise_alpha
+        self.noise_floor = None
+        self.stats = {"bytes_in": 0, "bytes_out": 0, "phrases": 0, "forced_splits": 0, "discarded": 0}
+        self.configure(sample_rate, sample_width)
+
+    def configure(self, sample_rate, sample_width):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_len = max(1, int(sample_rate * self.frame_ms / 1000))
+        self.frame_bytes = self.frame_len * sample_width
+        self.hangover_frames = int(self.hangover_ms / self.frame_ms)
+        self.pad_frames = int(self.pad_ms / self.frame_ms)
+        self.pause_frames = max(1, int(self.pause_ms / self.frame_ms))
+        self.interim_frames = max(1, int(self.interim_ms / self.frame_ms))
+        self.min_speech_frames = max(1, int(self.min_speech_ms / self.frame_ms))
+        self.max_phrase_frames = int(self.max_phrase_s * 1000 / self.frame_ms)
+        self.reset_stream()
+
+    def reset_stream(self):
+        self.pending = b""
+        self.preroll = []
+        self.phrase_frames = []
+        self.phrase_rms = []
+        self.phrase_speech_frames = 0
+        self.silence_run = 0
+
+    def _samples(self, pcm):
+        # Little-endian signed PCM as delivered by sr.Microphone / sr.AudioFile, scaled to the int16 range
+        if self.sample_width == 2:
+            return np.frombuffer(pcm, dtype='<i2').astype(np.float32)
+        if self.sample_width == 4:
+            return np.frombuffer(pcm, dtype='<i4').astype(np.float32) / 65536.0
+        if self.sample_width == 1:
+            return np.frombuffer(pcm, dtype=np.int8).astype(np.float32) * 256.0
+        raise ValueError(f"Unsupported sample width: {self.sample_width}")
+
+    def frame_features(self, pcm):
+        samples = self._samples(pcm)
+        n_frames = len(samples) // self.frame_len
+        frames = samples[: n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1) if self.frame_len > 1 else np.zeros(n_frames)
+        return rms, zcr
+
+    def classify(self, rms, zcr):
+        if rms.size == 0:
+            return np.zeros(0, dtype=bool)
+        if self.noise_floor is None:
+            self.noise_floor = max(float(np.percentile(rms, 10)), 1.0)
+        threshold = max(self.min_rms, self.noise_floor * self.energy_ratio)
+        # Loud frames are speech; quieter ones must also look voiced (low zero-crossing rate, unlike hiss)
+        mask = (rms > threshold) & ((zcr < self.max_zcr) | (rms > threshold * 2))
+        quiet = rms[~mask]
+        if quiet.size:
+            # Same result as a per-frame EMA over the quiet frames, done in one step
+            alpha = 1.0 - (1.0 - self.noise_alpha) ** quiet.size
+            self.noise_floor = max((1.0 - alpha) * self.noise_floor + alpha * float(np.median(quiet)), 1.0)
+        return mask
+
+    def speech_mask(self, pcm):
+        rms, zcr = self.frame_features(pcm)
+        mask = self.classify(rms, zcr)
+        if self.hangover_frames and mask.any():
+            mask = np.convolve(mask, np.ones(self.hangover_frames + 1), mode='full')[: mask.size] > 0
+        return mask, rms
+
+    def trim(self, pcm):
+        # Drop leading/trailing silence, keeping pad_ms around the speech
+        mask, _ = self.speech_mask(pcm)
+        self.stats["bytes_in"] += len(pcm)
+        if not mask.any():
+            return b""
+        first = max(0, int(np.argmax(mask)) - self.pad_frames)
+        last = min(mask.size, mask.size - int(np.argmax(mask[::-1])) + self.pad_frames)
+        out = pcm[first * self.frame_bytes: last * self.frame_bytes]
+        self.stats["bytes_out"] += len(out)
+        return out
+
+    def split_phrases(self, pcm):
+        # Whole-buffer segmentation: phrases end at pauses >= pause_ms, over-long ones split at the quietest frame
+        mask, rms = self.speech_mask(pcm)
+        self.stats["bytes_in"] += len(pcm)
+        speech_idx = np.flatnonzero(mask)
+        if speech_idx.size == 0:
+            return []
+        breaks = np.flatnonzero(np.diff(speech_idx) > self.pause_frames)
+        starts = np.concatenate(([speech_idx[0]], speech_idx[breaks + 1]))
+        ends = np.concatenate((speech_idx[breaks], [speech_idx[-1]])) + 1
+        phrases = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if end - start < self.min_speech_frames:
+                self.stats["discarded"] += 1
+                continue
+            start = max(0, start - self.pad_frames)
+            end = min(mask.size, end + self.pad_frames)
+            while end - start > self.max_phrase_frames:
+                cut = self._quietest_frame(rms, start, start + self.max_phrase_frames)
+                phrases.append(pcm[start * self.frame_bytes: cut * self.frame_bytes])
+                self.stats["forced_splits"] += 1
+                start = cut
+            phrases.append(pcm[start * self.frame_bytes: end * self.frame_bytes])
+        self.stats["phrases"] += len(phrases)
+        self.stats["bytes_out"] += sum(len(p) for p in phrases)
+        return phrases
+
+    def _quietest_frame(self, rms, start, end):
+        # Search the last third of the window so forced splits still leave long phrases
+        lo = start + (end - start) * 2 // 3
+        return lo + int(np.argmin(rms[lo:end])) if end > lo else end
+
+    def feed(self, chunk):
+        # Streaming segmentation; returns the phrases completed by this chunk
+        self.stats["bytes_in"] += len(chunk)
+        data = self.pending + chunk
+        usable = len(data) - len(data) % self.frame_bytes
+        self.pending = data[usable:]
+        if not usable:
+            return []
+        rms, zcr = self.frame_features(data[:usable])
+        mask = self.classify(rms, zcr)
+        phrases = []
+        for i, is_speech in enumerate(mask.tolist()):
+            frame = data[i * self.frame_bytes: (i + 1) * self.frame_bytes]
+            if not self.phrase_frames:
+                if not is_speech:
+                    self.preroll.append(frame)
+                    if len(self.preroll) > self.pad_frames:
+                        self.preroll.pop(0)
+                    continue
+                self.phrase_frames = self.preroll + [frame]
+                self.phrase_rms = [0.0] * len(self.preroll) + [float(rms[i])]
+                self.preroll = []
+                self.phrase_speech_frames = 1
+                self.silence_run = 0
+                continue
+            self.phrase_frames.append(frame)
+            self.phrase_rms.append(float(rms[i]))
+            if is_speech:
+                self.phrase_speech_frames += 1
+                self.silence_run = 0
+            else:
+                self.silence_run += 1
+                if (self.silence_run == self.interim_frames < self.pause_frames and self.on_interim is not None
+                        and self.phrase_speech_frames >= self.min_speech_frames):
+                    self.on_interim(b"".join(self.phrase_frames))
+            if self.silence_run >= self.pause_frames:
+                keep = len(self.phrase_frames) - self.silence_run + self.pad_frames
+                phrases.extend(self._emit(keep))
+            elif len(self.phrase_frames) >= self.max_phrase_frames:
+                cut = self._quietest_frame(np.asarray(self.phrase_rms), 0, len(self.phrase_frames))
+                self.stats["forced_splits"] += 1
+                phrases.extend(self._emit(max(cut, 1), carry_over=True))
+        return phrases
+
+    def flush(self):
+        if not self.phrase_frames:
+            self.reset_stream()
+            return []
+        phrases = self._emit(len(self.phrase_frames) - max(0, self.silence_run - self.pad_frames))
+        self.reset_stream()
+        return phrases
+
+    def _emit(self, keep, carry_over=False):
+        frames = self.phrase_frames[:keep]
+        rest_frames = self.phrase_frames[keep:]
+        rest_rms = self.phrase_rms[keep:]
+        speech_frames = self.phrase_speech_frames
+        self.phrase_frames = []
+        self.phrase_rms = []
+        self.phrase_speech_frames = 0
+        self.silence_run = 0
+        if carry_over and rest_frames:
+            # Forced split: the tail continues as the start of the next phrase
+            self.phrase_frames = rest_frames
+            self.phrase_rms = rest_rms
+            self.phrase_speech_frames = 1
+        if speech_frames < self.min_speech_frames:
+            self.stats["discarded"] += 1
+            return []
+        phrase = b"".join(frames)
+        self.stats["phrases"] += 1
+        self.stats["bytes_out"] += len(phrase)
+        return [phrase]
+
+    def snapshot(self):
+        stats = dict(self.stats)
+        stats["bytes_saved"] = max(0, stats["bytes_in"] - stats["bytes_out"])
+        stats["saved_ratio"] = round(stats["bytes_saved"] / stats["bytes_in"], 4) if stats["bytes_in"] else 0.0
+        stats["noise_floor"] = round(self.noise_floor, 2) if self.noise_floor is not None else None
+        return stats
+
+class BargeInDetector:
+    # Speech over our own playback. Speakers leak into the mic, so the level heard in the first moments
+    # after playback starts is taken as echo, and only sustained voiced frames well above it count.
+    def __init__(self, vad, calibrate_ms=450, echo_ratio=2.0, min_speech_ms=270, max_gap_ms=90, keep_ms=1500):
+        self.vad = vad
+        self.calibrate_ms = calibrate_ms
+        self.echo_ratio = echo_ratio
+        self.min_speech_ms = min_speech_ms
+        self.max_gap_ms = max_gap_ms
+        self.keep_ms = keep_ms
+        self.armed = False  # Set once the browser reports playback started
+        self.reset()
+
+    def reset(self):
+        frame_ms = self.vad.frame_ms
+        self.calibrate_frames = max(1, int(self.calibrate_ms / frame_ms))
+        self.min_speech_frames = max(1, int(self.min_speech_ms / frame_ms))
+        self.max_gap_frames = int(self.max_gap_ms / frame_ms)
+        self.recent = deque(maxlen=max(1, int(self.keep_ms / frame_ms)))
+        self.pending = b""
+        self.echo_levels = []
+        self.echo_level = None
+        self.speech_run = 0
+        self.gap_run = 0
+
+    def feed(self, chunk):
+        # Returns the audio since the user started talking once barge-in is certain, else None
+        vad = self.vad
+        data = self.pending + chunk
+        usable = len(data) - len(data) % vad.frame_bytes
+        self.pending = data[usable:]
+        if not usable or not self.armed:
+            return None
+        rms, zcr = vad.frame_features(data[:usable])
+        floor = max(vad.min_rms, (vad.noise_floor or 0.0) * vad.energy_ratio)
+        for i in range(len(rms)):
+            self.recent.append(data[i * vad.frame_bytes:(i + 1) * vad.frame_bytes])
+            if self.echo_level is None:
+                self.echo_levels.append(float(rms[i]))
+                if len(self.echo_levels) >= self.calibrate_frames:
+                    self.echo_level = float(np.percentile(self.echo_levels, 90))
+                continue
+            if rms[i] > max(floor, self.echo_level * self.echo_ratio) and zcr[i] < vad.max_zcr:
+                self.speech_run += 1 + self.gap_run
+                self.gap_run = 0
+            elif self.speech_run:
+                self.gap_run += 1
+                if self.gap_run > self.max_gap_frames:
+                    self.speech_run = self.gap_run = 0
+            if self.speech_run >= self.min_speech_frames:
+                # A little lead-in too, as the VAD's preroll would keep
+                frames = list(self.recent)[-(self.speech_run + self.gap_run + vad.pad_frames):]
+                self.reset()
+                return b"".join(frames)
+        return None
+
+class QuestionClassifier:
+    # Question intent in one regex pass over the lowercased text; scores suit partial transcripts too
+    PATTERN = re.compile(
+        r"^(?P<wh>(?:what|why|how|when|where|who|whom|whose|which)\b)"
+        r"|^(?P<aux_subject>(?:can|could|would|should|is|are|do|does|am|was|were|have|has|had|will|shall)\s+"
+        r"(?:you|we|i|it|there|they|he|she|the|a|an|my|your|our|someone|anyone)\b)"
+        r"|^(?P<aux>(?:can|could|would|should|is|are|do|does|am|was|were|have|has|had|will|shall)\b)"
+        r"|(?P<phrase>tell me about|i'd like to know|can you explain|i was wondering|do you know|what about|how about)"
+        r"|(?P<mark>\?)\s*$"
+    )
+    WEIGHTS = {"mark": 0.95, "wh": 0.9, "aux_subject": 0.85, "phrase": 0.8, "aux": 0.6}
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+
+    def score(self, text):
+        text = (text or "").lower().strip()
+        return max((self.WEIGHTS[match.lastgroup] for match in self.PATTERN.finditer(text)), default=0.0)
+
+    def is_question(self, text):
+        return self.score(text) >= self.threshold
+
+class SpeculativeAnswer:
+    # An answer started from an interim transcript; kept if the final transcript asks the same thing
+    def __init__(self, key, question):
+        self.key = key
+        self.question = question
+        self.started = time.monotonic()
+        self.work = WorkHandle()
+        self.cancelled = self.work.cancelled
+        self.status = "running"  # running, done, failed, cancelled
+        self.from_cache = False
+        self.tokens = 0
+
+    def cancel(self):
+        self.work.cancel("speculation missed")
+
+class ProctoringEngine:
+    # Camera heuristics over small grayscale frames (uint16 width, uint16 height little-endian, then pixels):
+    # frame-difference motion energy, frozen or dark camera, and face-region presence against a baseline
+    # taken from the first frames of the interview. Conditions must persist before a note is emitted, each
+    # kind at most once per note_interval. A per-session CPU budget sheds frames instead of falling behind.
+    LABELS = {"frozen": "Camera frozen", "dark": "Camera dark or covered", "absent": "Face not visible",
+              "movement": "Frequent movement"}
+
+    def __init__(self, on_note=None, cpu_budget=0.02, budget_window=1.0, max_fps=4, buffer_frames=16,
+                 calibration_frames=4, min_duration=3.0, note_interval=30.0, max_pixels=320 * 240):
+        self.on_note = on_note
+        self.cpu_budget = cpu_budget  # Fraction of one core
+        self.budget_window = budget_window
+        self.max_fps = max_fps
+        self.buffer_frames = buffer_frames
+        self.calibration_frames = calibration_frames
+        self.min_duration = min_duration
+        self.note_interval = note_interval
+        self.max_pixels = max_pixels
+        # Thresholds in grey levels (0-255)
+        self.frozen_motion = 0.1
+        self.dark_level = 18.0
+        self.movement_motion = 12.0
+        self.movement_share = 0.5
+        self.absent_presence = 0.45
+        self.baseline_alpha = 0.05  # Follows slow pose/lighting drift while the face is clearly there
+        self.lock = threading.Lock()
+        self.notes = deque(maxlen=10)
+        self.stats = {"frames_in": 0, "analyzed": 0, "skipped_rate": 0, "skipped_budget": 0, "rejected": 0,
+                      "notes": 0, "cpu_ms": 0.0}
+        self.reset()
+
+    def reset(self):
+        # New interview: fresh baseline, history and episodes
+        with self.lock:
+            self.shape = None
+            self.prev = None
+            self.metrics = None  # Rolling (buffer_frames, 3): motion, brightness, presence
+            self.filled = 0
+            self.cursor = 0
+            self.baseline_center = None
+            self.baseline_texture = None
+            self.calibration = []
+            self.started_at = None
+            self.onsets = {}
+            self.last_note = {}
+            self.last_frame_at = -1e9
+            self.window_start = -1e9
+            self.window_spent = 0.0
+            self.last = {}
+
+    def decode(self, data):
+        if len(data) < 4:
+            return None
+        width, height = np.frombuffer(bytes(data[:4]), dtype='<u2')
+        width, height = int(width), int(height)
+        if width < 8 or height < 8 or width * height > self.max_pixels or len(data) != 4 + width * height:
+            return None
+        return np.frombuffer(data, dtype=np.uint8, offset=4).reshape(height, width)
+
+    def submit(self, data, now=None):
+        # Returns True when the frame was analyzed, False when shed or malformed
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.stats["frames_in"] += 1
+            if now - self.last_frame_at < 1.0 / self.max_fps:
+                self.stats["skipped_rate"] += 1
+                return False
+            if now - self.window_start >= self.budget_window:
+                self.window_start = now
+                self.window_spent = 0.0
+            if self.window_spent >= self.cpu_budget * self.budget_window:
+                self.stats["skipped_budget"] += 1
+                return False
+            started = time.thread_time()
+            frame = self.decode(data)
+            if frame is None:
+                self.stats["rejected"] += 1
+                return False
+            notes = self._analyze(frame, now)
+            spent = time.thread_time() - started
+            self.window_spent += spent
+            self.last_frame_at = now
+            self.stats["analyzed"] += 1
+            self.stats["cpu_ms"] += spent * 1000
+        for note in notes:
+            if self.on_note is not None:
+                self.on_note(note)
+        return True
+
+    def _center(self, frame):
+        height, width = frame.shape
+        return frame[height // 8: height - height // 8, width // 4: width - width // 4]
+
+    def _analyze(self, frame, now):
+        if frame.shape != self.shape:
+            # Resolution changed mid-interview: start over rather than compare mismatched frames
+            self.shape = frame.shape
+            self.prev = None
+            self.metrics = np.zeros((self.buffer_frames, 3), dtype=np.float32)
+            self.filled = 0
+            self.baseline_center = None
+            self.calibration = []
+        if self.started_at is None:
+            self.started_at = now
+        pixels = frame.astype(np.float32)
+        brightness = float(pixels.mean())
+        motion = float(np.abs(pixels - self.prev).mean()) if self.prev is not None else None
+        self.prev = pixels
+        center = self._center(pixels)
+        texture = float(np.abs(np.diff(center, axis=1)).mean() + np.abs(np.diff(center, axis=0)).mean())
+        centered = center - center.mean()  # Zero-mean so lighting shifts don't read as a different scene
+        presence = None
+        if self.baseline_center is None:
+            if brightness >= self.dark_level and (motion is None or motion > self.frozen_motion):
+                self.calibration.append((centered, texture))
+            if len(self.calibration) >= self.calibration_frames:
+                self.baseline_center = np.mean([c for c, _ in self.calibration], axis=0)
+                self.baseline_texture = max(1e-3, float(np.mean([t for _, t in self.calibration])))
+                self.calibration = []
+        else:
+            # Presence: correlation of the face region with the baseline, capped by how much detail is left
+            norm = math.sqrt(float((centered * centered).sum()) * float((self.baseline_center * self.baseline_center).sum()))
+            correlation = float((centered * self.baseline_center).sum()) / norm if norm else 0.0
+            presence = max(0.0, min(correlation, texture / self.baseline_texture, 1.0))
+            if presence > 0.8:
+                self.baseline_center += self.baseline_alpha * (centered - self.baseline_center)
+        self.metrics[self.cursor] = (motion if motion is not None else 0.0, brightness,
+                                     presence if presence is not None else 1.0)
+        self.cursor = (self.cursor + 1) % self.buffer_frames
+        self.filled = min(self.filled + 1, self.buffer_frames)
+        window = self.metrics[:self.filled]
+        moving_share = float(np.mean(window[:, 0] > self.movement_motion)) if self.filled > 1 else 0.0
+        self.last = {"motion": round(motion, 2) if motion is not None else None, "brightness": round(brightness, 1),
+                     "presence": round(presence, 2) if presence is not None else None,
+                     "moving_share": round(moving_share, 2), "calibrated": self.baseline_center is not None}
+        notes = []
+        dark = brightness < self.dark_level
+        still = motion is not None and motion < self.movement_motion
+        # Movement is already a share of the rolling window, so it needs no extra persistence
+        for kind, active, sustain in (
+                ("frozen", motion is not None and motion <= self.frozen_motion and not dark, self.min_duration),
+                ("dark", dark, self.min_duration),
+                ("absent", presence is not None and presence < self.absent_presence and still and not dark,
+                 self.min_duration),
+                ("movement", self.filled >= self.buffer_frames // 2 and moving_share >= self.movement_share, 0)):
+            note = self._condition(kind, active, now, sustain)
+            if note:
+                notes.append(note)
+        return notes
+
+    def _condition(self, kind, active, now, sustain):
+        if not active:
+            self.onsets.pop(kind, None)
+            return None
+        onset = self.onsets.setdefault(kind, now)
+        if now - onset < sustain or now - self.last_note.get(kind, -1e9) < self.note_interval:
+            return None
+        self.last_note[kind] = now
+        elapsed = int(onset - self.started_at)
+        note = f"{self.LABELS[kind]} at {elapsed // 60}:{elapsed % 60:02d}"
+        self.notes.append(note)
+        self.stats["notes"] += 1
+        return note
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["cpu_ms"] = round(stats["cpu_ms"], 2)
+            stats["ms_per_frame"] = round(stats["cpu_ms"] / stats["analyzed"], 3) if stats["analyzed"] else None
+            stats["last"] = dict(self.last)
+            stats["notes_recent"] = list(self.notes)
+        return stats
+
+class EelUi:
+    # Desktop window: Python -> JS calls through Eel (broadcast to the app's one window)
+    def update_ui(self, question, answer):
+        eel.update_ui(question, answer)
+
+    def update_ui_stream(self, stream_id, delta):
+        eel.update_ui_stream(stream_id, delta)
+
+    def queue_tts_audio(self, clip_id, seq, audio_url, is_last):
+        eel.queue_tts_audio(clip_id, seq, audio_url, is_last)
+
+    def stop_audio(self):
+        eel.stop_tts_audio()
+
+class SessionChannel:
+    # Server mode: the same calls as EelUi, sent only to this session's /session/<id> websocket.
+    # Messages wait in a bounded backlog: while the socket is away (reconnect, page reload), and until
+    # the sender greenlet on the socket's hub sends them, since worker threads must not touch the socket.
+    def __init__(self, session_id, backlog=200):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.ws = None
+        self.hub = None  # The gevent hub the socket belongs to
+        self.wakeup = None  # Set (on that hub) when the backlog has something to send
+        self.backlog = deque(maxlen=backlog)
+        self.stats = {"sent": 0, "buffered": 0, "dropped": 0, "send_errors": 0}
+
+    @property
+    def connected(self):
+        return self.ws is not None
+
+    def update_ui(self, question, answer):
+        self.push("update_ui", [question, answer])
+
+    def update_ui_stream(self, stream_id, delta):
+        self.push("update_ui_stream", [stream_id, delta])
+
+    def queue_tts_audio(self, clip_id, seq, audio_url, is_last):
+        self.push("queue_tts_audio", [clip_id, seq, audio_url, is_last])
+
+    def stop_audio(self):
+        self.push("stop_tts_audio", [])
+
+    def push(self, fn, args):
+        message = json.dumps({"fn": fn, "args": args})
+        with self.lock:
+            if len(self.backlog) == self.backlog.maxlen:
+                self.stats["dropped"] += 1
+            self.backlog.append(message)
+            if self.ws is None:
+                self.stats["buffered"] += 1
+                return
+            hub, wakeup = self.hub, self.wakeup
+        # Safe from any thread: the set runs on the socket's hub, which wakes its sender greenlet
+        hub.loop.run_callback_threadsafe(wakeup.set)
+
+    def attach(self, ws):
+        # Called from the socket's greenlet; the sender runs beside it on the same hub
+        wakeup = gevent.event.Event()
+        with self.lock:
+            self.ws = ws
+            self.hub = gevent.get_hub()
+            self.wakeup = wakeup
+        gevent.spawn(self._send_loop, ws, wakeup)
+        wakeup.set()  # Flush whatever was buffered while away
+
+    def _send_loop(self, ws, wakeup):
+        while True:
+            wakeup.wait()
+            wakeup.clear()
+            while True:
+                with self.lock:
+                    if self.ws is not ws:
+                        return
+                    if not self.backlog:
+                        break
+                    message = self.backlog[0]
+                try:
+                    ws.send(message)
+                except Exception:
+                    with self.lock:
+                        self.stats["send_errors"] += 1
+                        if self.ws is ws:
+                            self.ws = None
+                    return
+                with self.lock:
+                    # A full backlog may have already dropped it to make room
+                    if self.backlog and self.backlog[0] is message:
+                        self.backlog.popleft()
+                    self.stats["sent"] += 1
+
+    def detach(self, ws):
+        with self.lock:
+            if self.ws is not ws:
+                return
+            self.ws = None
+            wakeup = self.wakeup
+        wakeup.set()  # Lets the sender see the socket is gone and exit
+
+class SharedResources:
+    # Process-wide pieces every session reuses: Groq connection pool, caches, worker pools, tracing.
+    # The caches and results store can be passed in (e.g. pointed at a temp dir); otherwise they come
+    # from the environment, defaulting to the project folder.
+    def __init__(self, tts_workers=4, prefetch_workers=2, evaluation_workers=2, http_pool=8, tts_cache=None,
+                 response_cache=None, results=None):
+        # GROQ_RATE_LIMIT=0 turns pacing off; GROQ_RPM/GROQ_TPM seed the budgets until headers arrive
+        self.scheduler = RateLimitScheduler(enabled=os.getenv('GROQ_RATE_LIMIT', '1') != '0',
+                                            requests_per_minute=int(os.getenv('GROQ_RPM', '30')),
+                                            tokens_per_minute=int(os.getenv('GROQ_TPM', '6000')))
+        # GROQ_HEDGE=1 races a second request against a slow live call; GROQ_HEDGE_RATIO caps how often
+        self.groq = GroqClient(pool_size=http_pool, scheduler=self.scheduler,
+                               hedger=RequestHedger(enabled=os.getenv('GROQ_HEDGE', '0') == '1',
+                                                    max_ratio=float(os.getenv('GROQ_HEDGE_RATIO', '0.1'))))
+        self.tts_cache = tts_cache if tts_cache is not None else TtsCache()
+        # TTS_BACKENDS sets the preference order; TTS_LATENCY_BUDGET_MS / TTS_TIMEOUT drive selection and fallback
+        self.tts_router = TtsRouter.from_env()
+        self.audio_store = AudioStore()  # Serves synthesized clips at /audio/<id>.mp3 (or .wav)
+        if response_cache is None:
+            response_cache = ResponseCache(persist_path=os.getenv('RESPONSE_CACHE_DB'))
+        self.response_cache = response_cache
+        # Interview results are kept only when RESULTS_DB names a file
+        if results is None:
+            results = ResultsStore(os.getenv('RESULTS_DB') or None)
+        self.results = results
+        # Per-stage latency tracing; LATENCY_TRACE=0 disables, LATENCY_TRACE_FILE appends spans as JSONL
+        self.tracer = LatencyTracer(enabled=os.getenv('LATENCY_TRACE', '1') != '0',
+                                    jsonl_path=os.getenv('LATENCY_TRACE_FILE'))
+        self.tts_executor = ThreadPoolExecutor(max_workers=tts_workers, thread_name_prefix="tts")
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="prefetch")
+        self.evaluation_executor = ThreadPoolExecutor(max_workers=evaluation_workers, thread_name_prefix="evaluate")
+
+class AudioAssistant:
+    def __init__(self, shared=None, ui=None, session_id=None, local_audio=True):
+        dotenv.load_dotenv()
+        shared = shared or SharedResources()
+        self.shared = shared
+        self.ui = ui or EelUi()
+        self.session_id = session_id
+        # Only the desktop session owns the machine's microphone; server sessions take typed answers
+        self.local_audio = local_audio
+        self.last_seen = time.monotonic()
+        self.max_answer_chars = 8000  # Bounds per-session answer buffers
+        # Microphone open + calibration happen on first use or in the background warm-up
+        self.mic = None
+        self.recognizer = None
+        self.recognize_audio = None
+        self.audio_lock = threading.Lock()
+        self.state = SessionStateMachine(history=500 if local_audio else 100)
         self.api_key = None
         self.tts_enabled = True  # Set this to True by default
-        self.is_speaking = False
-        self.audio_playing = False
-        self.stop_requested = False
+        self.streaming_enabled = True  # Push partial answer text to the UI as tokens arrive
+        # Sentence-chunked TTS: chunks synthesize concurrently, delivery stays in order
+        self.tts_chunk_chars = 200
+        self.tts_executor = shared.tts_executor
+        self.tts_lang = 'en'
+        self.tts_cache = shared.tts_cache
+        self.tts_router = shared.tts_router
+        self.audio_store = shared.audio_store
+        self.tracer = shared.tracer
+        self.playback_trace = None  # Waiting for the browser to report audio_playback_started
+        self.playback_trace_lock = threading.Lock()
+        self.groq = shared.groq
+        self.response_cache = shared.response_cache
+        # Interview prefetch: topic generation and upcoming question audio run ahead of need
+        self.prefetch_executor = shared.prefetch_executor
+        self.prefetch_lock = threading.Lock()
+        self.interview_prefetch = None
+        self.interview_prefetch_work = None  # Handle the next interview adopts once it starts
+        self.question_audio_prefetch = {}
+        # Answer evaluation: "sync" (inline), "async" (background workers) or "batch" (one request at the end)
+        self.evaluation_mode = "async"
+        self.evaluation_executor = shared.evaluation_executor
+        self.score_lock = threading.Lock()
+        self.batch_answers = []
+        self.interview_generation = 0
+        # Durable results: CANDIDATE_NAME or set_candidate() names the rows, else the session
+        self.results = shared.results
+        self.candidate = os.getenv('CANDIDATE_NAME') or session_id or "local"
+        self.interview_id = None  # Results row of the interview in progress
+        # Capture/recognition pipeline: the mic thread only records, a worker pool transcribes
+        self.capture_queue = queue.Queue(maxsize=8)
+        self.recognition_workers = 3
+        self.capture_seq = 0
+        self.next_delivery_seq = 0
+        self.recognized_results = {}
+        self.delivery_cond = threading.Condition()
+        self.pipeline_started = False
+        self.capture_thread = None
+        self.capture_stats = {"captured": 0, "dropped": 0, "recognized": 0, "unrecognized": 0, "errors": 0}
+        # Phrase segmentation by voice activity instead of recognizer.listen's fixed limits
+        self.vad_enabled = True
+        self.vad = VoiceActivityDetector()
+        # Speculative Q&A: a short pause yields an interim transcript, and a likely question starts its
+        # answer before the phrase is final. Misses cost Groq quota, so it is opt-in (SPECULATIVE_QA=1) and
+        # only runs while the rate limiter has room to spare.
+        self.question_classifier = QuestionClassifier()
+        self.speculation_enabled = os.getenv('SPECULATIVE_QA', '0') == '1'
+        self.speculation_threshold = 0.85
+        self.speculation_min_words = 3
+        self.speculation = None
+        self.speculation_epoch = 0
+        self.speculation_busy = False
+        self.speculation_lock = threading.Lock()
+        self.speculation_head_starts = deque(maxlen=200)
+        self.speculation_stats = {"interim": 0, "skipped_busy": 0, "skipped_quota": 0, "not_question": 0, "late": 0, "speculated": 0,
+                                  "hits": 0, "misses": 0, "cancelled_in_flight": 0, "wasted_requests": 0,
+                                  "wasted_tokens": 0}
+        # Cancellable work: each answer runs under a WorkHandle that stop, barge-in or the next answer cancels.
+        # BARGE_IN=0 keeps the mic closed during playback instead of listening for the user talking over it.
+        self.work_lock = threading.Lock()
+        self.work = WorkHandle()
+        self.interview_work = WorkHandle()
+        self.cancel_stats = {"cancelled": 0, "stopped_items": 0, "stale_dropped": 0, "barge_ins": 0}
+        self.barge_in_enabled = os.getenv('BARGE_IN', '1') != '0'
+        self.barge_in_detector = BargeInDetector(self.vad)
+        self.barge_in_audio = None  # Start of the phrase that interrupted playback, replayed into the VAD
+        # Conversation memory for Q&A follow-ups; CONVERSATION_BUDGET_TOKENS caps the verbatim turns
+        self.memory = ConversationMemory(
+            budget_tokens=int(os.getenv('CONVERSATION_BUDGET_TOKENS', '1500')),
+            summarize=self.summarize_conversation,
+            submit=self.prefetch_executor.submit
+        )
         self.load_api_key()
-        # Interview state
-        self.interview_active = False
-        self.awaiting_answer = False
+        # Interview state (phase lives in self.state)
         self.current_question_index = -1
-        self.collecting_answer = False
         self.collected_transcripts = []
-        self.ready_for_next_question = False
         self.latest_proctoring_notes = []
+        # Camera frames from the page are analyzed here; notes feed answer evaluation
+        self.proctor = ProctoringEngine(on_note=self.add_proctoring_note)
         self.questions_bank = [
             "API",
             "HTML",
@@ -52,256 +2541,901 @@ class AudioAssistant:
         ]
         # Interview config/state
         self.questions_limit = 5
+        self.interview_countdown = 3  # Seconds of 3-2-1 before the first question
         self.selected_questions = []
         self.total_score_points = 0.0
         self.questions_answered = 0
 
+    # Read-only views of the state machine for call sites that only need a yes/no answer
+    @property
+    def is_listening(self):
+        return self.state.listening
+
+    @property
+    def is_speaking(self):
+        return self.state.audio == "thinking"
+
+    @property
+    def audio_playing(self):
+        return self.state.audio == "speaking"
+
+    @property
+    def stop_requested(self):
+        return self.state.stop_requested
+
+    @property
+    def interview_active(self):
+        return self.state.interview != "inactive"
+
+    @property
+    def awaiting_answer(self):
+        return self.state.interview == "question"
+
     def setup_audio(self):
-        self.recognizer = sr.Recognizer()
-        self.mic = sr.Microphone()
+        recognizer = sr.Recognizer()
+        mic = sr.Microphone()
+        with mic as source:
+            recognizer.adjust_for_ambient_noise(source)
+        # Seed the VAD noise floor from the one-off calibration; it keeps adapting while listening
+        self.vad.noise_floor = recognizer.energy_threshold / recognizer.dynamic_energy_ratio
+        # Swappable for WAV fixtures (sr.AudioFile) and stub recognizers
+        self.recognizer = recognizer
+        self.recognize_audio = recognizer.recognize_google
+        self.mic = mic
+
+    def ensure_audio(self):
+        with self.audio_lock:
+            if self.mic is None:
+                self.setup_audio()
+                mark_startup("mic_ready")
+
+    def background_warmup(self, window_ready, max_wait=3):
+        # Let the window come up first, then pay for imports, mic calibration and the TTS cache
+        window_ready.wait(max_wait)
+        for module in (requests, gtts, np, sr):
+            try:
+                module.load()
+            except Exception as e:
+                print(f"Warm-up import failed: {str(e)}")
+        try:
+            self.ensure_audio()
+        except Exception as e:
+            print(f"Microphone warm-up failed: {str(e)}")
+        mark_startup("warmup_done")
+        # Pre-synthesize the fixed spoken messages so they play from a warm cache
+        self.warm_tts_cache()
+
+    def load_api_key(self):
+        # Server sessions bring their own key; the operator's is shared only with SHARE_API_KEY=1
+        if not self.local_audio and os.getenv('SHARE_API_KEY', '0') != '1':
+            return
+        # Priority: .env -> config.json (Groq only)
+        env_key = os.getenv('GROQ_API_KEY')
+        if env_key:
+            self.set_api_key(env_key)
+            return
+        if os.path.exists('config.json'):
+            with open('config.json', 'r') as f:
+                config = json.load(f)
+                self.set_api_key(config.get('api_key'))
+
+    def request_api_key(self):
+        # The key Groq calls use; the GROQ_API_KEY fallback follows the same sharing rule as load_api_key
+        if self.api_key:
+            return self.api_key
+        if not self.local_audio and os.getenv('SHARE_API_KEY', '0') != '1':
+            return ""
+        return os.getenv('GROQ_API_KEY') or ""
+
+    def set_api_key(self, api_key):
+        self.api_key = api_key
+        # Avoid persisting secrets unless explicitly desired; keep in-memory by default
+
+    def delete_api_key(self):
+        self.api_key = None
+        if os.path.exists('config.json'):
+            os.remove('config.json')
+
+    def has_api_key(self):
+        return self.api_key is not None
+
+    def toggle_listening(self):
+        if not self.api_key or not self.local_audio:
+            return False
+        if self.is_listening:
+            self.state.transition("listening toggled off", listening=False)
+        else:
+            self.start_listening()
+        return self.is_listening
+
+    def start_listening(self):
+        if not self.local_audio:
+            return
+        self.state.transition("listening started", listening=True)
+        self._ensure_recognition_pipeline()
+        # A capture thread from a previous toggle may still be inside listen(); reuse it
+        if self.capture_thread is None or not self.capture_thread.is_alive():
+            self.capture_thread = threading.Thread(target=self.listen_and_process, name="capture", daemon=True)
+            self.capture_thread.start()
+
+    def listen_and_process(self):
+        # Producer: record phrases back-to-back and hand them off without waiting for recognition
+        try:
+            self.ensure_audio()
+        except Exception as e:
+            self.state.transition("microphone unavailable", listening=False)
+            self.ui.update_ui(f"An error occurred: Microphone unavailable ({str(e)})", "")
+            return
+        
+        # Sleeps on the state condition while the assistant is thinking/speaking; wakes on playback end
+        while self.state.wait_until_can_capture(barge_in=self.barge_in_enabled):
+            try:
+                if self.state.can_barge_in():
+                    self.watch_for_barge_in()
+                    continue
+                if self.vad_enabled:
+                    self.capture_with_vad()
+                    continue
+                listen_started = time.monotonic()
+                with self.mic as source:
+                    # Increase phrase_time_limit to capture longer thoughts and stitch segments
+                    audio = self.recognizer.listen(source, timeout=7, phrase_time_limit=12)
+                if not audio.frame_data:
+                    continue
+                trace = self.tracer.start("utterance", started=listen_started)
+                trace.record("capture", listen_started)
+                self.enqueue_audio(audio, trace)
+            except sr.WaitTimeoutError:
+                pass
+            except Exception as e:
+                self.ui.update_ui(f"An error occurred: {str(e)}", "")
+
+    def capture_with_vad(self):
+        # Keep the stream open while listening is allowed; phrases end at natural pauses
         with self.mic as source:
-            self.recognizer.adjust_for_ambient_noise(source)
+            self.vad.configure(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            self.vad.on_interim = lambda pcm: self.speculate_phrase(pcm, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            heard, self.barge_in_audio = self.barge_in_audio, None
+            if heard:
+                for phrase in self.vad.feed(heard):
+                    self.enqueue_phrase(phrase, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            while self.state.can_capture():
+                chunk = source.stream.read(source.CHUNK)
+                if not chunk:
+                    break  # End of a file-backed source
+                for phrase in self.vad.feed(chunk):
+                    self.enqueue_phrase(phrase, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            for phrase in self.vad.flush():
+                self.enqueue_phrase(phrase, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    def watch_for_barge_in(self):
+        # Mic stays open while an answer plays; the user talking over it stops the answer
+        detector = self.barge_in_detector
+        with self.mic as source:
+            self.vad.configure(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            detector.reset()
+            try:
+                while self.state.can_barge_in():
+                    chunk = source.stream.read(source.CHUNK)
+                    if not chunk:
+                        break
+                    heard = detector.feed(chunk)
+                    if heard is not None:
+                        self.barge_in(heard)
+                        break
+            finally:
+                detector.armed = False
+
+    def barge_in(self, heard=b""):
+        self.cancel_work("barge-in")
+        with self.work_lock:
+            self.cancel_stats["barge_ins"] += 1
+        try:
+            self.ui.stop_audio()
+        except Exception:
+            pass
+        with self.playback_trace_lock:
+            trace, self.playback_trace = self.playback_trace, None
+        if trace is not None:
+            trace.finish(playback="barge-in")
+        self.barge_in_audio = heard
+        with self.state.cond:
+            if self.state.transition("barge-in", expect={"audio": "speaking"}, audio="idle"):
+                # No echo tail: the user is already talking
+                self.state.capture_after = time.monotonic()
+
+    def enqueue_phrase(self, phrase, sample_rate, sample_width):
+        # The capture stage spans the phrase itself, ending when the VAD emitted it
+        emitted = time.monotonic()
+        started = emitted - len(phrase) / float(sample_rate * sample_width)
+        trace = self.tracer.start("utterance", started=started)
+        trace.record("capture", started, emitted)
+        self.enqueue_audio(sr.AudioData(phrase, sample_rate, sample_width), trace)
+
+    def speculate_phrase(self, pcm, sample_rate, sample_width):
+        # Runs on the capture thread at a short pause: hand off, never block
+        if not self.speculation_enabled or self.interview_active:
+            return
+        with self.speculation_lock:
+            if self.speculation_busy:
+                self.speculation_stats["skipped_busy"] += 1
+                return
+            self.speculation_busy = True
+            self.speculation_stats["interim"] += 1
+            epoch = self.speculation_epoch
+        self.start_speculation(sr.AudioData(pcm, sample_rate, sample_width), epoch)
+
+    def start_speculation(self, audio, epoch):
+        threading.Thread(target=self._speculate, args=(audio, epoch), name="speculate", daemon=True).start()
+
+    def _speculate(self, audio, epoch):
+        try:
+            text = self.recognize_audio(audio)
+        except Exception:
+            text = None
+        finally:
+            with self.speculation_lock:
+                self.speculation_busy = False
+        if not text or len(text.split()) < self.speculation_min_words \
+                or self.question_classifier.score(text) < self.speculation_threshold:
+            with self.speculation_lock:
+                self.speculation_stats["not_question"] += 1
+            return
+        # Same wording handle_transcript will send, so a matching final transcript shares the call
+        question = text[0].upper() + text[1:]
+        if not question.endswith('?'):
+            question += '?'
+        # A guess must never make a real answer wait for budget
+        if not self.groq.scheduler.has_headroom(self.groq.estimate_tokens(self.answer_messages(question))):
+            with self.speculation_lock:
+                self.speculation_stats["skipped_quota"] += 1
+            return
+        spec = SpeculativeAnswer(self.answer_cache_key(question), question)
+        with self.speculation_lock:
+            if epoch != self.speculation_epoch:
+                # The final transcript was already handled
+                self.speculation_stats["late"] += 1
+                return
+            previous = self.speculation
+            if previous is not None and previous.key == spec.key:
+                return
+            self.speculation = spec
+            self.speculation_stats["speculated"] += 1
+        if previous is not None:
+            self._discard_speculation(previous)
+        self._run_speculation(spec)
+
+    def _run_speculation(self, spec):
+        api_key = self.request_api_key()
+        if not api_key.startswith("gsk_"):
+            spec.status = "failed"
+            return
+        messages = self.answer_messages(spec.question)
+        spec.tokens = self.groq.estimate_tokens(messages)
+
+        def compute():
+            # Cancelling raises inside chat, so a truncated answer never lands in the response cache
+            return self.groq.chat(api_key, messages, timeout=60, on_delta=lambda delta: None, handle=spec.work)
+        try:
+            entry, spec.from_cache = self.response_cache.get_or_compute(spec.key, compute)
+        except Exception:
+            spec.status = "cancelled" if spec.cancelled.is_set() else "failed"
+            return
+        spec.status = "done"
+        # First audio chunk too, so the real answer's audio starts from the TTS cache
+        if self.tts_enabled and not entry["audio"] and not spec.cancelled.is_set():
+            chunks = self.split_tts_chunks(entry["text"])
+            if chunks:
+                spec.work.add_future(self.tts_executor.submit(self._synthesize,
+                                                              chunks[0] if len(chunks) > 1 else entry["text"]))
+
+    def settle_speculation(self, question):
+        # The final transcript decides: keep the early answer if it asked the same thing, else cancel it
+        with self.speculation_lock:
+            self.speculation_epoch += 1
+            spec, self.speculation = self.speculation, None
+        if spec is None:
+            return None
+        if question is not None and self.answer_cache_key(question) == spec.key:
+            with self.speculation_lock:
+                self.speculation_stats["hits"] += 1
+                self.speculation_head_starts.append(time.monotonic() - spec.started)
+            return "hit"
+        self._discard_speculation(spec)
+        return "miss"
+
+    def _discard_speculation(self, spec):
+        in_flight = spec.status == "running"
+        spec.cancel()
+        with self.speculation_lock:
+            self.speculation_stats["misses"] += 1
+            if in_flight:
+                self.speculation_stats["cancelled_in_flight"] += 1
+            if not spec.from_cache and spec.tokens:
+                # Upper bound: a cancelled stream stops billing completion tokens early
+                self.speculation_stats["wasted_requests"] += 1
+                self.speculation_stats["wasted_tokens"] += spec.tokens
+
+    def speculation_snapshot(self):
+        with self.speculation_lock:
+            stats = dict(self.speculation_stats)
+            ordered = sorted(self.speculation_head_starts)
+        settled = stats["hits"] + stats["misses"]
+        stats["enabled"] = self.speculation_enabled
+        stats["hit_rate"] = round(stats["hits"] / settled, 3) if settled else None
+        if ordered:
+            stats["head_start_p50_ms"] = round(LatencyTracer.percentile(ordered, 50) * 1000, 1)
+            stats["head_start_p95_ms"] = round(LatencyTracer.percentile(ordered, 95) * 1000, 1)
+        return stats
+
+    def enqueue_audio(self, audio, trace=NULL_TRACE):
+        with self.delivery_cond:
+            seq = self.capture_seq
+            self.capture_seq += 1
+            self.capture_stats["captured"] += 1
+        item = (seq, audio, trace)
+        try:
+            # Brief backpressure before shedding load
+            self.capture_queue.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            pass
+        try:
+            # Drop the oldest pending segment; fresh speech is worth more than stale speech
+            dropped_seq, _, dropped_trace = self.capture_queue.get_nowait()
+            self._complete_recognition(dropped_seq, None, dropped=True, trace=dropped_trace)
+        except queue.Empty:
+            pass
+        try:
+            self.capture_queue.put_nowait(item)
+        except queue.Full:
+            self._complete_recognition(seq, None, dropped=True, trace=trace)
+
+    def _ensure_recognition_pipeline(self):
+        with self.delivery_cond:
+            if self.pipeline_started:
+                return
+            self.pipeline_started = True
+        for i in range(self.recognition_workers):
+            threading.Thread(target=self._recognition_worker, name=f"recognize-{i}", daemon=True).start()
+        threading.Thread(target=self._delivery_worker, name="transcript-delivery", daemon=True).start()
+
+    def _recognition_worker(self):
+        while True:
+            seq, audio, trace = self.capture_queue.get()
+            picked = time.monotonic()
+            trace.record("queue_wait", trace.end_of("capture") or picked, picked)
+            text = None
+            try:
+                with trace.stage("stt"):
+                    text = self.recognize_audio(audio)
+            except sr.UnknownValueError:
+                pass
+            except Exception as e:
+                with self.delivery_cond:
+                    self.capture_stats["errors"] += 1
+                self.ui.update_ui(f"An error occurred: {str(e)}", "")
+            finally:
+                self._complete_recognition(seq, text, trace=trace)
+
+    def _complete_recognition(self, seq, text, dropped=False, trace=NULL_TRACE):
+        with self.delivery_cond:
+            if dropped:
+                self.capture_stats["dropped"] += 1
+            elif text:
+                self.capture_stats["recognized"] += 1
+            else:
+                self.capture_stats["unrecognized"] += 1
+            self.recognized_results[seq] = (text, trace)
+            self.delivery_cond.notify_all()
+
+    def _delivery_worker(self):
+        # Consumer: hand transcripts over strictly in capture order
+        while True:
+            with self.delivery_cond:
+                while self.next_delivery_seq not in self.recognized_results:
+                    self.delivery_cond.wait()
+                text, trace = self.recognized_results.pop(self.next_delivery_seq)
+                self.next_delivery_seq += 1
+            # Time spent behind an earlier, slower phrase
+            trace.record("reorder_wait", trace.end_of("stt") or time.monotonic())
+            if not text:
+                trace.finish(outcome="dropped" if trace.end_of("stt") is None else "unrecognized")
+                continue
+            try:
+                self.handle_transcript(text, trace)
+            except Exception as e:
+                self.ui.update_ui(f"An error occurred: {str(e)}", "")
+
+    def handle_transcript(self, text, trace=NULL_TRACE):
+        # If interview is active, treat captured speech as an answer when awaiting
+        if self.interview_active:
+            cleaned_answer = text.strip()
+            if not cleaned_answer:
+                trace.finish(outcome="empty")
+                return
+            # Buffer transcripts while collecting until user clicks Complete Answer;
+            # check and append under the state lock so complete_answer can't slip in between
+            with self.state.cond:
+                collecting = self.state.interview == "question"
+                if collecting and sum(len(t) for t in self.collected_transcripts) < self.max_answer_chars:
+                    self.collected_transcripts.append(cleaned_answer)
+            if collecting:
+                with trace.stage("ui_push"):
+                    self.ui.update_ui(f"You: {cleaned_answer}", "")
+            trace.finish(outcome="answer_fragment" if collecting else "ignored")
+        else:
+            # Legacy Q&A mode: only respond to detected questions
+            if self.is_question(text):
+                capitalized_text = text[0].upper() + text[1:]
+                if not capitalized_text.endswith('?'):
+                    capitalized_text += '?'
+                speculation = self.settle_speculation(capitalized_text)
+                if speculation:
+                    trace.tag(speculation=speculation)
+                self.ui.update_ui(f"Q: {capitalized_text}", "")
+                self.state.transition("question detected", audio="thinking", stop_requested=False)
+                trace.tag(outcome="qa")
+                work = self.begin_work()
+                self.expect_playback(trace)
+                response = self.get_ai_response(capitalized_text, on_delta=self.ui_stream_callback(work), trace=trace,
+                                                handle=work)
+                if self.is_stale(work):
+                    self.drop_stale(trace)
+                    return
+                self.expect_playback(trace, response)
+                with trace.stage("ui_push"):
+                    self.ui.update_ui("", f"{response}")
+                # With audio on its way the mic stays closed; "speaking" (and barge-in) only once the page
+                # reports playback started, and a clip it never starts reopens the mic after a few seconds
+                next_audio = "pending" if self.tts_enabled and _payload_has_audio(response) else "idle"
+                self.state.transition("answer delivered", expect={"audio": "thinking"}, audio=next_audio)
+            else:
+                self.settle_speculation(None)
+                trace.finish(outcome="not_question")
+
+    def expect_playback(self, trace, payload=None):
+        # Audio answers finish their trace when the browser reports playback started. Called without a
+        # payload before generating (cached audio can start playing before the answer returns), then with it.
+        if trace is NULL_TRACE or trace.finished:
+            return
+        if payload is not None and not (self.tts_enabled and _payload_has_audio(payload)):
+            with self.playback_trace_lock:
+                if self.playback_trace is trace:
+                    self.playback_trace = None
+            trace.tag(audio=False)
+            trace.finish()
+            return
+        if not self.tts_enabled:
+            return
+        with self.playback_trace_lock:
+            if self.playback_trace is trace:
+                return
+            previous, self.playback_trace = self.playback_trace, trace
+        if previous is not None:
+            previous.finish(playback="superseded")
 
-    def load_api_key(self):
-        # Priority: .env -> config.json (Groq only)
-        env_key = os.getenv('GROQ_API_KEY')
-        if env_key:
-            self.set_api_key(env_key)
+    def playback_started(self):
+        # Echo calibration for barge-in starts with the audio itself
+        self.barge_in_detector.armed = True
+        with self.playback_trace_lock:
+            trace, self.playback_trace = self.playback_trace, None
+        if trace is None:
             return
-        if os.path.exists('config.json'):
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-                self.set_api_key(config.get('api_key'))
+        now = time.monotonic()
+        # Chunked answers: measured from the first segment pushed; single clips: from the payload push
+        sent = trace.end_of("tts_first_audio") or trace.end_of("ui_push") or now
+        trace.record("browser_playback", sent, now)
+        trace.finish(playback="started")
 
-    def set_api_key(self, api_key):
-        self.api_key = api_key
-        # Avoid persisting secrets unless explicitly desired; keep in-memory by default
+    def capture_snapshot(self):
+        with self.delivery_cond:
+            stats = dict(self.capture_stats)
+            stats["queued"] = self.capture_queue.qsize()
+            stats["awaiting_delivery"] = self.capture_seq - self.next_delivery_seq
+        stats["vad"] = self.vad.snapshot()
+        return stats
 
-    def delete_api_key(self):
-        self.api_key = None
-        if os.path.exists('config.json'):
-            os.remove('config.json')
+    def is_question(self, text):
+        return self.question_classifier.is_question(text)
 
-    def has_api_key(self):
-        return self.api_key is not None
+    def ui_stream_callback(self, handle=None):
+        # Each answer gets its own stream id so the frontend can grow a single bubble
+        if not self.streaming_enabled:
+            return None
+        stream_id = uuid.uuid4().hex
 
-    def toggle_listening(self):
-        if not self.api_key:
-            return False
-        self.is_listening = not self.is_listening
-        if self.is_listening:
-            threading.Thread(target=self.listen_and_process, daemon=True).start()
-        return self.is_listening
+        def push(delta):
+            if handle is None or not handle.is_cancelled():
+                self.ui.update_ui_stream(stream_id, delta)
+        return push
 
-    def listen_and_process(self):
-        cooldown_time = 2  # Cooldown period in seconds
-        last_speak_time = 0
-        
-        while self.is_listening:
-            current_time = time.time()
-            if not self.is_speaking and not self.audio_playing and (current_time - last_speak_time) > cooldown_time:
-                try:
-                    with self.mic as source:
-                        # Increase phrase_time_limit to capture longer thoughts and stitch segments
-                        audio = self.recognizer.listen(source, timeout=7, phrase_time_limit=12)
-                    text = self.recognizer.recognize_google(audio)
-                    # If interview is active, treat captured speech as an answer when awaiting
-                    if self.interview_active:
-                        cleaned_answer = text.strip()
-                        if not cleaned_answer:
-                            continue
-                        # Buffer transcripts while collecting until user clicks Complete Answer
-                        if self.awaiting_answer and self.collecting_answer:
-                            self.collected_transcripts.append(cleaned_answer)
-                            eel.update_ui(f"You: {cleaned_answer}", "")
-                            last_speak_time = time.time()
-                        else:
-                            last_speak_time = time.time()
-                    else:
-                        # Legacy Q&A mode: only respond to detected questions
-                        if self.is_question(text):
-                            capitalized_text = text[0].upper() + text[1:]
-                            if not capitalized_text.endswith('?'):
-                                capitalized_text += '?'
-                            eel.update_ui(f"Q: {capitalized_text}", "")
-                            self.is_speaking = True
-                            self.stop_requested = False
-                            response = self.get_ai_response(capitalized_text)
-                            eel.update_ui("", f"{response}")
-                            self.is_speaking = False
-                            last_speak_time = time.time()  # Update the last speak time
-                except sr.WaitTimeoutError:
-                    pass
-                except sr.UnknownValueError:
-                    pass
-                except Exception as e:
-                    eel.update_ui(f"An error occurred: {str(e)}", "")
-            else:
-                time.sleep(0.1)  # Short sleep to prevent busy waiting
+    def begin_work(self):
+        # A new answer supersedes whatever the previous one still has in flight
+        with self.work_lock:
+            previous = self.work
+            self.work = WorkHandle(previous.generation + 1)
+            current = self.work
+        self._cancel(previous, "superseded")
+        return current
 
-    def is_question(self, text):
-        # Convert to lowercase for easier matching
-        text = text.lower().strip()
-        
-        # List of question words and phrases
-        question_starters = [
-            "what", "why", "how", "when", "where", "who", "which",
-            "can", "could", "would", "should", "is", "are", "do", "does",
-            "am", "was", "were", "have", "has", "had", "will", "shall"
-        ]
-        
-        # Check if the text starts with a question word
-        if any(text.startswith(starter) for starter in question_starters):
-            return True
-        
-        # Check for question mark at the end
-        if text.endswith('?'):
-            return True
-        
-        # Check for inverted word order (e.g., "Are you...?", "Can we...?")
-        if re.match(r'^(are|can|could|do|does|have|has|will|shall|should|would|am|is)\s', text):
-            return True
-        
-        # Check for specific phrases that indicate a question
-        question_phrases = [
-            "tell me about", "i'd like to know", "can you explain",
-            "i was wondering", "do you know", "what about", "how about"
+    def cancel_work(self, reason):
+        with self.work_lock:
+            handle = self.work
+        return self._cancel(handle, reason)
+
+    def _cancel(self, handle, reason):
+        stopped = handle.cancel(reason)
+        if stopped:
+            with self.work_lock:
+                self.cancel_stats["cancelled"] += 1
+                self.cancel_stats["stopped_items"] += stopped
+        return stopped
+
+    def is_stale(self, handle):
+        return handle.is_cancelled() or handle.generation != self.work.generation
+
+    def drop_stale(self, trace=NULL_TRACE):
+        # A cancelled or superseded answer: nothing more of it reaches the page
+        with self.playback_trace_lock:
+            if self.playback_trace is trace:
+                self.playback_trace = None
+        with self.work_lock:
+            self.cancel_stats["stale_dropped"] += 1
+        trace.finish(outcome="cancelled")
+
+    def cancellation_snapshot(self):
+        with self.work_lock:
+            stats = dict(self.cancel_stats)
+            stats["generation"] = self.work.generation
+        stats["barge_in_enabled"] = self.barge_in_enabled
+        return stats
+
+    def normalize_question(self, text):
+        cleaned = text.strip()
+        # Normalize capitalization and ensure question mark
+        normalized = cleaned[0].upper() + cleaned[1:] if len(cleaned) > 1 else cleaned.upper()
+        if not normalized.endswith('?'):
+            # Heuristic: if it looks like a question, append '?'
+            if re.match(r'^(what|why|how|when|where|who|which|can|could|would|should|is|are|do|does|am|was|were|have|has|had|will|shall)\b', normalized, re.IGNORECASE):
+                normalized += '?'
+        return normalized
+
+    def question_cache_key(self, question):
+        # "what is docker" and "What is Docker?" share one entry
+        key = re.sub(r"[^\w\s]", " ", self.normalize_question(question).lower())
+        return " ".join(key.split())
+
+    def answer_cache_key(self, question):
+        # Follow-ups depend on the conversation, so they only share an answer given in the same context
+        key = self.question_cache_key(question)
+        if self.memory.is_follow_up(question):
+            key += "#" + self.memory.fingerprint()
+        return key
+
+    def answer_messages(self, question):
+        return self.memory.messages("You are a helpful assistant.", question)
+
+    def summarize_conversation(self, summary, turns):
+        # Background fold of evicted turns into the running summary
+        api_key = self.request_api_key()
+        if not api_key.startswith("gsk_"):
+            raise Exception("No valid API key for the conversation summary")
+        words = self.memory.summary_tokens * 3 // 4
+        system_prompt = (
+            "You keep a running summary of a Q&A conversation. Merge the new exchanges into the current summary. "
+            f"Keep the topics, names and conclusions a follow-up question could refer to, in at most {words} words. "
+            "Return only the summary."
+        )
+        exchanges = "\n".join(f"Q: {asked}\nA: {answered[:600]}" for asked, answered in turns)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Current summary: {summary or '(empty)'}\n\nNew exchanges:\n{exchanges}"}
         ]
-        if any(phrase in text for phrase in question_phrases):
-            return True
-        
-        # If none of the above conditions are met, it's probably not a question
-        return False
+        return self.groq.chat(api_key, messages, timeout=30, priority=RateLimitScheduler.BACKGROUND)
 
-    def get_ai_response(self, question):
+    def get_ai_response(self, question, on_delta=None, trace=NULL_TRACE, handle=None):
         try:
-            api_key = self.api_key or os.getenv('GROQ_API_KEY') or ""
+            api_key = self.request_api_key()
             if not api_key or not api_key.startswith("gsk_"):
                 raise Exception("No valid API key. Provide a Groq API key (gsk_...).")
 
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            groq_models = [
-                "llama-3.1-8b-instant",
-                "llama3-8b-8192"
-            ]
-            last_error = None
-            data = None
-            for model_id in groq_models:
-                payload = {
-                    "model": model_id,
-                    "messages": [
-                        {"role": "system", "content": "You are a helpful assistant."},
-                        {"role": "user", "content": question}
-                    ]
-                }
-                max_attempts = 3
-                for attempt in range(max_attempts):
-                    resp = requests.post(url, headers=headers, json=payload, timeout=60)
-                    status_code = resp.status_code
-                    # Retry on 429 or 5xx
-                    if status_code == 429 or (500 <= status_code < 600):
-                        wait_seconds = min(8, (2 ** attempt)) + random.uniform(0, 0.25)
-                        time.sleep(wait_seconds)
-                        continue
-                    try:
-                        resp.raise_for_status()
-                        data = resp.json()
-                        break
-                    except requests.exceptions.HTTPError as http_err:
-                        try:
-                            error_json = resp.json()
-                        except Exception:
-                            error_json = {"message": resp.text}
-                        message_text = str(error_json)
-                        last_error = f"HTTP {status_code} from Groq for {model_id}: {message_text}"
-                        if "invalid_model" in message_text.lower():
-                            # Try next model
-                            break
-                        # Non-retryable error
-                        raise Exception(last_error) from http_err
-                if data is not None:
-                    break
-            if data is None:
-                raise Exception(last_error or "No successful response from Groq")
-            choices = data.get("choices", []) or []
-            first_choice = (choices[0] if len(choices) > 0 else {}) or {}
-            message_obj = first_choice.get("message", {}) or {}
-            text_response = (message_obj.get("content") or first_choice.get("text") or "").strip()
+            messages = self.answer_messages(question)
+            cache_key = self.answer_cache_key(question)
+            prompt_tokens = sum(self.memory.estimate_tokens(m["content"]) for m in messages)
+            trace.tag(prompt_tokens=prompt_tokens)
+            llm_started = time.monotonic()
+            if on_delta is not None and trace is not NULL_TRACE:
+                stream_delta = on_delta
+
+                def on_delta(delta):
+                    if trace.end_of("llm_first_token") is None:
+                        trace.record("llm_first_token", llm_started)
+                    stream_delta(delta)
+            with trace.stage("llm"):
+                entry, hit = self.response_cache.get_or_compute(
+                    cache_key,
+                    lambda: self.groq.chat(api_key, messages, timeout=60, on_delta=on_delta, handle=handle)
+                )
+            trace.tag(cache_hit=hit)
+            if not hit:
+                self.memory.record_prompt(prompt_tokens)
+            text_response = entry["text"]
             if not text_response:
                 # Provide a clear message if the model returned no text
                 text_response = "No content received from the model. Please try again."
+            elif not self.stop_requested and (handle is None or not handle.is_cancelled()):
+                self.memory.add_turn(question, text_response)
             
             if self.tts_enabled and not self.stop_requested:
-                return self.tts_pack(text_response)
+                with trace.stage("tts"):
+                    if entry["audio"]:
+                        return self.replay_audio(text_response, entry["audio"], trace=trace, handle=handle)
+                    return self.tts_stream(text_response, trace=trace, handle=handle,
+                                           on_complete=lambda segments: self.response_cache.attach_audio(cache_key, segments))
             
             return json.dumps({"text": text_response, "audio": None})
         except Exception as e:
-            print(f"Error in get_ai_response: {str(e)}")
+            if handle is None or not handle.is_cancelled():
+                print(f"Error in get_ai_response: {str(e)}")
             return json.dumps({"text": f"Error getting AI response: {str(e)}", "audio": None})
 
-    def tts_pack(self, text):
+    def _synthesize(self, text):
+        # Cached per backend: look up under the one the router would use now, store under the one that answered
+        engine = self.tts_router.preferred()
+        audio = self.tts_cache.get(TtsCache.make_key(text, self.tts_lang, engine)) if engine else None
+        if audio is None:
+            audio, engine = self.tts_router.synthesize(text, self.tts_lang)
+            self.tts_cache.put(TtsCache.make_key(text, self.tts_lang, engine), audio)
+        return audio
+
+    def warm_tts_cache(self):
+        # Only the fixed spoken messages: question prompts are synthesized ahead of need per interview
+        # (prefetch_question_audio), so warming every topic would spend TTS quota on prompts never asked
+        texts = [
+            "No content received from the model. Please try again.",
+            "Thanks for the answer. Here's some brief feedback: [no content]."
+        ]
+        for text in texts:
+            try:
+                self._synthesize(text)
+            except Exception:
+                # Offline or rate limited: stop warming, live requests will fill the cache
+                return
+
+    def tts_pack(self, text, on_complete=None):
         try:
-            tts = gTTS(text=text)
-            buf = BytesIO()
-            tts.write_to_fp(buf)
-            audio_bytes = buf.getvalue()
-            audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-            return json.dumps({"text": text, "audio": audio_base64})
+            audio_bytes = self._synthesize(text)
+            if on_complete is not None:
+                on_complete([audio_bytes])
+            return json.dumps({"text": text, "audio": self.audio_store.register(audio_bytes)})
         except Exception as e:
             return json.dumps({"text": text, "audio": None})
 
+    def split_tts_chunks(self, text):
+        # Sentence/clause chunks; the first one stays short so audio can start early
+        max_chars = self.tts_chunk_chars
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?;])\s+|\n+', text or "") if s.strip()]
+        pieces = []
+        for sentence in sentences:
+            if len(sentence) <= max_chars:
+                pieces.append(sentence)
+                continue
+            # Over-long sentences: break at commas, then at word boundaries
+            current = ""
+            for clause in re.split(r'(?<=,)\s+', sentence):
+                for word in clause.split():
+                    if current and len(current) + 1 + len(word) > max_chars:
+                        pieces.append(current)
+                        current = ""
+                    current = f"{current} {word}" if current else word
+                if current.endswith(','):
+                    pieces.append(current)
+                    current = ""
+            if current:
+                pieces.append(current)
+        if not pieces:
+            return []
+        chunks = [pieces[0]]
+        for piece in pieces[1:]:
+            # Pack following pieces up to the size limit to keep the request count low
+            if len(chunks) > 1 and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+                chunks[-1] = f"{chunks[-1]} {piece}"
+            else:
+                chunks.append(piece)
+        return chunks
+
+    def tts_stream(self, text, on_complete=None, trace=NULL_TRACE, handle=None):
+        chunks = self.split_tts_chunks(text)
+        if len(chunks) <= 1:
+            return self.tts_pack(text, on_complete)
+        clip_id = uuid.uuid4().hex
+        futures = [self.tts_executor.submit(self._synthesize, chunk) for chunk in chunks]
+        if handle is not None:
+            for future in futures:
+                handle.add_future(future)
+        trace.tag(tts_chunks=len(chunks))
+        threading.Thread(target=self._deliver_tts_chunks, args=(clip_id, futures, on_complete, trace, handle),
+                         daemon=True).start()
+        # Text goes out right away; audio segments follow through queue_tts_audio
+        return json.dumps({"text": text, "audio": None, "clip": clip_id})
+
+    def replay_audio(self, text, segments, trace=NULL_TRACE, handle=None):
+        # Already-synthesized segments (response cache hit) go through the same ordered delivery
+        if len(segments) == 1:
+            return json.dumps({"text": text, "audio": self.audio_store.register(segments[0])})
+        futures = []
+        for segment in segments:
+            future = Future()
+            future.set_result(segment)
+            futures.append(future)
+        clip_id = uuid.uuid4().hex
+        threading.Thread(target=self._deliver_tts_chunks, args=(clip_id, futures, None, trace, handle),
+                         daemon=True).start()
+        return json.dumps({"text": text, "audio": None, "clip": clip_id})
+
+    def _deliver_tts_chunks(self, clip_id, futures, on_complete=None, trace=NULL_TRACE, handle=None):
+        last_seq = len(futures) - 1
+        delivered = []
+        started = time.monotonic()
+        stopped = lambda: self.stop_requested or (handle is not None and handle.is_cancelled())
+        for seq, future in enumerate(futures):
+            if stopped():
+                for pending in futures[seq:]:
+                    pending.cancel()
+                return
+            try:
+                # Head-of-line wait: later chunks may already be done but must play after this one
+                audio_bytes = future.result()
+                delivered.append(audio_bytes)
+                audio_url = self.audio_store.register(audio_bytes)
+            except Exception:
+                audio_url = None
+            if stopped():
+                # Cancelled while waiting: this segment is stale too
+                for pending in futures[seq:]:
+                    pending.cancel()
+                return
+            try:
+                self.ui.queue_tts_audio(clip_id, seq, audio_url, seq == last_seq)
+            except Exception:
+                pass
+            if seq == 0:
+                # First audible segment reached the UI
+                trace.record("tts_first_audio", started)
+        # Only a complete set of segments is worth reusing
+        if on_complete is not None and len(delivered) == len(futures):
+            on_complete(delivered)
+
     # ---- Interview helpers ----
+    def add_proctoring_note(self, note):
+        # Same cap as set_proctoring_notes
+        self.latest_proctoring_notes = (self.latest_proctoring_notes + [note])[-10:]
+
+    def reset_interview(self):
+        self.finish_interview_record("stopped")
+        self.latest_proctoring_notes = []
+        self.proctor.reset()
+        with self.state.cond:
+            self.collected_transcripts = []
+            self.state.transition("interview stopped", interview="inactive", audio="idle")
+        self.interview_generation += 1
+        # Evaluation, feedback audio and prefetched question audio of the stopped interview
+        self._cancel(self.interview_work, "interview stopped")
+        self.interview_work = WorkHandle(self.interview_generation)
+        self.batch_answers = []
+        with self.prefetch_lock:
+            self.question_audio_prefetch = {}
+
+    def shutdown(self):
+        # Session reaped or closed: stop capture and orphan any in-flight evaluation
+        self.reset_interview()
+        self.state.transition("session closed", listening=False, stop_requested=True)
+        with self.prefetch_lock:
+            self.interview_prefetch = None
+
     def start_interview_internal(self):
-        self.interview_active = True
+        # A previous interview still open is kept as stopped, with the score it had reached
+        self.finish_interview_record("stopped")
+        self.interview_generation += 1
+        # A restart without a stop: whatever the previous interview still has in flight goes too
+        self._cancel(self.interview_work, "interview restarted")
+        self.batch_answers = []
+        self.latest_proctoring_notes = []
+        self.proctor.reset()
         self.current_question_index = -1
-        self.awaiting_answer = False
-        self.collecting_answer = False
-        self.collected_transcripts = []
+        with self.state.cond:
+            self.collected_transcripts = []
+            self.state.transition("interview started", interview="asking")
         # Reset scoring and select randomized questions
-        self.total_score_points = 0.0
-        self.questions_answered = 0
-        # Try to fetch simple random tech questions via AI; fallback to local bank
-        self.selected_questions = self._generate_random_questions_via_ai(self.questions_limit)
-        if not self.selected_questions:
-            bank = list(self.questions_bank)
-            random.shuffle(bank)
-            self.selected_questions = bank[: min(self.questions_limit, len(bank))]
+        with self.score_lock:
+            self.total_score_points = 0.0
+            self.questions_answered = 0
+        # Topics normally come from a prefetch started before the countdown
+        prefetch = self.prefetch_interview()
+        try:
+            self.selected_questions = prefetch.result()
+        finally:
+            with self.prefetch_lock:
+                self.interview_prefetch = None
+                work, self.interview_prefetch_work = self.interview_prefetch_work, None
+        # The first question's audio was prefetched under this handle, so it survives the cancel above
+        if work is None or work.is_cancelled():
+            work = WorkHandle()
+        work.generation = self.interview_generation
+        self.interview_work = work
+        self.interview_id = uuid.uuid4().hex
+        self.results.start_interview(self.interview_id, self.candidate, self.session_id, self.evaluation_mode,
+                                     self.selected_questions)
         # Ensure listening is running
         if not self.is_listening:
-            self.is_listening = True
-            threading.Thread(target=self.listen_and_process, daemon=True).start()
+            self.start_listening()
         return self.next_question_internal()
 
+    def prefetch_interview(self):
+        with self.prefetch_lock:
+            if self.interview_prefetch is None:
+                self.question_audio_prefetch = {}
+                self.interview_prefetch_work = WorkHandle()
+                self.interview_prefetch = self.prefetch_executor.submit(self._prepare_interview_questions,
+                                                                        self.interview_prefetch_work)
+            return self.interview_prefetch
+
+    def _prepare_interview_questions(self, handle=None):
+        # Try to fetch simple random tech questions via AI; fallback to local bank
+        questions = self._generate_random_questions_via_ai(self.questions_limit)
+        if not questions:
+            bank = list(self.questions_bank)
+            random.shuffle(bank)
+            questions = bank[: min(self.questions_limit, len(bank))]
+        # First question audio is synthesized while the countdown is still running
+        if questions:
+            self.prefetch_question_audio(0, questions, handle)
+        return questions
+
+    def format_question(self, index, questions=None):
+        questions = self.selected_questions if questions is None else questions
+        # Prepend question counter like [1/5] (frontend will display count separately)
+        return f"[{index + 1}/{len(questions)}] {questions[index]}"
+
+    def prefetch_question_audio(self, index, questions=None, handle=None):
+        questions = self.selected_questions if questions is None else questions
+        handle = self.interview_work if handle is None else handle
+        if not self.tts_enabled or not (0 <= index < len(questions)):
+            return
+        text = self.format_question(index, questions)
+        with self.prefetch_lock:
+            if index not in self.question_audio_prefetch:
+                future = handle.add_future(self.tts_executor.submit(self._synthesize, text))
+                self.question_audio_prefetch[index] = (text, future)
+
+    def question_tts_pack(self, index):
+        text = self.format_question(index)
+        with self.prefetch_lock:
+            prefetched = self.question_audio_prefetch.pop(index, None)
+        if prefetched is not None and prefetched[0] == text:
+            try:
+                audio_url = self.audio_store.register(prefetched[1].result())
+                return json.dumps({"text": text, "audio": audio_url})
+            except Exception:
+                pass
+        return self.tts_pack(text)
+
     def _generate_random_questions_via_ai(self, count):
         try:
-            api_key = self.api_key or os.getenv('GROQ_API_KEY') or ""
+            api_key = self.request_api_key()
             if not api_key or not api_key.startswith("gsk_"):
                 return []
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
             system_prompt = (
                 "You generate beginner-friendly single-word tech topics (e.g., 'API', 'Docker', 'HTML'). "
                 "Return ONLY a JSON array of single-word strings. No punctuation, no numbering, no explanations."
             )
             user_prompt = f"Generate {count} distinct one-word tech terms."
-            payload = {
-                "model": "llama-3.1-8b-instant",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-            }
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
-            resp.raise_for_status()
-            data = resp.json()
-            choices = data.get("choices", []) or []
-            first_choice = (choices[0] if len(choices) > 0 else {}) or {}
-            message_obj = first_choice.get("message", {}) or {}
-            content = (message_obj.get("content") or first_choice.get("text") or "").strip()
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            content = self.groq.chat(api_key, messages, timeout=20, priority=RateLimitScheduler.BACKGROUND)
             # Attempt to parse a JSON array from the content
             match = re.search(r"\[.*\]", content, re.DOTALL)
             if match:
@@ -336,33 +3470,67 @@ class AudioAssistant:
     def next_question_internal(self):
         self.current_question_index += 1
         if 0 <= self.current_question_index < len(self.selected_questions):
-            q = self.selected_questions[self.current_question_index]
-            # Prepend question counter like [1/5] (frontend will display count separately)
-            return f"[{self.current_question_index + 1}/{len(self.selected_questions)}] {q}"
+            return self.format_question(self.current_question_index)
         # Completed
-        self.interview_active = False
-        self.awaiting_answer = False
+        self.state.transition("interview completed", interview="inactive")
+        return None
+
+    def current_question_text(self):
+        if 0 <= self.current_question_index < len(self.selected_questions):
+            return self.selected_questions[self.current_question_index]
+        return ""
+
+    def parse_score(self, feedback_text):
+        try:
+            m = re.search(r"Score\s*:\s*(\d+(?:\.\d+)?)\s*/\s*5", feedback_text, re.IGNORECASE)
+            if m:
+                # Clamp between 0 and 5
+                return max(0.0, min(5.0, float(m.group(1))))
+        except Exception:
+            pass
+        # No score parsed; treat as 0
         return None
 
-    def evaluate_answer(self, answer_text):
+    def record_score(self, score_val):
+        # Evaluations finish on worker threads; totals are only touched under the lock
+        with self.score_lock:
+            if score_val is not None:
+                self.total_score_points += score_val
+            self.questions_answered = min(self.questions_answered + 1, len(self.selected_questions) or self.questions_limit)
+
+    def score_summary(self):
+        total_q = len(self.selected_questions) or self.questions_limit
+        total_possible = total_q * 5
+        with self.score_lock:
+            total_scored = round(self.total_score_points, 2)
+        return f"Interview completed. Score: {total_scored}/{total_possible}"
+
+    def finish_interview_record(self, status, summary=None):
+        # Completed with its summary, or stopped part-way with the score so far; only the first call counts
+        interview_id, self.interview_id = self.interview_id, None
+        if interview_id is None:
+            return
+        with self.score_lock:
+            total_scored = round(self.total_score_points, 2)
+        self.results.finish_interview(interview_id, status, total_scored,
+                                      (len(self.selected_questions) or self.questions_limit) * 5, summary)
+
+    def evaluate_answer(self, answer_text, question_text=None, proctoring_notes=None, trace=NULL_TRACE, handle=None,
+                        result_key=None, generation=None):
         try:
-            # Use the actually selected question for the current index
-            question_text = ""
-            if 0 <= self.current_question_index < len(self.selected_questions):
-                question_text = self.selected_questions[self.current_question_index]
+            # Callers on worker threads pass the question captured at submit time
+            if question_text is None:
+                question_text = self.current_question_text()
+            if proctoring_notes is None:
+                proctoring_notes = list(self.latest_proctoring_notes)
             # Append any recent proctoring notes to the context
-            proctoring_context = "\n\nProctoring notes: " + "; ".join(self.latest_proctoring_notes) if self.latest_proctoring_notes else ""
-            api_key = self.api_key or os.getenv('GROQ_API_KEY') or ""
+            proctoring_context = "\n\nProctoring notes: " + "; ".join(proctoring_notes) if proctoring_notes else ""
+            api_key = self.request_api_key()
             if not api_key or not api_key.startswith("gsk_"):
                 # Fall back to local shallow feedback
                 feedback_text = "Thanks! I'll need an API key to give detailed feedback."
                 return json.dumps({"text": feedback_text, "audio": None})
 
-            url = "https://api.groq.com/openai/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
             system_prompt = (
                 "You are a friendly technical interviewer and remote proctor. You receive a basic question, a candidate's answer, "
                 "and optional proctoring notes describing movement/cheating indicators. Provide concise feedback in 2-3 sentences: "
@@ -370,64 +3538,226 @@ class AudioAssistant:
                 "(e.g., multiple faces, face not visible, frequent looking away, frozen camera), add a short 'Proctoring: <notes>' clause. "
                 "Keep it simple and encouraging. Strictly format as: Feedback: <text> | Score: <n>/5 | Proctoring: <short note or None>"
             )
-            payload = {
-                "model": "llama-3.1-8b-instant",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Question: {question_text}\nAnswer: {answer_text}{proctoring_context}"}
-                ]
-            }
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
-            resp.raise_for_status()
-            data = resp.json()
-            choices = data.get("choices", []) or []
-            first_choice = (choices[0] if len(choices) > 0 else {}) or {}
-            message_obj = first_choice.get("message", {}) or {}
-            text_response = (message_obj.get("content") or first_choice.get("text") or "").strip()
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Question: {question_text}\nAnswer: {answer_text}{proctoring_context}"}
+            ]
+            with trace.stage("llm"):
+                text_response = self.groq.chat(api_key, messages, timeout=60, handle=handle)
             if not text_response:
                 text_response = "Thanks for the answer. Here's some brief feedback: [no content]."
 
-            # Extract numeric score and update totals
-            try:
-                m = re.search(r"Score\s*:\s*(\d+(?:\.\d+)?)\s*/\s*5", text_response, re.IGNORECASE)
-                if m:
-                    score_val = float(m.group(1))
-                    # Clamp between 0 and 5
-                    score_val = max(0.0, min(5.0, score_val))
-                    self.total_score_points += score_val
-                else:
-                    # No score parsed; treat as 0
-                    pass
-            except Exception:
-                pass
-
-            # Mark answered count
-            self.questions_answered = min(self.questions_answered + 1, len(self.selected_questions) or self.questions_limit)
+            # Extract numeric score, update totals and mark answered count
+            score_val = self.parse_score(text_response)
+            if result_key is not None:
+                self.results.record_feedback(*result_key, text_response, score_val)
+            if generation is not None and generation != self.interview_generation:
+                # Interview stopped or restarted meanwhile: its score and state belong to the new one
+                return json.dumps({"text": text_response, "audio": None})
+            self.record_score(score_val)
+            # Audio segments start flowing before the payload is pushed, and cached ones can finish
+            # playing right away: the next question must already be queued by then
+            self.state.transition("feedback ready", expect={"interview": "evaluating"}, interview="feedback")
 
             if self.tts_enabled:
-                return self.tts_pack(text_response)
+                with trace.stage("tts"):
+                    return self.tts_stream(text_response, trace=trace, handle=handle)
             return json.dumps({"text": text_response, "audio": None})
         except Exception as e:
             return json.dumps({"text": f"Error generating feedback: {str(e)}", "audio": None})
 
-assistant = AudioAssistant()
+    def grade_batch(self, answers, handle=None, generation=None):
+        # Scores every collected answer in a single request; returns per-question feedback lines
+        api_key = self.request_api_key()
+        if not api_key or not api_key.startswith("gsk_"):
+            for _ in answers:
+                self.record_score(None)
+            return ["Thanks! I'll need an API key to give detailed feedback."]
+        system_prompt = (
+            "You are a friendly technical interviewer and remote proctor. You receive numbered basic questions, the candidate's "
+            "answers and optional proctoring notes. For each item give 1-2 sentences of feedback and a 1-5 score. "
+            "Return ONLY a JSON array of objects with keys: index, feedback, score. No explanations outside the array."
+        )
+        items = []
+        for i, (question_text, answer_text, notes, _) in enumerate(answers, start=1):
+            notes_text = f"\nProctoring notes: {'; '.join(notes)}" if notes else ""
+            items.append(f"{i}. Question: {question_text}\nAnswer: {answer_text}{notes_text}")
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "\n\n".join(items)}
+        ]
+        graded = {}
+        try:
+            content = self.groq.chat(api_key, messages, timeout=90, handle=handle)
+            match = re.search(r"\[.*\]", content, re.DOTALL)
+            if match:
+                for entry in json.loads(match.group(0)):
+                    if isinstance(entry, dict):
+                        graded[int(entry.get("index", 0))] = entry
+        except Exception as e:
+            print(f"Error in grade_batch: {str(e)}")
+        lines = []
+        current = generation is None or generation == self.interview_generation
+        for i, (question_text, _, _, result_key) in enumerate(answers, start=1):
+            entry = graded.get(i, {})
+            try:
+                score_val = max(0.0, min(5.0, float(entry.get("score"))))
+            except (TypeError, ValueError):
+                score_val = None
+            if current:
+                self.record_score(score_val)
+            feedback_text = str(entry.get("feedback") or "No feedback returned.").strip()
+            if result_key is not None:
+                self.results.record_feedback(*result_key, feedback_text, score_val)
+            score_text = f"{score_val:g}/5" if score_val is not None else "n/a"
+            lines.append(f"[{i}] {question_text}: {feedback_text} (Score: {score_text})")
+        return lines
+
+class SessionRegistry:
+    # Server mode: one isolated AudioAssistant per browser session over one SharedResources.
+    # Sessions idle past idle_timeout with no open push socket are reaped.
+    def __init__(self, shared, max_sessions=200, idle_timeout=900, reap_interval=30):
+        self.shared = shared
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.stats = {"opened": 0, "closed": 0, "reaped": 0, "rejected": 0}
+
+    def open(self):
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            if len(self.sessions) >= self.max_sessions:
+                self.stats["rejected"] += 1
+                raise Exception("Server is at capacity; please try again shortly")
+            session = AudioAssistant(self.shared, ui=SessionChannel(session_id), session_id=session_id,
+                                     local_audio=False)
+            self.sessions[session_id] = session
+            self.stats["opened"] += 1
+        return session
+
+    def get(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise Exception("Unknown or expired session")
+        session.last_seen = time.monotonic()
+        return session
+
+    def close(self, session_id):
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+            if session is not None:
+                self.stats["closed"] += 1
+        if session is None:
+            return False
+        session.shutdown()
+        return True
+
+    def reap(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        with self.lock:
+            idle = [sid for sid, session in self.sessions.items()
+                    if session.last_seen < cutoff and not session.ui.connected]
+            reaped = [self.sessions.pop(sid) for sid in idle]
+            self.stats["reaped"] += len(reaped)
+        for session in reaped:
+            session.shutdown()
+        return len(reaped)
+
+    def start_reaper(self):
+        def loop():
+            while True:
+                time.sleep(self.reap_interval)
+                try:
+                    self.reap()
+                except Exception as e:
+                    print(f"Error reaping sessions: {str(e)}")
+        threading.Thread(target=loop, name="session-reaper", daemon=True).start()
+
+    def snapshot(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+            stats = dict(self.stats)
+        stats["active"] = len(sessions)
+        stats["connected"] = sum(1 for session in sessions if session.ui.connected)
+        stats["interviewing"] = sum(1 for session in sessions if session.interview_active)
+        stats["max_sessions"] = self.max_sessions
+        return stats
+
+shared = None  # SharedResources used by every session
+assistant = None  # The desktop window's session
+registry = None  # Server mode: one AudioAssistant per browser connection
+
+def _session(session_id):
+    if session_id:
+        if registry is None:
+            raise Exception("Sessions are only available in server mode")
+        return registry.get(session_id)
+    if assistant is None:
+        raise Exception("A session is required in server mode")
+    return assistant
+
+def offloaded(fn):
+    # Server mode: Eel runs exposes on the gevent hub thread, so a blocking call (countdown, Groq, TTS)
+    # would stall every other session; run it on the hub's native thread pool instead
+    @functools.wraps(fn)
+    def wrapper(*args):
+        if registry is None or not isinstance(gevent.getcurrent(), gevent.Greenlet):
+            return fn(*args)
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return wrapper
+
+def process_wide(fn):
+    # Stats of the shared caches, pools, tracer and results store cover every session's traffic; in
+    # server mode a candidate's page gets None unless the operator opts in with SERVER_STATS=1
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if registry is not None and os.getenv('SERVER_STATS', '0') != '1':
+            return None
+        return fn(*args, **kwargs)
+    return wrapper
+
+@eel.expose
+def open_session():
+    # Desktop mode has a single implicit session
+    if registry is None:
+        return None
+    return registry.open().session_id
+
+@eel.expose
+def close_session(session_id=None):
+    if registry is None or not session_id:
+        return False
+    return registry.close(session_id)
+
+@eel.expose
+@process_wide
+def get_server_stats():
+    return registry.snapshot() if registry is not None else None
 
 @eel.expose
-def toggle_listening():
-    return assistant.toggle_listening()
+def toggle_listening(session_id=None):
+    return _session(session_id).toggle_listening()
 
 @eel.expose
-def save_api_key(api_key):
+def save_api_key(api_key, session_id=None):
     try:
-        assistant.set_api_key(api_key)
+        _session(session_id).set_api_key(api_key)
         return True
     except Exception as e:
         print(f"Error saving API key: {str(e)}")
         return False
 
 @eel.expose
-def delete_api_key():
+def delete_api_key(session_id=None):
     try:
+        assistant = _session(session_id)
+        if not assistant.local_audio:
+            # Server sessions never touch the operator's config.json
+            assistant.api_key = None
+            return True
         assistant.delete_api_key()
         return True
     except Exception as e:
@@ -435,174 +3765,498 @@ def delete_api_key():
         return False
 
 @eel.expose
-def has_api_key():
-    return assistant.has_api_key()
+def has_api_key(session_id=None):
+    return _session(session_id).has_api_key()
 
 @eel.expose
-def toggle_tts():
+def toggle_tts(session_id=None):
+    assistant = _session(session_id)
     assistant.tts_enabled = not assistant.tts_enabled
     return assistant.tts_enabled
 
 @eel.expose
-def speaking_ended():
-    assistant.is_speaking = False
+def speaking_ended(session_id=None):
+    _session(session_id).state.transition("speaking ended", expect={"audio": "thinking"}, audio="idle")
 
 @eel.expose
-def audio_playback_started():
-    assistant.audio_playing = True
+def audio_playback_started(session_id=None):
+    assistant = _session(session_id)
+    assistant.state.transition("playback started", audio="speaking")
+    assistant.playback_started()
 
 @eel.expose
-def audio_playback_ended():
-    assistant.audio_playing = False
-    assistant.is_speaking = False
+@offloaded
+def audio_playback_ended(session_id=None):
+    _playback_ended(_session(session_id))
+
+def _playback_ended(assistant):
+    # Wakes the capture loop immediately (after the short echo tail)
+    assistant.state.transition("playback ended", audio="idle")
     # If interview feedback just finished and next question is queued, push it now
     try:
-        if assistant.interview_active and assistant.ready_for_next_question:
-            assistant.ready_for_next_question = False
+        if assistant.state.transition("feedback finished", expect={"interview": "feedback"}, interview="asking"):
             nxt = assistant.next_question_internal()
             if nxt:
-                eel.update_ui(f"Q: {nxt}", "")
-                assistant.awaiting_answer = True
-                assistant.collecting_answer = True
-                if assistant.tts_enabled:
-                    q_audio = assistant.tts_pack(nxt)
-                    eel.update_ui("", q_audio)
+                assistant.ui.update_ui(f"Q: {nxt}", "")
+                assistant.state.transition("question asked", expect={"interview": "asking"}, interview="question")
+                _push_question_audio(assistant)
+                # Prepare the following question while this one is being answered
+                assistant.prefetch_question_audio(assistant.current_question_index + 1)
+            elif assistant.batch_answers:
+                # Completed in batch mode: grade everything in one request off the RPC thread
+                assistant.ui.update_ui("", json.dumps({"text": "Grading all answers...", "audio": None}))
+                answers, assistant.batch_answers = assistant.batch_answers, []
+                assistant.evaluation_executor.submit(_deliver_batch_summary, assistant, answers,
+                                                     assistant.interview_generation, assistant.interview_work)
             else:
                 # Completed: show final score summary
-                total_q = len(assistant.selected_questions) or assistant.questions_limit
-                total_possible = total_q * 5
-                total_scored = round(assistant.total_score_points, 2)
-                summary = f"Interview completed. Score: {total_scored}/{total_possible}"
-                eel.update_ui("", json.dumps({"text": summary, "audio": None}))
+                summary = assistant.score_summary()
+                assistant.finish_interview_record("completed", summary)
+                assistant.ui.update_ui("", json.dumps({"text": summary, "audio": None}))
+    except Exception:
+        pass
+
+@eel.expose
+def get_session_state(limit=100, session_id=None):
+    return _session(session_id).state.snapshot(limit)
+
+@eel.expose
+def get_capture_stats(session_id=None):
+    return _session(session_id).capture_snapshot()
+
+@eel.expose
+@process_wide
+def get_response_cache_stats(session_id=None):
+    return _session(session_id).response_cache.snapshot()
+
+@eel.expose
+@process_wide
+def get_tts_cache_stats(session_id=None):
+    return _session(session_id).tts_cache.snapshot()
+
+@eel.expose
+@process_wide
+def get_tts_stats(session_id=None):
+    return _session(session_id).tts_router.snapshot()
+
+@eel.expose
+@process_wide
+def get_latency_summary(recent=20, session_id=None):
+    return _session(session_id).tracer.summary(recent)
+
+@eel.expose
+@process_wide
+def get_audio_store_stats(session_id=None):
+    return _session(session_id).audio_store.snapshot()
+
+@eel.expose
+@process_wide
+def get_rate_limit_stats(session_id=None):
+    return _session(session_id).groq.scheduler.snapshot()
+
+@eel.expose
+@process_wide
+def get_hedge_stats(session_id=None):
+    return _session(session_id).groq.hedger.snapshot()
+
+@eel.expose
+def get_proctoring_stats(session_id=None):
+    return _session(session_id).proctor.snapshot()
+
+@eel.expose
+def get_speculation_stats(session_id=None):
+    return _session(session_id).speculation_snapshot()
+
+@eel.expose
+def get_cancellation_stats(session_id=None):
+    return _session(session_id).cancellation_snapshot()
+
+@eel.expose
+def get_conversation_stats(session_id=None):
+    return _session(session_id).memory.snapshot()
+
+@eel.expose
+@process_wide
+def get_results_stats(session_id=None):
+    return _session(session_id).results.snapshot()
+
+@eel.expose
+def set_candidate(name, session_id=None):
+    # Names this session's result rows from here on
+    cleaned = str(name or "").strip()[:200]
+    if not cleaned:
+        return False
+    _session(session_id).candidate = cleaned
+    return True
+
+@eel.expose
+def clear_conversation(session_id=None):
+    _session(session_id).memory.clear()
+    return True
+
+def serve_audio_clip(clip_id):
+    # GET/HEAD /audio/<id>.mp3 (or .wav) with single-range support so the browser can seek and stream
+    store = shared.audio_store
+    clip_id = clip_id.split('.', 1)[0]
+    audio = store.get(clip_id)
+    if audio is None:
+        return bottle.HTTPError(404, "Audio clip not found")
+    size = len(audio)
+    headers = {
+        "Content-Type": audio_format(audio)[1],
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=3600, immutable"  # ID is a content hash
+    }
+    start, end, status = 0, size, 200
+    range_header = bottle.request.environ.get('HTTP_RANGE')
+    if range_header:
+        ranges = list(bottle.parse_range_header(range_header, size))
+        if not ranges:
+            headers["Content-Range"] = f"bytes */{size}"
+            return bottle.HTTPResponse(status=416, **headers)
+        start, end = ranges[0]
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+    is_head = bottle.request.method == 'HEAD'
+    store.record_served(clip_id, 0 if is_head else end - start, status == 206, not is_head and end == size)
+    body = "" if is_head else store.iter_bytes(audio, start, end)
+    return bottle.HTTPResponse(body, status=status, **headers)
+
+def export_results():
+    # GET /results/export?candidate=&topic=&since=&until=&page_size= streams answer rows as JSON lines,
+    # one page at a time. Always needs RESULTS_EXPORT_TOKEN (?token= or a Bearer header): anything that
+    # can reach the port, including other local processes, could otherwise read every candidate's answers.
+    token = os.getenv('RESULTS_EXPORT_TOKEN')
+    if not token:
+        return bottle.HTTPError(403, "Set RESULTS_EXPORT_TOKEN to export results")
+    given = bottle.request.query.get('token') or ''
+    auth = bottle.request.get_header('Authorization') or ''
+    if auth.startswith('Bearer '):
+        given = auth[7:]
+    if not hmac.compare_digest(given.encode('utf-8'), token.encode('utf-8')):
+        return bottle.HTTPError(403, "Invalid export token")
+    query = bottle.request.query
+    try:
+        page_size = max(1, min(5000, int(query.get('page_size') or 500)))
+        rows = shared.results.iter_answers(candidate=query.get('candidate'), topic=query.get('topic'),
+                                           since=ResultsStore.parse_time(query.get('since')),
+                                           until=ResultsStore.parse_time(query.get('until')), page_size=page_size)
+    except ValueError as e:
+        return bottle.HTTPError(400, f"Bad export query: {str(e)}")
+    bottle.response.content_type = 'application/x-ndjson'
+    bottle.response.set_header('Content-Disposition', 'attachment; filename="interview_results.jsonl"')
+    return (json.dumps(row) + "\n" for row in rows)
+
+def session_socket(ws, session_id):
+    # Server mode push channel: /session/<id> carries this session's update_ui/queue_tts_audio calls,
+    # since Eel's own JS calls go to every connected window
+    if ws is None:
+        raise bottle.HTTPError(400, "WebSocket required")
+    try:
+        session = registry.get(session_id)
+    except Exception:
+        return
+    session.ui.attach(ws)
+    try:
+        while True:
+            if ws.receive() is None:
+                break
+            session.last_seen = time.monotonic()  # Client heartbeat
+    except Exception:
+        pass
+    finally:
+        session.ui.detach(ws)
+
+def frame_socket(ws, session_id=None):
+    # Proctoring camera frames as binary messages; ignored outside an interview
+    if ws is None:
+        raise bottle.HTTPError(400, "WebSocket required")
+    try:
+        assistant = _session(session_id)
+    except Exception:
+        return
+    try:
+        while True:
+            data = ws.receive()
+            if data is None:
+                break
+            if isinstance(data, (bytes, bytearray)) and assistant.interview_active:
+                assistant.proctor.submit(data)
     except Exception:
         pass
 
 @eel.expose
-def stop_response():
+def stop_response(session_id=None):
+    assistant = _session(session_id)
+    # Abort the in-flight Groq stream and queued synthesis first, so the answer is already marked cancelled
+    # (never cached or pushed) by the time anything sees the stop flag
+    assistant.cancel_work("stopped")
     # Prevent generating any new audio for the current/next response
-    assistant.stop_requested = True
-    assistant.is_speaking = False
+    assistant.state.transition("stop requested", stop_requested=True)
+    assistant.state.transition("stop requested", expect={"audio": "thinking"}, audio="idle")
+    assistant.state.transition("stop requested", expect={"audio": "pending"}, audio="idle")
     return True
 
 @eel.expose
-def stop_interview():
+def stop_interview(session_id=None):
     try:
-        assistant.latest_proctoring_notes = []
-        assistant.interview_active = False
-        assistant.awaiting_answer = False
-        assistant.collecting_answer = False
-        assistant.ready_for_next_question = False
-        assistant.collected_transcripts = []
-        assistant.is_speaking = False
-        assistant.audio_playing = False
+        _session(session_id).reset_interview()
         return json.dumps({"text": "Interview stopped.", "audio": None})
     except Exception as e:
         return json.dumps({"text": f"Error stopping interview: {str(e)}", "audio": None})
 
 @eel.expose
-def stop_tts_playback():
-    # Frontend halts audio; backend updates flags
-    assistant.audio_playing = False
-    assistant.is_speaking = False
+def stop_tts_playback(session_id=None):
+    # Frontend halts audio; pending synthesis is dropped and the backend returns to idle so capture resumes
+    assistant = _session(session_id)
+    assistant.cancel_work("playback stopped")
+    assistant.state.transition("playback stopped", audio="idle")
     return True
 
 @eel.expose
-def ask_question(text):
+@offloaded
+def ask_question(text, session_id=None):
     try:
+        assistant = _session(session_id)
         if not isinstance(text, str):
             return json.dumps({"text": "Invalid question.", "audio": None})
-        cleaned = text.strip()
+        cleaned = text.strip()[:assistant.max_answer_chars]
         if not cleaned:
             return json.dumps({"text": "Please enter a question.", "audio": None})
-        # Normalize capitalization and ensure question mark
-        normalized = cleaned[0].upper() + cleaned[1:] if len(cleaned) > 1 else cleaned.upper()
-        if not normalized.endswith('?'):
-            # Heuristic: if it looks like a question, append '?'
-            if re.match(r'^(what|why|how|when|where|who|which|can|could|would|should|is|are|do|does|am|was|were|have|has|had|will|shall)\b', normalized, re.IGNORECASE):
-                normalized += '?'
-        eel.update_ui(f"Q: {normalized}", "")
-        response = assistant.get_ai_response(normalized)
-        eel.update_ui("", f"{response}")
+        normalized = assistant.normalize_question(cleaned)
+        # A new question lifts an earlier Stop, as a spoken one does; Stop itself cancels only its own answer
+        assistant.state.transition("question typed", stop_requested=False)
+        trace = assistant.tracer.start("typed")
+        work = assistant.begin_work()
+        assistant.ui.update_ui(f"Q: {normalized}", "")
+        assistant.expect_playback(trace)
+        response = assistant.get_ai_response(normalized, on_delta=assistant.ui_stream_callback(work), trace=trace,
+                                             handle=work)
+        if assistant.is_stale(work):
+            assistant.drop_stale(trace)
+            return json.dumps({"text": "Cancelled.", "audio": None})
+        assistant.expect_playback(trace, response)
+        with trace.stage("ui_push"):
+            assistant.ui.update_ui("", f"{response}")
         return response
     except Exception as e:
         return json.dumps({"text": f"Error: {str(e)}", "audio": None})
 
 @eel.expose
-def start_interview():
+def prepare_interview(session_id=None):
+    # Called when the start overlay appears so its 3s also hide topic generation
+    _session(session_id).prefetch_interview()
+    return True
+
+@eel.expose
+@offloaded
+def start_interview(session_id=None):
     try:
+        assistant = _session(session_id)
+        # Topic generation and first-question audio overlap with the countdown
+        assistant.prefetch_interview()
+        # 3-2-1 countdown prompt
+        for remaining in range(assistant.interview_countdown, 0, -1):
+            text = f"Interview starts in {remaining}..." if remaining == assistant.interview_countdown else f"{remaining}..."
+            assistant.ui.update_ui("", json.dumps({"text": text, "audio": None}))
+            time.sleep(1)
         first_q = assistant.start_interview_internal()
         if not first_q:
             return json.dumps({"text": "No questions available.", "audio": None})
-        # 3-2-1 countdown prompt
-        eel.update_ui("", json.dumps({"text": "Interview starts in 3...", "audio": None}))
-        time.sleep(1)
-        eel.update_ui("", json.dumps({"text": "2...", "audio": None}))
-        time.sleep(1)
-        eel.update_ui("", json.dumps({"text": "1...", "audio": None}))
-        time.sleep(1)
-        eel.update_ui(f"Q: {first_q}", "")
-        assistant.awaiting_answer = True
-        assistant.collecting_answer = True
-        assistant.ready_for_next_question = False
-        if assistant.tts_enabled:
-            q_audio = assistant.tts_pack(first_q)
-            eel.update_ui("", q_audio)
+        assistant.ui.update_ui(f"Q: {first_q}", "")
+        assistant.state.transition("question asked", expect={"interview": "asking"}, interview="question")
+        _push_question_audio(assistant)
+        assistant.prefetch_question_audio(assistant.current_question_index + 1)
         return json.dumps({"text": f"Interview started.", "audio": None})
     except Exception as e:
         return json.dumps({"text": f"Error starting interview: {str(e)}", "audio": None})
 
+def _finish_answer(assistant, answer_text, clear_notes=False):
+    # The caller has already moved the question to "evaluating", so each question is finished once.
+    # Capture the question context now; evaluation may run after the interview has moved on
+    question_text = assistant.current_question_text()
+    notes = list(assistant.latest_proctoring_notes)
+    result_key = None
+    if assistant.interview_id is not None:
+        result_key = (assistant.interview_id, assistant.current_question_index)
+        assistant.results.record_answer(*result_key, assistant.candidate, question_text, answer_text, notes)
+    if clear_notes:
+        assistant.latest_proctoring_notes = []
+    mode = assistant.evaluation_mode
+    trace = assistant.tracer.start("answer")
+    trace.tag(mode=mode)
+    if mode == "batch":
+        assistant.batch_answers.append((question_text, answer_text, notes, result_key))
+        ack = json.dumps({"text": "Answer recorded.", "audio": None})
+        assistant.ui.update_ui("", ack)
+        assistant.state.transition("answer recorded", expect={"interview": "evaluating"}, interview="feedback")
+        trace.finish()
+        _playback_ended(assistant)
+        return ack
+    if mode == "async":
+        assistant.evaluation_executor.submit(_deliver_feedback, assistant, answer_text, question_text, notes,
+                                             assistant.interview_generation, trace, assistant.interview_work,
+                                             result_key)
+        return json.dumps({"text": "Evaluating your answer...", "audio": None})
+    generation = assistant.interview_generation
+    feedback = assistant.evaluate_answer(answer_text, question_text, notes, trace=trace,
+                                         handle=assistant.interview_work, result_key=result_key,
+                                         generation=generation)
+    if generation != assistant.interview_generation:
+        trace.finish(outcome="stale")
+        return feedback
+    _push_feedback(assistant, feedback, trace)
+    return feedback
+
+def _push_feedback(assistant, feedback, trace=NULL_TRACE):
+    # Queue next question after feedback TTS finishes (normally already done by evaluate_answer)
+    assistant.state.transition("feedback delivered", expect={"interview": "evaluating"}, interview="feedback")
+    if not _push_spoken(assistant, feedback, trace, "feedback audio sent"):
+        _playback_ended(assistant)
+
+def _push_question_audio(assistant):
+    if not assistant.tts_enabled:
+        return
+    trace = assistant.tracer.start("question")
+    _push_spoken(assistant, assistant.question_tts_pack(assistant.current_question_index), trace,
+                 "question audio sent")
+
+def _push_spoken(assistant, payload, trace, reason):
+    # Like a Q&A answer: with audio on its way the mic stays closed ("pending") until the page reports
+    # playback, and a clip it never starts reopens the mic after a few seconds. Set before the push so a
+    # short clip's start and end can't both land first. Returns whether audio was sent.
+    has_audio = assistant.tts_enabled and _payload_has_audio(payload)
+    if has_audio:
+        assistant.state.transition(reason, expect={"audio": "idle"}, audio="pending")
+    assistant.expect_playback(trace, payload)
+    with trace.stage("ui_push"):
+        assistant.ui.update_ui("", f"{payload}")
+    return has_audio
+
+def _deliver_feedback(assistant, answer_text, question_text, notes, generation, trace=NULL_TRACE, handle=None,
+                      result_key=None):
+    try:
+        started = time.monotonic()
+        trace.record("worker_wait", trace.t0, started)
+        feedback = assistant.evaluate_answer(answer_text, question_text, notes, trace=trace, handle=handle,
+                                             result_key=result_key, generation=generation)
+        # Drop results for an interview that was stopped or restarted meanwhile
+        if generation != assistant.interview_generation:
+            trace.finish(outcome="stale")
+            return
+        _push_feedback(assistant, feedback, trace)
+    except Exception as e:
+        print(f"Error delivering feedback: {str(e)}")
+
+def _deliver_batch_summary(assistant, answers, generation, handle=None):
+    try:
+        lines = assistant.grade_batch(answers, handle, generation)
+        if generation != assistant.interview_generation:
+            return
+        summary = "\n".join(lines + [assistant.score_summary()])
+        assistant.finish_interview_record("completed", summary)
+        assistant.ui.update_ui("", json.dumps({"text": summary, "audio": None}))
+    except Exception as e:
+        print(f"Error delivering batch summary: {str(e)}")
+
+@eel.expose
+def set_evaluation_mode(mode, session_id=None):
+    if mode not in ("sync", "async", "batch"):
+        return False
+    _session(session_id).evaluation_mode = mode
+    return True
+
 @eel.expose
-def submit_answer(text):
+@offloaded
+def submit_answer(text, session_id=None):
     try:
+        assistant = _session(session_id)
         if not assistant.interview_active and not assistant.awaiting_answer:
             return json.dumps({"text": "Start the interview first.", "audio": None})
-        cleaned = (text or "").strip()
+        cleaned = (text or "").strip()[:assistant.max_answer_chars]
         if not cleaned:
             return json.dumps({"text": "Please provide an answer.", "audio": None})
-        eel.update_ui(f"Your answer: {cleaned}", "")
-        feedback = assistant.evaluate_answer(cleaned)
-        eel.update_ui("", f"{feedback}")
-        assistant.awaiting_answer = False
-        # Queue next question after feedback TTS finishes
-        assistant.ready_for_next_question = True
-        if not assistant.tts_enabled:
-            audio_playback_ended()
-        return feedback
+        # A double submit or a late answer finds the question already being evaluated
+        if not assistant.state.transition("answer submitted", expect={"interview": "question"}, interview="evaluating"):
+            return json.dumps({"text": "No active question.", "audio": None})
+        assistant.ui.update_ui(f"Your answer: {cleaned}", "")
+        return _finish_answer(assistant, cleaned)
     except Exception as e:
         return json.dumps({"text": f"Error submitting answer: {str(e)}", "audio": None})
 
 @eel.expose
-def complete_answer():
+@offloaded
+def complete_answer(session_id=None):
     try:
-        if not assistant.interview_active or not assistant.awaiting_answer:
-            return json.dumps({"text": "No active question.", "audio": None})
-        answer_joined = " ".join(assistant.collected_transcripts).strip()
-        if not answer_joined:
-            return json.dumps({"text": "I didn't catch an answer. Please try again.", "audio": None})
-        eel.update_ui(f"Your answer: {answer_joined}", "")
-        assistant.collecting_answer = False
-        feedback = assistant.evaluate_answer(answer_joined)
-        eel.update_ui("", f"{feedback}")
-        assistant.awaiting_answer = False
-        assistant.collected_transcripts = []
-        assistant.latest_proctoring_notes = []
-        # Queue next question after feedback TTS finishes
-        assistant.ready_for_next_question = True
-        if not assistant.tts_enabled:
-            audio_playback_ended()
-        return feedback
+        assistant = _session(session_id)
+        # Read and close the answer atomically so a late transcript can't be lost in between
+        with assistant.state.cond:
+            if assistant.state.interview != "question":
+                return json.dumps({"text": "No active question.", "audio": None})
+            answer_joined = " ".join(assistant.collected_transcripts).strip()
+            if not answer_joined:
+                return json.dumps({"text": "I didn't catch an answer. Please try again.", "audio": None})
+            assistant.collected_transcripts = []
+            assistant.state.transition("answer completed", interview="evaluating")
+        assistant.ui.update_ui(f"Your answer: {answer_joined}", "")
+        return _finish_answer(assistant, answer_joined, clear_notes=True)
     except Exception as e:
         return json.dumps({"text": f"Error finalizing answer: {str(e)}", "audio": None})
 
 @eel.expose
-def set_proctoring_notes(notes):
+def set_proctoring_notes(notes, session_id=None):
     try:
         if isinstance(notes, list):
             # Keep last 10 notes to limit size
-            assistant.latest_proctoring_notes = [str(n)[:200] for n in notes][-10:]
+            _session(session_id).latest_proctoring_notes = [str(n)[:200] for n in notes][-10:]
             return True
         return False
     except Exception:
         return False
 
-eel.start('index.html', size=(960, 840))
\ No newline at end of file
+window_ready = threading.Event()
+
+@eel.expose
+def report_window_ready():
+    mark_startup("window_ready")
+    window_ready.set()
+    return True
+
+@eel.expose
+@process_wide
+def get_startup_report():
+    return STARTUP_TIMINGS
+
+if __name__ == '__main__':
+    mark_startup("module_loaded")
+    eel.init('web')
+    server_mode = os.getenv('SERVER_MODE', '0') == '1'
+    if server_mode:
+        # Many browser sessions, no local window or microphone; pools sized for concurrent candidates
+        workers = int(os.getenv('SERVER_WORKERS', '16'))
+        shared = SharedResources(tts_workers=workers, prefetch_workers=workers // 2,
+                                 evaluation_workers=workers // 2, http_pool=workers * 2)
+        registry = SessionRegistry(shared, max_sessions=int(os.getenv('MAX_SESSIONS', '200')),
+                                   idle_timeout=int(os.getenv('SESSION_IDLE_TIMEOUT', '900')))
+        registry.start_reaper()
+        gevent.get_hub().threadpool.maxsize = workers * 4
+    else:
+        shared = SharedResources()
+        assistant = AudioAssistant(shared)
+    # Registered before eel.start so they take precedence over Eel's static-file catch-all
+    bottle.route(shared.audio_store.route_prefix + '<clip_id>', method=['GET', 'HEAD'], callback=serve_audio_clip)
+    bottle.route('/results/export', method='GET', callback=export_results)
+    bottle.route('/session/<session_id>', callback=session_socket, apply=[bottle_websocket.websocket])
+    bottle.route('/frames', callback=frame_socket, apply=[bottle_websocket.websocket])
+    bottle.route('/frames/<session_id>', callback=frame_socket, apply=[bottle_websocket.websocket])
+    mark_startup("assistant_ready")
+    if server_mode:
+        warmer = AudioAssistant(shared, local_audio=False)
+        threading.Thread(target=warmer.warm_tts_cache, name="warmup", daemon=True).start()
+        # close_callback: without it Eel exits once the last browser disconnects
+        eel.start('index.html', mode=None, host=os.getenv('SERVER_HOST', '0.0.0.0'),
+                  port=int(os.getenv('SERVER_PORT', '8000')), close_callback=lambda page, sockets: None)
+    else:
+        threading.Thread(target=assistant.background_warmup, args=(window_ready,), name="warmup", daemon=True).start()
+        eel.start('index.html', size=(960, 840))
@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+# Long-session soak of the real page in headless Chromium (PyQt6-WebEngine), kept out of benchmark.py
+# because it needs none of the app's dependencies and the app needs none of these:
+#   pip install PyQt6-WebEngine websocket-client
+# The page is served by `SERVER_MODE=1 inter_ass.py`, started here unless --url is given
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MEASURE = """
+(() => {
+    if (window.gc) { window.gc(); window.gc(); }
+    const m = performance.memory;
+    return JSON.stringify({
+        dom_elements: document.getElementsByTagName('*').length,
+        answer_items: document.querySelectorAll('.answer-item').length,
+        question_items: document.querySelectorAll('.question-item').length,
+        audio_elements: typeof activeAudios !== 'undefined' ? activeAudios.length : null,
+        eel_pending_calls: window.eel ? Object.keys(eel._call_return_callbacks).length : null,
+        js_heap_bytes: m ? m.usedJSHeapSize : null
+    });
+})()
+"""
+
+# Same backend entry points in every version of the page: question, streamed answer, final payload,
+# two audio segments per answer
+DRIVE = """
+window.__soakDone = window.__soakDone || 0;
+window.__soakTo = async (target) => {
+    const sentence = 'A message queue decouples the producer from the consumer, so bursts are absorbed. ';
+    for (let i = window.__soakDone + 1; i <= target; i++) {
+        update_ui(`Q: Soak question ${i}, what does a load balancer do?`, '');
+        const streamId = `soak-${i}`;
+        for (let t = 0; t < 4; t++) update_ui_stream(streamId, sentence);
+        update_ui('', JSON.stringify({ text: sentence.repeat(4) + `(${i})`, audio: null }));
+        queue_tts_audio(streamId, 0, `/audio/soak-${i}-0.mp3`, false);
+        queue_tts_audio(streamId, 1, `/audio/soak-${i}-1.mp3`, true);
+        if (i % 50 === 0) await new Promise(resolve => requestAnimationFrame(resolve));
+    }
+    await new Promise(resolve => requestAnimationFrame(resolve));
+    window.__soakDone = target;
+};
+'ready'
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(web_dir, python):
+    # eel serves ./web, so a different copy of the page (e.g. from an older checkout) runs from a scratch folder
+    cwd = HERE
+    if web_dir:
+        cwd = tempfile.mkdtemp(prefix="soak-")
+        os.symlink(os.path.abspath(web_dir), os.path.join(cwd, "web"))
+    port = free_port()
+    env = dict(os.environ, SERVER_MODE="1", SERVER_HOST="127.0.0.1", SERVER_PORT=str(port))
+    # Server output goes to stderr so stdout stays a single JSON report
+    server = subprocess.Popen([python, os.path.join(HERE, "inter_ass.py")], cwd=cwd, env=env,
+                              stdout=sys.stderr, stderr=sys.stderr)
+    url = f"http://127.0.0.1:{port}/index.html"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise Exception(f"Server exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            return server, url
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise Exception("Server did not start within 30s")
+
+
+def renderer_memory():
+    # PSS/RSS of the renderer processes (DOM, layout, V8 and media all live there); Linux only
+    # Renderers fork from the sandboxed zygote and keep its command line; utilities come from the other one
+    total = {"renderer_pss_kb": 0, "renderer_rss_kb": 0}
+    if not os.path.isdir("/proc"):
+        return {}
+
+    def cmdline_of(pid):
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read()
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            if b"QtWebEngineProcess" not in cmdline_of(pid):
+                continue
+            with open(f"/proc/{pid}/stat") as f:
+                ppid = f.read().rsplit(")", 1)[1].split()[1]
+            parent = cmdline_of(ppid)
+            if b"--type=zygote" not in parent or b"--no-zygote-sandbox" in parent:
+                continue
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in ("Pss", "Rss"):
+                        total[f"renderer_{key.lower()}_kb"] += int(value.split()[0])
+        except OSError:
+            continue
+    return total
+
+
+def dom_counters(port):
+    # DevTools DOM node / event listener counts; optional, skipped without websocket-client
+    try:
+        import websocket
+    except ImportError:
+        return {}
+    targets = json.load(urllib.request.urlopen(f"http://127.0.0.1:{port}/json"))
+    ws = websocket.create_connection(next(t for t in targets if t["type"] == "page")["webSocketDebuggerUrl"],
+                                     timeout=60)
+    try:
+        ws.send(json.dumps({"id": 1, "method": "Memory.getDOMCounters", "params": {}}))
+        while True:
+            message = json.loads(ws.recv())
+            if message.get("id") == 1:
+                result = message.get("result", {})
+                return {"devtools_nodes": result.get("nodes"), "devtools_listeners": result.get("jsEventListeners")}
+    finally:
+        ws.close()
+
+
+def run_page(url, checkpoints, settle_ms):
+    # Chromium reads these when the first web view is created
+    devtools_port = free_port()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["QTWEBENGINE_REMOTE_DEBUGGING"] = str(devtools_port)
+    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(filter(None, [
+        os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS"), "--enable-precise-memory-info", "--js-flags=--expose-gc"]))
+    try:
+        from PyQt6.QtCore import QTimer, QUrl
+        from PyQt6.QtWebEngineWidgets import QWebEngineView
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        raise Exception("The soak needs PyQt6-WebEngine: pip install PyQt6-WebEngine websocket-client")
+
+    app = QApplication(sys.argv[:1])
+    view = QWebEngineView()
+    view.resize(1280, 900)
+    view.show()
+    page = view.page()
+    samples = []
+    pending = [0] + list(checkpoints)
+    error = []
+
+    def measure(exchanges):
+        def measured(value):
+            sample = {"exchanges": exchanges}
+            sample.update(json.loads(value))
+            sample.update(renderer_memory())
+            samples.append(sample)
+            # One DevTools call off the Qt loop, which is the one serving DevTools
+            worker = threading.Thread(target=lambda: sample.update(dom_counters(devtools_port)), daemon=True)
+            worker.start()
+
+            def wait():
+                if worker.is_alive():
+                    QTimer.singleShot(100, wait)
+                else:
+                    next_checkpoint()
+            wait()
+        QTimer.singleShot(settle_ms, lambda: page.runJavaScript(MEASURE, measured))
+
+    def next_checkpoint():
+        if not pending:
+            app.quit()
+            return
+        target = pending.pop(0)
+        if target == 0:
+            measure(0)
+            return
+        page.runJavaScript(f"window.__soakTo({target}); 'started'")
+
+        def poll():
+            page.runJavaScript("window.__soakDone",
+                               lambda done: measure(target) if done == target else QTimer.singleShot(200, poll))
+        poll()
+
+    def loaded(ok):
+        if not ok:
+            error.append(f"Could not load {url}")
+            app.quit()
+            return
+        # The first measurement waits --settle-ms too, so the page has opened its session
+        page.runJavaScript(DRIVE, lambda _: next_checkpoint())
+
+    page.loadFinished.connect(loaded)
+    view.load(QUrl(url))
+    app.exec()
+    if error:
+        raise Exception(error[0])
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Long-session soak of the page in headless Chromium")
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[500, 1000, 2000, 4000],
+                        help="Exchange counts to measure at, in increasing order")
+    parser.add_argument("--url", help="Page to drive (default: start SERVER_MODE=1 inter_ass.py on a free port)")
+    parser.add_argument("--web", help="Serve this copy of web/ instead, e.g. from an older checkout")
+    parser.add_argument("--server-python", default=sys.executable,
+                        help="Interpreter with the app's requirements, when PyQt6 lives in another one")
+    parser.add_argument("--settle-ms", type=int, default=3000, help="Wait before each measurement")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_server(args.web, args.server_python)
+    try:
+        samples = run_page(url, sorted(args.checkpoints), args.settle_ms)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(10)
+    print(json.dumps({"url": url, "web": args.web or "web", "samples": samples}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
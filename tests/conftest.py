@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark  # noqa: E402
+
+
+@pytest.fixture
+def stub():
+    # Local Groq stand-in from the benchmarks; fast enough for tests, slow enough to interrupt
+    server = benchmark.StubGroqServer(latency_ms=40, jitter_ms=0, token_ms=5, prefill_ms=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def session(stub, tmp_path):
+    # A real AudioAssistant wired to the stub, a fake TTS engine and a simulated browser
+    tts = benchmark.FakeTts(latency_ms=5, ms_per_char=0)
+    assistant, browser = benchmark.build_assistant(stub, tts, 0.0, str(tmp_path))
+    yield assistant, browser
+    assistant.shutdown()
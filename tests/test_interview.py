@@ -0,0 +1,33 @@
+import inter_ass
+
+
+def audio_changes(assistant, reason):
+    return [(entry["from"], entry["to"]) for entry in assistant.state.snapshot(500)["transitions"]
+            if entry["field"] == "audio" and entry["reason"] == reason]
+
+
+def test_question_and_feedback_audio_hold_the_mic_until_played(session):
+    assistant, browser = session
+    assistant.interview_countdown = 0
+    assistant.questions_limit = 2
+    assistant.evaluation_mode = "sync"
+    state = assistant.state
+    inter_ass.start_interview(assistant.session_id)
+    with state.cond:
+        assert state.cond.wait_for(lambda: state.interview == "question", 10)
+    assert audio_changes(assistant, "question audio sent") == [("idle", "pending")]
+    with state.cond:
+        # The candidate answers once the question has been read out
+        assert state.cond.wait_for(lambda: state.audio == "idle", 10)
+    assistant.handle_transcript("A queue absorbs bursts between producer and consumer.")
+    inter_ass.complete_answer(assistant.session_id)
+    with state.cond:
+        assert state.cond.wait_for(lambda: assistant.current_question_index == 1 and state.interview == "question", 10)
+    # The simulated page reports each clip's playback, which moves pending on to speaking
+    with state.cond:
+        assert state.cond.wait_for(lambda: state.audio == "idle"
+                                   and len(audio_changes(assistant, "playback ended")) == 3, 10)
+    assert audio_changes(assistant, "feedback audio sent") == [("idle", "pending")]
+    assert audio_changes(assistant, "question audio sent") == [("idle", "pending")] * 2
+    assert audio_changes(assistant, "playback started") == [("pending", "speaking")] * 3
+    inter_ass.stop_interview(assistant.session_id)
@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+
+import pytest
+
+import benchmark
+import inter_ass
+
+
+def ask(assistant, text):
+    return json.loads(inter_ass.ask_question(text, assistant.session_id))
+
+
+def test_typed_question_streams_full_answer(session, stub):
+    assistant, browser = session
+    response = ask(assistant, "what is a race condition")
+    assert response["text"] == benchmark.DEFAULT_ANSWER
+    assert stub.stats["requests"] == 1
+
+
+def test_typed_question_after_stop_gets_full_answer(session, stub):
+    assistant, browser = session
+    inter_ass.stop_response(assistant.session_id)
+    response = ask(assistant, "what is a race condition")
+    assert response["text"] == benchmark.DEFAULT_ANSWER
+    assert not assistant.stop_requested
+
+
+def test_stop_mid_stream_never_caches_partial_answer(session, stub):
+    assistant, browser = session
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(ask(assistant, "what is a race condition")))
+    worker.start()
+    deadline = time.monotonic() + 5
+    while browser.stream_deltas == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    inter_ass.stop_response(assistant.session_id)
+    worker.join(10)
+    assert result["text"] != benchmark.DEFAULT_ANSWER
+    # The cut-off answer was not cached, so asking again goes back to the model for the whole of it
+    response = ask(assistant, "what is a race condition")
+    assert response["text"] == benchmark.DEFAULT_ANSWER
+    assert stub.stats["requests"] == 2
+
+
+def test_stream_stopped_early_raises_instead_of_returning_partial_text(session, stub):
+    assistant, browser = session
+    deltas = []
+    with pytest.raises(Exception, match="cancelled"):
+        assistant.groq.chat(assistant.api_key, [{"role": "user", "content": "what is a race condition"}],
+                            on_delta=deltas.append, should_stop=lambda: len(deltas) >= 2)
+    assert 0 < len(deltas) < len(benchmark.DEFAULT_ANSWER.split())
+
+
+def test_server_sessions_do_not_inherit_operator_key(session, stub, monkeypatch):
+    assistant, browser = session
+    assistant.local_audio = False  # As a server-mode session
+    monkeypatch.setenv("GROQ_API_KEY", "gsk_operator")
+    monkeypatch.delenv("SHARE_API_KEY", raising=False)
+    assistant.api_key = None
+    assistant.load_api_key()
+    assert not assistant.has_api_key()
+    assert assistant.request_api_key() == ""
+    response = ask(assistant, "what is a race condition")
+    assert response["text"] != benchmark.DEFAULT_ANSWER and stub.stats["requests"] == 0
+    monkeypatch.setenv("SHARE_API_KEY", "1")
+    assistant.load_api_key()
+    assert assistant.api_key == "gsk_operator"
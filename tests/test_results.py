@@ -0,0 +1,31 @@
+import bottle
+
+import inter_ass
+
+
+def export(monkeypatch, shared, query="", headers=None):
+    monkeypatch.setattr(inter_ass, "shared", shared)
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": "/results/export", "QUERY_STRING": query}
+    for name, value in (headers or {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+    bottle.request.bind(environ)
+    return inter_ass.export_results()
+
+
+def test_results_are_not_saved_unless_configured(monkeypatch, tmp_path):
+    monkeypatch.delenv("RESULTS_DB", raising=False)
+    monkeypatch.chdir(tmp_path)
+    shared = inter_ass.SharedResources(tts_cache=inter_ass.TtsCache(cache_dir=str(tmp_path / "tts")))
+    assert shared.results.path is None and shared.results.writer is None
+    assert not (tmp_path / "interview_results.db").exists()
+
+
+def test_export_needs_a_configured_token(session, monkeypatch):
+    assistant, browser = session
+    monkeypatch.delenv("RESULTS_EXPORT_TOKEN", raising=False)
+    response = export(monkeypatch, assistant.shared)
+    assert isinstance(response, bottle.HTTPError) and response.status_code == 403
+    monkeypatch.setenv("RESULTS_EXPORT_TOKEN", "secret")
+    response = export(monkeypatch, assistant.shared, "token=wrong")
+    assert isinstance(response, bottle.HTTPError) and response.status_code == 403
+    assert list(export(monkeypatch, assistant.shared, headers={"Authorization": "Bearer secret"})) == []
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+import benchmark
+import inter_ass
+
+QUESTION = [{"role": "user", "content": "What is a race condition?"}]
+
+
+@pytest.fixture
+def limited_stub():
+    # Enforces 4 requests per second and reports x-ratelimit-* headers like Groq
+    server = benchmark.StubGroqServer(latency_ms=10, jitter_ms=0, token_ms=0, prefill_ms=0, rpm=4, tpm=100000,
+                                      limit_window=1.0).start()
+    yield server
+    server.stop()
+
+
+def burst(groq, count):
+    errors = []
+
+    def call():
+        try:
+            groq.chat("gsk_test", QUESTION, timeout=30)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    return time.monotonic() - started, errors
+
+
+def test_pacing_spreads_a_burst_over_the_quota_without_429s(limited_stub):
+    groq = inter_ass.GroqClient(url=limited_stub.url, scheduler=benchmark.make_scheduler(limited_stub))
+    wall, errors = burst(groq, 10)
+    assert not errors
+    assert limited_stub.stats["rate_limited"] == 0
+    # 4 go at once, the other 6 at the refill rate of 4 per second
+    assert wall >= 1.2
+    assert groq.scheduler.snapshot()["paced"] >= 5
+
+
+def test_without_pacing_the_same_burst_is_throttled(limited_stub):
+    groq = inter_ass.GroqClient(url=limited_stub.url, scheduler=benchmark.make_scheduler(limited_stub, pacing=False))
+    burst(groq, 10)
+    assert limited_stub.stats["rate_limited"] > 0
+
+
+def test_budgets_follow_the_rate_limit_headers(limited_stub):
+    scheduler = inter_ass.RateLimitScheduler(requests_per_minute=1000, tokens_per_minute=10 ** 9)
+    groq = inter_ass.GroqClient(url=limited_stub.url, scheduler=scheduler)
+    groq.chat("gsk_test", QUESTION)
+    stats = scheduler.snapshot()
+    assert stats["header_syncs"] >= 1
+    assert stats["buckets"]["tokens"]["capacity"] == limited_stub.tpm
+
+
+def test_live_calls_are_granted_ahead_of_queued_background_ones():
+    scheduler = inter_ass.RateLimitScheduler(requests_per_minute=1000, tokens_per_minute=10 ** 6)
+    scheduler.rpm = inter_ass.TokenBucket(1, 0.5)  # One call per half second
+    scheduler.acquire(scheduler.LIVE, 1)
+    order = []
+
+    def call(name, priority):
+        scheduler.acquire(priority, 1)
+        order.append(name)
+    threads = [threading.Thread(target=call, args=("background", scheduler.BACKGROUND)),
+               threading.Thread(target=call, args=("live", scheduler.LIVE))]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join(5)
+    assert order == ["live", "background"]
+
+
+def test_an_overtaken_response_does_not_hand_back_spent_budget():
+    bucket = inter_ass.TokenBucket(4, 1.0)
+    now = time.monotonic()
+    # The fourth call's response is handled first, then the first call's (3 left, whole again sooner)
+    assert bucket.sync(4, 0, 1.0, now)
+    assert not bucket.sync(4, 3, 0.25, now + 0.01)
+    assert bucket.level < 1
+    assert bucket.sync(4, 1, 0.75, now + 0.5)
@@ -0,0 +1,53 @@
+import json
+import threading
+import time
+
+import gevent
+
+import inter_ass
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []  # (thread ident, message)
+
+    def send(self, message):
+        self.sent.append((threading.get_ident(), json.loads(message)))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        gevent.sleep(0.01)
+    return condition()
+
+
+def test_channel_sends_worker_pushes_on_the_hub_thread():
+    channel = inter_ass.SessionChannel("s1")
+    channel.update_ui("Q: buffered while away", "")
+    ws = RecordingSocket()
+    gevent.spawn(channel.attach, ws).join()
+    workers = [threading.Thread(target=channel.update_ui_stream, args=("a1", f"delta {i}")) for i in range(20)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert wait_for(lambda: len(ws.sent) == 21)
+    assert {ident for ident, _ in ws.sent} == {threading.get_ident()}
+    assert ws.sent[0][1] == {"fn": "update_ui", "args": ["Q: buffered while away", ""]}
+    assert channel.stats["sent"] == 21 and not channel.backlog
+    channel.detach(ws)
+    channel.stop_audio()
+    gevent.sleep(0.05)
+    assert len(ws.sent) == 21 and len(channel.backlog) == 1
+
+
+def test_process_wide_stats_are_gated_in_server_mode(session, monkeypatch):
+    assistant, browser = session
+    assert inter_ass.get_response_cache_stats() is not None
+    monkeypatch.setattr(inter_ass, "registry", object())
+    monkeypatch.delenv("SERVER_STATS", raising=False)
+    assert inter_ass.get_response_cache_stats() is None
+    assert inter_ass.get_latency_summary() is None
+    monkeypatch.setenv("SERVER_STATS", "1")
+    assert inter_ass.get_hedge_stats() is not None
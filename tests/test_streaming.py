@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+import benchmark
+import inter_ass
+
+QUESTION = [{"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "What is a race condition?"}]
+
+
+@pytest.fixture
+def groq(stub):
+    return inter_ass.GroqClient(url=stub.url, scheduler=benchmark.make_scheduler(stub))
+
+
+def test_sse_deltas_arrive_in_order_and_make_up_the_answer(groq, stub):
+    deltas = []
+    text = groq.chat("gsk_test", QUESTION, on_delta=deltas.append)
+    assert text == benchmark.DEFAULT_ANSWER
+    assert len(deltas) == len(benchmark.DEFAULT_ANSWER.split(" "))
+    assert "".join(deltas).strip() == text
+    assert stub.stats["streamed"] == 1
+
+
+def test_cancel_mid_stream_raises_and_hangs_up(groq, stub):
+    handle = inter_ass.WorkHandle()
+    deltas = []
+
+    def on_delta(delta):
+        deltas.append(delta)
+        if len(deltas) == 3:
+            threading.Thread(target=handle.cancel, args=("test",)).start()
+    with pytest.raises(Exception, match="cancelled"):
+        groq.chat("gsk_test", QUESTION, on_delta=on_delta, handle=handle)
+    assert len(deltas) < len(benchmark.DEFAULT_ANSWER.split(" "))
+    assert benchmark.wait_until(lambda: stub.stats["aborted"] == 1, 5)
+
+
+def test_cancelled_before_sending_never_reaches_the_model(groq, stub):
+    handle = inter_ass.WorkHandle()
+    handle.cancel("test")
+    with pytest.raises(Exception):
+        groq.chat("gsk_test", QUESTION, handle=handle)
+    assert stub.stats["requests"] == 0
+
+
+def test_typed_answer_streams_to_the_page_before_the_final_payload(session):
+    assistant, browser = session
+    inter_ass.ask_question("what is a race condition", assistant.session_id)
+    assert browser.stream_deltas == len(benchmark.DEFAULT_ANSWER.split(" "))
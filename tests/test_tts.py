@@ -0,0 +1,6 @@
+def test_warm_up_synthesizes_only_the_fixed_messages(session):
+    assistant, browser = session
+    assistant.warm_tts_cache()
+    assert browser.tts.calls == 2
+    assistant.warm_tts_cache()
+    assert browser.tts.calls == 2  # Served from the cache the second time
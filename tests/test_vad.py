@@ -0,0 +1,48 @@
+import benchmark
+import inter_ass
+
+
+def stream_phrases(pcm, rate, width, chunk_frames=1024):
+    # Chunked exactly like the live microphone capture
+    vad = inter_ass.VoiceActivityDetector(sample_rate=rate, sample_width=width)
+    phrases = []
+    for offset in range(0, len(pcm), chunk_frames * width):
+        phrases.extend(vad.feed(pcm[offset: offset + chunk_frames * width]))
+    phrases.extend(vad.flush())
+    return phrases, vad.snapshot()
+
+
+def test_each_utterance_becomes_one_phrase():
+    pcm, rate, width = benchmark.synth_utterances(4, seed=1)
+    phrases, stats = stream_phrases(pcm, rate, width)
+    assert len(phrases) == 4
+    for phrase in phrases:
+        # 1.2-2.4 s of speech plus the detector's padding, never the 2.5 s gaps around it
+        assert 1.0 < len(phrase) / float(rate * width) < 3.5
+    assert stats["bytes_saved"] > 0 and stats["forced_splits"] == 0
+
+
+def test_streaming_and_whole_buffer_split_agree():
+    pcm, rate, width = benchmark.synth_utterances(3, seed=2)
+    phrases, _ = stream_phrases(pcm, rate, width)
+    offline = inter_ass.VoiceActivityDetector(sample_rate=rate, sample_width=width).split_phrases(pcm)
+    assert len(offline) == len(phrases) == 3
+
+
+def test_silence_yields_no_phrases():
+    phrases, stats = stream_phrases(b"\0" * 16000 * 2 * 3, 16000, 2)
+    assert phrases == [] and stats["bytes_out"] == 0
+
+
+def test_spoken_questions_are_answered_from_the_microphone(session, stub):
+    assistant, browser = session
+    pcm, rate, width = benchmark.synth_utterances(2, seed=3, gap_s=1.5)
+    recognizer = benchmark.StubRecognizer(benchmark.DEFAULT_QUESTIONS[:2], latency_ms=10)
+    benchmark.attach_microphone(assistant, benchmark.WavMicrophone(pcm, rate, width, speed=4.0), recognizer)
+    assistant.start_listening()
+    try:
+        for question in benchmark.DEFAULT_QUESTIONS[:2]:
+            assert browser.wait_for_text(question[:20], 0.0, 20)
+        assert benchmark.wait_until(lambda: stub.stats["requests"] >= 2, 10)
+    finally:
+        assistant.state.transition("test done", listening=False)
@@ -20,6 +20,9 @@ let countdown = document.getElementById('countdown');
 let aiAvatar = document.getElementById('aiAvatar');
 let connectionStatus = document.getElementById('connectionStatus');
 let statusText = document.getElementById('statusText');
+let latencyPanel = document.getElementById('latencyPanel');
+let latencyRows = document.getElementById('latencyRows');
+let latencyTimerId = null;
 
 let proctoringNotes = [];
 let activeAudios = [];
@@ -28,22 +31,125 @@ let countdownTimerId = null;
 let countdownEndTs = null;
 let countdownTotal = 90;
 
-// Deduplication state
-let lastQuestionText = '';
+// Deduplication state: length + hash keys rather than the full strings
+let lastQuestionKey = '';
 let lastQuestionIndex = '';
-let lastAnswerText = '';
-let lastAudioBase64 = '';
+let lastAnswerKey = '';
+
+// Windowed transcript: entries live in a capped array and only the visible ones (plus a buffer)
+// are in the DOM, so long kiosk sessions don't keep growing the page
+const TRANSCRIPT_MAX_ENTRIES = 1000;
+const TRANSCRIPT_BUFFER_ITEMS = 6;
+const TRANSCRIPT_ESTIMATED_HEIGHT = 120;
+// Only the newest answers keep their audio URLs for replay; older ones let the clips go
+const AUDIO_REPLAY_WINDOW = 5;
+// Audio segments can arrive before their answer's text; they wait here by clip id (a few clips at most)
+const PENDING_CLIP_LIMIT = 8;
+let pendingClipAudio = new Map();
+let questionsView = createTranscriptView(questionsArea, renderQuestionItem, updateQuestionItem);
+let answersView = createTranscriptView(answersArea, renderAnswerItem, updateAnswerItem);
+
+// Sequential TTS playback: segments of one answer play back-to-back and
+// report a single audio_playback_started/audio_playback_ended pair
+let ttsClipId = '';
+let ttsQueue = [];
+let ttsCurrent = null;
+let ttsClipStarted = false;
+let ttsClipComplete = false;
+let ttsClipCounter = 0;
+
+// Streaming answer state (partial text pushed via update_ui_stream)
+let streamingAnswerId = '';
+let streamingAnswerEntry = null;
+
+// Server mode: this page's session and its push socket (null on the desktop app)
+let sessionId = null;
+let sessionSocket = null;
+let sessionHeartbeatId = null;
+
+// Proctoring: small grayscale camera frames streamed as binary while an interview runs
+const FRAME_WIDTH = 80;
+const FRAME_HEIGHT = 60;
+const FRAME_INTERVAL_MS = 500;
+let frameSocket = null;
+let frameTimerId = null;
+let frameCanvas = null;
+
+// Eel 0.16 never forgets a call once Python has answered it: each resolve/reject stays in
+// eel._call_return_callbacks, so a long session (a playback report per answer, the latency poll)
+// grows the heap without limit. Calls drop their entry when they settle instead.
+const eelCallReturn = eel._call_return;
+eel._call_return = function (call) {
+    const awaitReturn = eelCallReturn(call);
+    return function (callback = null) {
+        const result = awaitReturn(callback);
+        const pending = eel._call_return_callbacks[call.call];
+        if (pending) {
+            const settle = fn => value => {
+                delete eel._call_return_callbacks[call.call];
+                if (fn) fn(value);
+            };
+            pending.resolve = settle(pending.resolve);
+            pending.reject = settle(pending.reject);
+        }
+        return result;
+    };
+};
 
 // Initialize page
 window.addEventListener('load', async () => {
+    // Lets the backend time startup and begin its deferred warm-up
+    try { eel.report_window_ready()(); } catch (_) {}
     updateConnectionStatus(false);
     initializeCamera();
     try {
-        const hasKey = await eel.has_api_key()();
+        sessionId = await eel.open_session()();
+        if (sessionId) connectSessionSocket();
+    } catch (e) {
+        showToast(String(e && e.errorText || e || 'Could not open a session'), 'error');
+    }
+    try {
+        const hasKey = await eel.has_api_key(sessionId)();
         updateApiKeyUI(!!hasKey);
     } catch (e) {
         updateApiKeyUI(false);
     }
+    // ?soak=500 fills the transcript with synthetic exchanges and logs DOM/heap size afterwards
+    const soak = parseInt(new URLSearchParams(location.search).get('soak') || '0', 10);
+    if (soak > 0) {
+        const stats = await runTranscriptSoak(soak);
+        console.log('Transcript soak', JSON.stringify(stats));
+        showToast(`Soak: ${stats.exchanges} exchanges, ${stats.domNodes} DOM nodes, ${stats.heapMB ?? '?'} MB heap`, 'info', 0);
+    }
+});
+
+// Server mode delivers this session's UI calls over its own socket instead of Eel's broadcast
+function connectSessionSocket() {
+    const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+    sessionSocket = new WebSocket(`${scheme}://${location.host}/session/${sessionId}`);
+    sessionSocket.onmessage = (event) => {
+        let msg;
+        try { msg = JSON.parse(event.data); } catch (_) { return; }
+        const handler = { update_ui, update_ui_stream, queue_tts_audio, stop_tts_audio }[msg.fn];
+        if (handler) handler(...(msg.args || []));
+    };
+    sessionSocket.onclose = () => {
+        clearInterval(sessionHeartbeatId);
+        sessionHeartbeatId = null;
+        // Calls made while disconnected are buffered server-side and replayed on reconnect
+        if (sessionId) setTimeout(connectSessionSocket, 2000);
+    };
+    clearInterval(sessionHeartbeatId);
+    sessionHeartbeatId = setInterval(() => {
+        if (sessionSocket && sessionSocket.readyState === WebSocket.OPEN) sessionSocket.send('ping');
+    }, 30000);
+}
+
+window.addEventListener('beforeunload', () => {
+    if (!sessionId) return;
+    const id = sessionId;
+    sessionId = null;
+    try { eel.close_session(id)(); } catch (_) {}
 });
 
 // Camera initialization
@@ -61,6 +167,47 @@ async function initializeCamera() {
     }
 }
 
+function startFrameStream() {
+    stopFrameStream();
+    const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+    frameSocket = new WebSocket(`${scheme}://${location.host}/frames${sessionId ? '/' + sessionId : ''}`);
+    frameSocket.binaryType = 'arraybuffer';
+    if (!frameCanvas) {
+        frameCanvas = document.createElement('canvas');
+        frameCanvas.width = FRAME_WIDTH;
+        frameCanvas.height = FRAME_HEIGHT;
+    }
+    frameTimerId = setInterval(sendCameraFrame, FRAME_INTERVAL_MS);
+}
+
+function stopFrameStream() {
+    clearInterval(frameTimerId);
+    frameTimerId = null;
+    if (frameSocket) {
+        try { frameSocket.close(); } catch (_) {}
+        frameSocket = null;
+    }
+}
+
+function sendCameraFrame() {
+    // Skip rather than queue when the camera isn't ready or the previous frame hasn't drained
+    if (!frameSocket || frameSocket.readyState !== WebSocket.OPEN || frameSocket.bufferedAmount > 0) return;
+    if (!cameraPreview.srcObject || cameraPreview.readyState < 2) return;
+    const ctx = frameCanvas.getContext('2d', { willReadFrequently: true });
+    ctx.drawImage(cameraPreview, 0, 0, FRAME_WIDTH, FRAME_HEIGHT);
+    const rgba = ctx.getImageData(0, 0, FRAME_WIDTH, FRAME_HEIGHT).data;
+    // Header: uint16 width, uint16 height (little-endian), then one luma byte per pixel
+    const buffer = new ArrayBuffer(4 + FRAME_WIDTH * FRAME_HEIGHT);
+    const header = new DataView(buffer);
+    header.setUint16(0, FRAME_WIDTH, true);
+    header.setUint16(2, FRAME_HEIGHT, true);
+    const gray = new Uint8Array(buffer, 4);
+    for (let i = 0, p = 0; i < gray.length; i++, p += 4) {
+        gray[i] = (rgba[p] * 77 + rgba[p + 1] * 150 + rgba[p + 2] * 29) >> 8;
+    }
+    frameSocket.send(buffer);
+}
+
 // Connection status
 function updateConnectionStatus(connected) {
     if (connected) {
@@ -96,7 +243,7 @@ saveApiKeyButton.addEventListener('click', async () => {
         return;
     }
     try {
-        const ok = await eel.save_api_key(apiKey)();
+        const ok = await eel.save_api_key(apiKey, sessionId)();
         if (ok) {
             updateApiKeyUI(true);
             apiKeyInput.value = '';
@@ -110,7 +257,7 @@ saveApiKeyButton.addEventListener('click', async () => {
 
 deleteApiKeyButton.addEventListener('click', async () => {
     try {
-        const ok = await eel.delete_api_key()();
+        const ok = await eel.delete_api_key(sessionId)();
         if (ok) {
             updateApiKeyUI(false);
             showToast('API key removed', 'info');
@@ -122,11 +269,14 @@ deleteApiKeyButton.addEventListener('click', async () => {
 
 startInterviewButton.addEventListener('click', async () => {
     showCountdownOverlay();
+    // Let the backend generate topics and first-question audio during the overlay
+    try { eel.prepare_interview(sessionId)(); } catch (_) {}
     setTimeout(async () => {
         hideCountdownOverlay();
         try {
             // Rely on backend to push UI updates via update_ui; avoid handling payload here to prevent duplicates
-            await eel.start_interview()();
+            await eel.start_interview(sessionId)();
+            startFrameStream();
             startInterviewButton.disabled = true;
             stopInterviewButton.disabled = false;
             completeAnswerButton.disabled = false;
@@ -140,7 +290,7 @@ startInterviewButton.addEventListener('click', async () => {
 stopInterviewButton.addEventListener('click', async () => {
     try {
         // Avoid immediate payload handling; backend will notify via update_ui if needed
-        await eel.stop_interview()();
+        await eel.stop_interview(sessionId)();
     } catch (e) {}
     stopInterview();
 });
@@ -149,19 +299,35 @@ completeAnswerButton.addEventListener('click', async () => {
     hideCountdown();
     try {
         // Avoid immediate payload handling; backend will notify via update_ui if needed
-        await eel.complete_answer()();
+        await eel.complete_answer(sessionId)();
     } catch (e) {
         showToast('Failed to submit answer', 'error');
     }
 });
 
+// One listener for every answer's buttons instead of inline handlers per answer
+answersArea.addEventListener('click', (event) => {
+    const button = event.target.closest('[data-action]');
+    const item = button && button.closest('.answer-item');
+    if (!item) return;
+    const id = Number(item.dataset.id);
+    if (button.dataset.action === 'replay') {
+        replayAnswerAudio(id);
+    } else if (button.dataset.action === 'dismiss') {
+        if (streamingAnswerEntry && streamingAnswerEntry.id === id) resetStreamingAnswer();
+        transcriptRemove(answersView, id);
+    }
+});
+
 clearButton.addEventListener('click', () => {
     clearAllContent();
+    // Follow-up questions should not refer back to wiped answers
+    try { eel.clear_conversation(sessionId)(); } catch (_) {}
 });
 
 ttsToggle.addEventListener('click', async () => {
     try {
-        const enabled = await eel.toggle_tts()();
+        const enabled = await eel.toggle_tts(sessionId)();
         ttsEnabled = !!enabled;
         ttsToggle.innerHTML = ttsEnabled ? 
             '<i class="fas fa-volume-up"></i> TTS On' : 
@@ -279,28 +445,19 @@ function hideCountdown() {
 }
 
 function clearAllContent() {
-    questionsArea.innerHTML = `
-        <div style="text-align: center; color: var(--text-secondary); margin-top: 2rem;">
-            <i class="fas fa-comments" style="font-size: 3rem; margin-bottom: 1rem; opacity: 0.3;"></i>
-            <p>Questions will appear here when you start the interview</p>
-        </div>
-    `;
-    answersArea.innerHTML = `
-        <div style="text-align: center; color: var(--text-secondary); margin-top: 2rem;">
-            <i class="fas fa-robot" style="font-size: 3rem; margin-bottom: 1rem; opacity: 0.3;"></i>
-            <p>AI responses and feedback will appear here</p>
-        </div>
-    `;
+    transcriptClear(questionsView);
+    transcriptClear(answersView);
     questionCounter.textContent = '0/0';
     // Reset dedupe state
-    lastQuestionText = '';
+    lastQuestionKey = '';
     lastQuestionIndex = '';
-    lastAnswerText = '';
-    lastAudioBase64 = '';
+    lastAnswerKey = '';
+    resetStreamingAnswer();
     showToast('Content cleared', 'info');
 }
 
 function stopInterview() {
+    stopFrameStream();
     startInterviewButton.disabled = false;
     stopInterviewButton.disabled = true;
     completeAnswerButton.disabled = true;
@@ -314,8 +471,7 @@ function stopInterview() {
     }
     
     // Stop any playing audio
-    activeAudios.forEach(a => { try { a.pause(); a.currentTime = 0; } catch(_){} });
-    activeAudios = [];
+    stopTtsQueue();
 
     showToast('Interview stopped', 'info');
 }
@@ -333,17 +489,17 @@ function update_ui(questionText, payload) {
                 const qText = match[3];
                 const idxKey = `${idx}/${total}`;
                 // Deduplicate same question index + text
-                if (idxKey !== lastQuestionIndex || qText !== lastQuestionText) {
+                if (idxKey !== lastQuestionIndex || textKey(qText) !== lastQuestionKey) {
                     questionCounter.textContent = `${idx}/${total}`;
                     addQuestion(idx, qText);
                     startCountdown(90);
                     lastQuestionIndex = idxKey;
-                    lastQuestionText = qText;
+                    lastQuestionKey = textKey(qText);
                 }
             } else {
-                if (questionText !== lastQuestionText) {
+                if (textKey(questionText) !== lastQuestionKey) {
                     addQuestion('', questionText);
-                    lastQuestionText = questionText;
+                    lastQuestionKey = textKey(questionText);
                 }
             }
         }
@@ -353,6 +509,25 @@ function update_ui(questionText, payload) {
     } catch (e) {}
 }
 
+// Incremental answer text: grows one answer bubble per stream id until the final payload arrives
+eel.expose(update_ui_stream);
+function update_ui_stream(streamId, delta) {
+    try {
+        if (!delta) return;
+        if (streamId !== streamingAnswerId || !streamingAnswerEntry) {
+            streamingAnswerId = streamId;
+            streamingAnswerEntry = addAnswer('');
+        }
+        streamingAnswerEntry.text += delta;
+        transcriptUpdate(answersView, streamingAnswerEntry);
+    } catch (e) {}
+}
+
+function resetStreamingAnswer() {
+    streamingAnswerId = '';
+    streamingAnswerEntry = null;
+}
+
 function handleBackendPayload(payload) {
     try {
         let data = payload;
@@ -361,81 +536,469 @@ function handleBackendPayload(payload) {
         }
         const text = data && data.text ? data.text : '';
         const audio = data && data.audio ? data.audio : null;
-        if (text && text !== lastAnswerText) {
-            addAnswer(text);
-            lastAnswerText = text;
+        let entry = null;
+        if (text && streamingAnswerEntry) {
+            // Final payload replaces the partial text streamed so far
+            entry = streamingAnswerEntry;
+            entry.text = text;
+            transcriptUpdate(answersView, entry);
+            resetStreamingAnswer();
+            lastAnswerKey = textKey(text);
+        } else if (text && textKey(text) !== lastAnswerKey) {
+            entry = addAnswer(text);
+            lastAnswerKey = textKey(text);
+        } else if (text) {
+            entry = answersView.entries[answersView.entries.length - 1] || null;
         }
-        if (ttsEnabled && audio && audio !== lastAudioBase64) {
-            playTtsAudio(audio);
-            lastAudioBase64 = audio;
+        // Chunked answers name their clip; segments already queued for it move onto this answer
+        if (entry && data.clip) adoptAnswerClip(entry, data.clip);
+        // Every payload's audio is played: clip URLs are content hashes, so a repeated answer or
+        // feedback clip has the same URL as last time and still has to be heard
+        if (audio) {
+            attachAnswerAudio('', audio, entry);
+            if (ttsEnabled) playTtsAudio(audio);
         }
     } catch (e) {}
 }
 
-function playTtsAudio(base64Audio) {
+// Audio segments of a chunked answer; seq order is guaranteed by the backend.
+// Audio arrives as a URL on the local server (/audio/<id>.mp3 or .wav), not inline base64
+eel.expose(queue_tts_audio);
+function queue_tts_audio(clipId, seq, audioUrl, isLast) {
+    if (audioUrl) attachAnswerAudio(clipId, audioUrl);
+    if (!ttsEnabled) return;
+    playTtsAudio(audioUrl, clipId, !!isLast);
+}
+
+// Barge-in: the backend heard the user talk over the answer and cancelled it
+eel.expose(stop_tts_audio);
+function stop_tts_audio() {
+    stopTtsQueue();
+}
+
+function playTtsAudio(audioUrl, clipId, isLast = true) {
     try {
-        const src = `data:audio/mp3;base64,${base64Audio}`;
-        const audio = new Audio(src);
-        audio.addEventListener('play', () => { try { eel.audio_playback_started()(); } catch (_) {} });
-        audio.addEventListener('ended', () => { try { eel.audio_playback_ended()(); } catch (_) {} });
-        audio.addEventListener('error', () => { try { eel.audio_playback_ended()(); } catch (_) {} });
-        // Stop any currently playing audio
-        activeAudios.forEach(a => { try { a.pause(); a.currentTime = 0; } catch(_){} });
-        activeAudios = [audio];
-        audio.play().catch(() => {
-            showToast('Autoplay blocked. Click to play audio.', 'warn');
-        });
+        if (!clipId) {
+            ttsClipCounter += 1;
+            clipId = `single-${ttsClipCounter}`;
+        }
+        if (clipId !== ttsClipId) {
+            // A new answer replaces whatever is playing or queued
+            stopTtsQueue();
+            ttsClipId = clipId;
+        }
+        if (audioUrl) {
+            const audio = new Audio(audioUrl);
+            audio.preload = 'auto';
+            audio.addEventListener('ended', () => onTtsSegmentDone(clipId));
+            audio.addEventListener('error', () => onTtsSegmentDone(clipId));
+            ttsQueue.push(audio);
+            activeAudios.push(audio);
+        }
+        if (isLast) ttsClipComplete = true;
+        pumpTtsQueue();
     } catch (e) {}
 }
 
-function addQuestion(number, text) {
-    if (questionsArea.querySelector('.fa-comments')) {
-        questionsArea.innerHTML = '';
+function pumpTtsQueue() {
+    if (ttsCurrent) return;
+    if (ttsQueue.length === 0) {
+        if (ttsClipComplete && ttsClipId) {
+            // Whole answer finished (or had no playable audio): release the mic once
+            ttsClipId = '';
+            try { eel.audio_playback_ended(sessionId)(); } catch (_) {}
+        }
+        return;
     }
-    
+    ttsCurrent = ttsQueue.shift();
+    if (!ttsClipStarted) {
+        ttsClipStarted = true;
+        try { eel.audio_playback_started(sessionId)(); } catch (_) {}
+    }
+    const clipId = ttsClipId;
+    ttsCurrent.play().catch(() => {
+        showToast('Autoplay blocked. Click to play audio.', 'warn');
+        // Skip the segment so the backend still gets playback_ended and reopens the mic
+        onTtsSegmentDone(clipId);
+    });
+}
+
+function onTtsSegmentDone(clipId) {
+    if (clipId !== ttsClipId) return;
+    // A played segment is done with: replay builds fresh elements from the answer's URLs
+    if (ttsCurrent) {
+        activeAudios = activeAudios.filter(a => a !== ttsCurrent);
+        releaseAudio(ttsCurrent);
+    }
+    ttsCurrent = null;
+    pumpTtsQueue();
+}
+
+function releaseAudio(audio) {
+    // Drop the src too so the browser frees the buffered media
+    try {
+        audio.pause();
+        const src = audio.getAttribute('src') || '';
+        audio.removeAttribute('src');
+        audio.load();
+        if (src.startsWith('blob:')) URL.revokeObjectURL(src);
+    } catch (_) {}
+}
+
+function stopTtsQueue() {
+    activeAudios.forEach(releaseAudio);
+    activeAudios = [];
+    ttsQueue = [];
+    ttsCurrent = null;
+    ttsClipId = '';
+    ttsClipStarted = false;
+    ttsClipComplete = false;
+}
+
+function addQuestion(number, text) {
+    return transcriptAppend(questionsView, { number, text });
+}
+
+function addAnswer(text) {
+    return transcriptAppend(answersView, { text, clipId: '', audioUrls: [] });
+}
+
+function renderQuestionItem(entry) {
     const questionDiv = document.createElement('div');
     questionDiv.className = 'question-item';
     questionDiv.innerHTML = `
         <div style="display: flex; align-items: flex-start; gap: 1rem;">
-            <span class="question-number">${number}</span>
+            <span class="question-number"></span>
             <div>
-                <p style="margin: 0; font-weight: 500;">${text}</p>
+                <p class="transcript-text" style="margin: 0; font-weight: 500;"></p>
             </div>
         </div>
     `;
-    questionsArea.appendChild(questionDiv);
-    questionsArea.scrollTop = questionsArea.scrollHeight;
+    updateQuestionItem(questionDiv, entry);
+    return questionDiv;
 }
 
-function addAnswer(text) {
-    if (answersArea.querySelector('.fa-robot')) {
-        answersArea.innerHTML = '';
-    }
-    
+function updateQuestionItem(node, entry) {
+    node.querySelector('.question-number').textContent = entry.number;
+    node.querySelector('.transcript-text').textContent = entry.text;
+}
+
+function renderAnswerItem(entry) {
     const answerDiv = document.createElement('div');
     answerDiv.className = 'answer-item';
+    answerDiv.dataset.id = entry.id;
     answerDiv.innerHTML = `
         <div style="display: flex; align-items: flex-start; gap: 1rem;">
             <div class="ai-avatar" style="flex-shrink: 0;">AI</div>
             <div style="flex: 1;">
-                <p style="margin: 0; line-height: 1.6;">${text}</p>
+                <p class="transcript-text" style="margin: 0; line-height: 1.6;"></p>
                 <div style="margin-top: 1rem; display: flex; gap: 0.5rem;">
-                    <button class="btn btn-secondary" style="padding: 0.5rem 1rem; font-size: 0.75rem;" onclick="replayLastAudio(this)">
+                    <button class="btn btn-secondary" style="padding: 0.5rem 1rem; font-size: 0.75rem;" data-action="replay">
                         <i class="fas fa-play"></i> Play Audio
                     </button>
-                    <button class="btn btn-secondary" style="padding: 0.5rem 1rem; font-size: 0.75rem;" onclick="this.parentElement.parentElement.parentElement.parentElement.remove()">
+                    <button class="btn btn-secondary" style="padding: 0.5rem 1rem; font-size: 0.75rem;" data-action="dismiss">
                         <i class="fas fa-times"></i> Dismiss
                     </button>
                 </div>
             </div>
         </div>
     `;
-    answersArea.appendChild(answerDiv);
-    answersArea.scrollTop = answersArea.scrollHeight;
+    updateAnswerItem(answerDiv, entry);
+    return answerDiv;
+}
+
+function updateAnswerItem(node, entry) {
+    node.querySelector('.transcript-text').textContent = entry.text;
+    node.querySelector('[data-action="replay"]').style.display = entry.audioUrls.length ? '' : 'none';
+}
+
+function textKey(text) {
+    // FNV-1a over the string, plus its length
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return `${text.length}:${(hash >>> 0).toString(36)}`;
+}
+
+function findAnswerByClip(clipId) {
+    // Clips belong to recent answers, so only the replay window's worth is searched
+    const entries = answersView.entries;
+    for (let i = entries.length - 1; i >= Math.max(0, entries.length - AUDIO_REPLAY_WINDOW * 2); i--) {
+        if (entries[i].clipId === clipId) return entries[i];
+    }
+    return null;
+}
+
+function attachAnswerAudio(clipId, audioUrl, entry = null) {
+    // A clip's segments go to the answer tagged with it, or wait for that answer's text to arrive;
+    // untagged audio belongs to the given (else newest) answer
+    if (!entry) {
+        entry = clipId ? findAnswerByClip(clipId) : answersView.entries[answersView.entries.length - 1];
+    }
+    if (!entry) {
+        if (!clipId) return;
+        if (!pendingClipAudio.has(clipId) && pendingClipAudio.size >= PENDING_CLIP_LIMIT) {
+            pendingClipAudio.delete(pendingClipAudio.keys().next().value);
+        }
+        pendingClipAudio.set(clipId, (pendingClipAudio.get(clipId) || []).concat(audioUrl));
+        return;
+    }
+    if (entry.clipId !== clipId || !clipId) {
+        entry.clipId = clipId;
+        entry.audioUrls = [];
+    }
+    entry.audioUrls.push(audioUrl);
+    transcriptUpdate(answersView, entry);
+    trimAnswerAudio();
 }
 
-function replayLastAudio(btn) {
+function adoptAnswerClip(entry, clipId) {
+    if (entry.clipId === clipId) return;
+    entry.clipId = clipId;
+    entry.audioUrls = pendingClipAudio.get(clipId) || [];
+    pendingClipAudio.delete(clipId);
+    transcriptUpdate(answersView, entry);
+    trimAnswerAudio();
+}
+
+function trimAnswerAudio() {
+    // Older answers past the replay window give up their URLs (and their Play button)
+    let kept = 0;
+    for (let i = answersView.entries.length - 1; i >= 0; i--) {
+        const older = answersView.entries[i];
+        if (!older.audioUrls.length) continue;
+        kept += 1;
+        if (kept > AUDIO_REPLAY_WINDOW) {
+            older.audioUrls = [];
+            transcriptUpdate(answersView, older);
+        }
+    }
+}
+
+function replayAnswerAudio(id) {
     if (!ttsEnabled) { showToast('TTS is disabled', 'info'); return; }
-    const last = activeAudios[activeAudios.length - 1];
-    if (last) { try { last.currentTime = 0; last.play(); } catch(_){} }
+    const entry = answersView.entries.find(e => e.id === id);
+    if (!entry || !entry.audioUrls.length) return;
+    // Same queue as live answers, so playback_started/ended are reported once
+    ttsClipCounter += 1;
+    const clipId = `replay-${ttsClipCounter}`;
+    const urls = entry.audioUrls.slice();
+    urls.forEach((url, i) => playTtsAudio(url, clipId, i === urls.length - 1));
+}
+
+function createTranscriptView(area, renderItem, updateItem) {
+    const view = {
+        area,
+        renderItem,
+        updateItem,
+        placeholderHtml: area.innerHTML,
+        entries: [],
+        nodes: new Map(),  // entry id -> rendered element
+        topSpacer: null,
+        bottomSpacer: null,
+        nextId: 1,
+        stickToBottom: true,
+        scheduled: false
+    };
+    area.addEventListener('scroll', () => {
+        view.stickToBottom = area.scrollHeight - area.scrollTop - area.clientHeight < 4;
+        scheduleTranscriptRender(view);
+    }, { passive: true });
+    return view;
+}
+
+function transcriptAppend(view, entry) {
+    entry.id = view.nextId++;
+    entry.height = null;
+    entry.fresh = true;
+    view.entries.push(entry);
+    while (view.entries.length > TRANSCRIPT_MAX_ENTRIES) {
+        const evicted = view.entries.shift();
+        const node = view.nodes.get(evicted.id);
+        if (node) node.remove();
+        view.nodes.delete(evicted.id);
+    }
+    // New items scroll into view, as before
+    view.stickToBottom = true;
+    renderTranscript(view);
+    return entry;
+}
+
+function transcriptUpdate(view, entry) {
+    const node = view.nodes.get(entry.id);
+    if (node) view.updateItem(node, entry);
+    entry.height = null;
+    scheduleTranscriptRender(view);
+}
+
+function transcriptRemove(view, id) {
+    view.entries = view.entries.filter(e => e.id !== id);
+    const node = view.nodes.get(id);
+    if (node) node.remove();
+    view.nodes.delete(id);
+    renderTranscript(view);
 }
+
+function transcriptClear(view) {
+    view.entries = [];
+    view.nodes.clear();
+    view.topSpacer = null;
+    view.bottomSpacer = null;
+    view.stickToBottom = true;
+    view.area.innerHTML = view.placeholderHtml;
+}
+
+function scheduleTranscriptRender(view) {
+    if (view.scheduled) return;
+    view.scheduled = true;
+    requestAnimationFrame(() => renderTranscript(view));
+}
+
+function renderTranscript(view) {
+    view.scheduled = false;
+    const { area, entries } = view;
+    if (entries.length === 0) {
+        transcriptClear(view);
+        return;
+    }
+    if (!view.topSpacer) {
+        area.innerHTML = '';
+        view.topSpacer = document.createElement('div');
+        view.bottomSpacer = document.createElement('div');
+        area.append(view.topSpacer, view.bottomSpacer);
+    }
+    const heightOf = (entry) => entry.height ?? TRANSCRIPT_ESTIMATED_HEIGHT;
+    // Visible range from the heights known so far; unmeasured entries count as the estimate
+    let first = 0;
+    let last = entries.length;
+    if (view.stickToBottom) {
+        // Pinned to the newest item: fill the viewport upwards from the end
+        let filled = 0;
+        first = entries.length;
+        while (first > 0 && filled < area.clientHeight) {
+            first--;
+            filled += heightOf(entries[first]);
+        }
+    } else {
+        const top = area.scrollTop;
+        const bottom = top + area.clientHeight;
+        let offset = 0;
+        while (first < entries.length - 1 && offset + heightOf(entries[first]) <= top) {
+            offset += heightOf(entries[first]);
+            first++;
+        }
+        last = first;
+        while (last < entries.length && offset < bottom) {
+            offset += heightOf(entries[last]);
+            last++;
+        }
+    }
+    const start = Math.max(0, first - TRANSCRIPT_BUFFER_ITEMS);
+    const stop = Math.min(entries.length, last + TRANSCRIPT_BUFFER_ITEMS);
+    const keep = new Set();
+    for (let i = start; i < stop; i++) keep.add(entries[i].id);
+    view.nodes.forEach((node, id) => {
+        if (!keep.has(id)) {
+            node.remove();
+            view.nodes.delete(id);
+        }
+    });
+    let cursor = view.topSpacer;
+    for (let i = start; i < stop; i++) {
+        const entry = entries[i];
+        let node = view.nodes.get(entry.id);
+        if (!node) {
+            node = view.renderItem(entry);
+            // Only a newly arrived item animates in, not one scrolled back into the window
+            if (!entry.fresh) node.style.animation = 'none';
+            view.nodes.set(entry.id, node);
+        }
+        entry.fresh = false;
+        if (cursor.nextSibling !== node) cursor.after(node);
+        cursor = node;
+    }
+    for (let i = start; i < stop; i++) {
+        const entry = entries[i];
+        if (entry.height === null) {
+            const node = view.nodes.get(entry.id);
+            const style = getComputedStyle(node);
+            entry.height = node.offsetHeight + parseFloat(style.marginTop) + parseFloat(style.marginBottom);
+        }
+    }
+    let above = 0;
+    for (let i = 0; i < start; i++) above += heightOf(entries[i]);
+    let below = 0;
+    for (let i = stop; i < entries.length; i++) below += heightOf(entries[i]);
+    view.topSpacer.style.height = `${above}px`;
+    view.bottomSpacer.style.height = `${below}px`;
+    if (view.stickToBottom) area.scrollTop = area.scrollHeight;
+}
+
+async function runTranscriptSoak(exchanges = 500) {
+    // Synthetic Q&A exchanges through the same entry points the backend calls, then DOM and heap size
+    const sentence = 'A message queue decouples the producer from the consumer, so bursts are absorbed. ';
+    for (let i = 1; i <= exchanges; i++) {
+        update_ui(`Q: Soak question ${i}, what does a load balancer do?`, '');
+        const streamId = `soak-${i}`;
+        for (let t = 0; t < 4; t++) update_ui_stream(streamId, sentence);
+        update_ui('', JSON.stringify({ text: sentence.repeat(4) + `(${i})`, audio: null, clip: streamId }));
+        attachAnswerAudio(streamId, `/audio/soak-${i}-0.mp3`);
+        attachAnswerAudio(streamId, `/audio/soak-${i}-1.mp3`);
+        if (i % 50 === 0) await new Promise(resolve => requestAnimationFrame(resolve));
+    }
+    await new Promise(resolve => requestAnimationFrame(resolve));
+    if (window.gc) window.gc();  // Chrome with --js-flags=--expose-gc
+    const memory = performance.memory;
+    return {
+        exchanges,
+        domNodes: document.getElementsByTagName('*').length,
+        renderedItems: questionsView.nodes.size + answersView.nodes.size,
+        entries: questionsView.entries.length + answersView.entries.length,
+        audioUrlsKept: answersView.entries.reduce((n, e) => n + e.audioUrls.length, 0),
+        audioElements: activeAudios.length,
+        heapMB: memory ? Math.round(memory.usedJSHeapSize / 1048576 * 10) / 10 : null
+    };
+}
+
+// Latency debug panel: polls the backend only while the panel is open
+async function refreshLatencyPanel() {
+    try {
+        const summary = await eel.get_latency_summary(0, sessionId)();
+        if (!summary) {
+            latencyRows.innerHTML = '<tr><td colspan="5">Not shared in server mode (SERVER_STATS=1)</td></tr>';
+            return;
+        }
+        const stages = summary.stages || {};
+        const keys = Object.keys(stages);
+        if (!summary.enabled) {
+            latencyRows.innerHTML = '<tr><td colspan="5">Tracing disabled (LATENCY_TRACE=0)</td></tr>';
+            return;
+        }
+        if (keys.length === 0) {
+            latencyRows.innerHTML = '<tr><td colspan="5">No traces yet</td></tr>';
+            return;
+        }
+        latencyRows.innerHTML = '';
+        keys.forEach(key => {
+            const row = document.createElement('tr');
+            const st = stages[key];
+            [key, st.count, `${st.p50_ms} ms`, `${st.p95_ms} ms`, `${st.p99_ms} ms`].forEach(value => {
+                const cell = document.createElement('td');
+                cell.textContent = value;
+                row.appendChild(cell);
+            });
+            latencyRows.appendChild(row);
+        });
+    } catch (_) {}
+}
+
+latencyPanel.addEventListener('toggle', () => {
+    clearInterval(latencyTimerId);
+    latencyTimerId = null;
+    if (latencyPanel.open) {
+        refreshLatencyPanel();
+        latencyTimerId = setInterval(refreshLatencyPanel, 2000);
+    }
+});